@@ -0,0 +1,252 @@
+"""Multi-season tables of the whole results archive in bounded memory.
+
+Every regatta is reduced to one compact record per sailor (position, fleet size, nett points) as soon as it is
+parsed. Records are kept in partitions by sailor id and written to disk when they use more than max_memory bytes,
+tables are then summed partition by partition and the partial sums merged. A partition is read whole, so spilled
+partitions bigger than max_memory are split in two.
+"""
+import argparse
+import csv
+import os
+import shutil
+import sys
+import tempfile
+import numpy as np
+from numpy.lib import recfunctions
+import instrumentation
+import registry
+import scoring
+import store
+from results_matrix import load_matrix
+
+RECORD = np.dtype([("sailor", np.int32), ("club", np.int32), ("nation", np.int32), ("year", np.int16),
+                   ("boat", np.int16), ("number", np.int16), ("position", np.int32), ("fleet", np.int32),
+                   ("points", np.float64)])
+KEYS = ["sailor", "club", "nation", "year", "boat"]
+COLUMNS = ["events", "best", "mean_position", "mean_percentile", "points"]
+
+
+class _Strings:
+    """Dense ids of strings."""
+
+    def __init__(self):
+        """Init."""
+        self.values = []
+        self.ids = {}
+
+    def get_id(self, value: str) -> int:
+        """Get id of string, new strings get next id."""
+        value = value or ""
+        if value not in self.ids:
+            self.ids[value] = len(self.values)
+            self.values.append(value)
+        return self.ids[value]
+
+
+def regatta_records(matrix, sailor_ids, club_ids, nation_ids, year: int = 0, boat: int = 0, number: int = 0,
+                    discount: int = 1):
+    """Get RECORD array of ResultsMatrix, position is by Analyzer.get_results(discount)."""
+    points, discardable = matrix.scored_points()
+    discount = max(0, min(discount, points.shape[1] - 1))
+    order = scoring.get_order(points, discount, None, discardable)
+    records = np.zeros(len(matrix), dtype=RECORD)
+    records["sailor"] = sailor_ids
+    records["club"] = club_ids
+    records["nation"] = nation_ids
+    records["year"], records["boat"], records["number"] = year, boat, number
+    records["position"][order] = np.arange(1, len(order) + 1)
+    records["fleet"] = len(matrix)
+    records["points"] = scoring.nett_points(points, discount, None, discardable)
+    return records
+
+
+class Aggregator:
+    """Records of regattas in partitions by sailor, spilled to disk above max_memory bytes."""
+
+    def __init__(self, max_memory: int = 64 << 20, partitions: int = 16, folder: str = None, discount: int = 1):
+        """Init, spilled partitions are written to a new folder inside folder (default system temp folder)."""
+        self.max_memory = max_memory
+        self.partitions = partitions
+        self.discount = discount
+        self.folder = tempfile.mkdtemp(prefix="aggregator_", dir=folder)
+        self.registry = registry.SailorRegistry()
+        self.clubs = _Strings()
+        self.nations = _Strings()
+        self.boats = _Strings()
+        self.files = []
+        self._chunks = [[] for _ in range(partitions)]
+        self._spilled = [0] * partitions
+        self._sizes = [0] * partitions
+        self.memory = 0
+
+    def __enter__(self):
+        """Enter."""
+        return self
+
+    def __exit__(self, *args):
+        """Exit, spilled partitions are removed."""
+        self.close()
+
+    def close(self):
+        """Remove spilled partitions."""
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def add_matrix(self, matrix, year: int = 0, boat: str = "", number: int = 0, name: str = None):
+        """Add records of ResultsMatrix."""
+        if not len(matrix) or not matrix.races:
+            return
+        records = regatta_records(matrix, self.registry.matrix_ids(matrix),
+                                  [self.clubs.get_id(x) for x in matrix.clubs],
+                                  [self.nations.get_id(x) for x in matrix.column("nat")],
+                                  year, self.boats.get_id(boat), number, self.discount)
+        partition = records["sailor"] % self.partitions
+        for n in np.unique(partition):
+            self._chunks[n].append(records[partition == n])
+        self.memory += records.nbytes
+        self.files.append(name)
+        if self.memory > self.max_memory:
+            self.spill()
+
+    def add_regatta(self, path: str, year: int = None, boat: str = None, number: int = 0):
+        """Parse results file and add its records, year and class default to its Data/<year>/<class> folders."""
+        info = store.path_info(path)
+        self.add_matrix(load_matrix(path), info[0] if year is None else year, info[1] if boat is None else boat,
+                        number, path)
+
+    def add_archive(self, data: str = "./Data/", since: int = None, until: int = None):
+        """Add results files of Data/<year>/<class> tree."""
+        for year, boat, number, path in store.archive_files(data):
+            if (since is None or year >= since) and (until is None or year <= until):
+                self.add_regatta(path, year, boat, number)
+        return self
+
+    def _path(self, partition: int, chunk: int) -> str:
+        """Get path of spilled chunk."""
+        return os.path.join(self.folder, f"{partition}_{chunk}.npy")
+
+    def spill(self):
+        """Write records in memory to disk, partitions are split while a spilled one is bigger than max_memory."""
+        for n, chunks in enumerate(self._chunks):
+            if chunks:
+                records = np.concatenate(chunks)
+                np.save(self._path(n, self._spilled[n]), records)
+                self._spilled[n] += 1
+                self._sizes[n] += records.nbytes
+        self._chunks = [[] for _ in range(self.partitions)]
+        self.memory = 0
+        # a partition of one sailor can not be split
+        while max(self._sizes) > self.max_memory and self.partitions < len(self.registry):
+            self._split()
+
+    def _split(self):
+        """Double number of partitions, records of spilled partition n go to partitions n and n + old number."""
+        count = self.partitions
+        spilled, sizes = [0] * 2 * count, [0] * 2 * count
+        for n in range(count):
+            records = self.partition(n)
+            for x in range(self._spilled[n]):
+                os.remove(self._path(n, x))
+            for m in (n, n + count):
+                part = records[records["sailor"] % (2 * count) == m]
+                if len(part):
+                    np.save(self._path(m, 0), part)
+                    spilled[m], sizes[m] = 1, part.nbytes
+        self.partitions = 2 * count
+        self._chunks = [[] for _ in range(self.partitions)]
+        self._spilled, self._sizes = spilled, sizes
+
+    def partition(self, n: int):
+        """Get records of partition, it is read whole: spilled records (up to max_memory) and records in memory."""
+        chunks = [np.load(self._path(n, x)) for x in range(self._spilled[n])] + self._chunks[n]
+        return np.concatenate(chunks) if chunks else np.zeros(0, dtype=RECORD)
+
+    def records(self):
+        """Yield records of every partition."""
+        for n in range(self.partitions):
+            yield self.partition(n)
+
+    def table(self, by: list = ("sailor", "year"), min_events: int = 1) -> list:
+        """Get rows of key values of by and COLUMNS, best mean percentile first within the other keys.
+
+        Keys are names of KEYS, sailor, club, nation and boat are given as names.
+        """
+        for key in by:
+            if key not in KEYS:
+                raise ValueError(f"Unknown key {key}!")
+        by = list(by)
+        partials = []
+        for records in self.records():
+            if len(records):
+                partials.append(_sums(recfunctions.repack_fields(records[by]), records))
+        if not partials:
+            return []
+        keys = np.concatenate([x[0] for x in partials])
+        sums = np.concatenate([x[1] for x in partials])
+        keys, inverse = np.unique(keys, return_inverse=True)
+        inverse = inverse.reshape(-1)
+        totals = np.zeros((len(keys), 4))
+        np.add.at(totals, inverse, sums[:, :4])
+        best = np.full(len(keys), np.inf)
+        np.minimum.at(best, inverse, sums[:, 4])
+
+        events = totals[:, 0]
+        keep = events >= min_events
+        columns = np.column_stack([events, best, totals[:, 1] / events, totals[:, 2] / events, totals[:, 3]])[keep]
+        keys = keys[keep]
+        # rank by mean percentile within year and class keys
+        groups = [x for x in by if x in ("year", "boat")]
+        order = np.lexsort([columns[:, 3]] + [keys[x] for x in reversed(groups)])
+        names = {"sailor": self.registry.names, "club": self.clubs.values, "nation": self.nations.values,
+                 "boat": self.boats.values}
+        rows = []
+        for n in order:
+            row = [names[x][keys[x][n]] if x in names else int(keys[x][n]) for x in by]
+            events, best, position, percentile, points = columns[n]
+            rows.append(tuple(row) + (int(events), int(best), float(position), float(percentile), float(points)))
+        return rows
+
+    def to_csv(self, f, by: list = ("sailor", "year"), min_events: int = 1):
+        """Write table to csv file or path."""
+        if isinstance(f, str):
+            with open(f, "w", newline="", encoding="utf-8") as fi:
+                return self.to_csv(fi, by, min_events)
+        writer = csv.writer(f)
+        writer.writerow(list(by) + COLUMNS)
+        writer.writerows(self.table(by, min_events))
+
+
+def _sums(keys, records) -> tuple:
+    """Get (unique keys, [events, position sum, percentile sum, points sum, best position]) of records."""
+    keys, inverse = np.unique(keys, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    percentile = np.where(records["fleet"] > 1, (records["position"] - 1) / np.maximum(records["fleet"] - 1, 1), 0.0)
+    sums = np.zeros((len(keys), 5))
+    np.add.at(sums[:, 0], inverse, 1)
+    np.add.at(sums[:, 1], inverse, records["position"])
+    np.add.at(sums[:, 2], inverse, percentile)
+    np.add.at(sums[:, 3], inverse, records["points"])
+    sums[:, 4] = np.inf
+    np.minimum.at(sums[:, 4], inverse, records["position"])
+    return keys, sums
+
+
+instrumentation.instrument(Aggregator, ["add_matrix", "spill", "table"])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Multi-season tables of results archive.")
+    parser.add_argument("data", nargs="?", default="./Data/")
+    parser.add_argument("--by", nargs="+", default=["sailor", "year"], choices=KEYS)
+    parser.add_argument("--since", type=int)
+    parser.add_argument("--until", type=int)
+    parser.add_argument("--min-events", type=int, default=1)
+    parser.add_argument("--max-memory", type=int, default=64, help="MB of records kept in memory")
+    parser.add_argument("--output", help="csv file, default stdout")
+    args = parser.parse_args()
+
+    with Aggregator(args.max_memory << 20) as aggregator:
+        aggregator.add_archive(args.data, args.since, args.until)
+        if args.output:
+            aggregator.to_csv(args.output, args.by, args.min_events)
+        else:
+            aggregator.to_csv(sys.stdout, args.by, args.min_events)
@@ -0,0 +1,369 @@
+"""Benchmarks."""
+import argparse
+import io
+import json
+import math
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import zipfile
+from xml.sax.saxutils import escape
+import aggregator
+import head_to_head
+import rating
+import results_matrix
+import scoring_rules
+import simulator
+from results_analyzer import Analyzer, Place, Sailor
+from season import Regatta, Season
+
+
+FIRST_NAMES = ["Mari", "Karl", "Jüri", "Tõnu", "Liisa", "Märt", "Õie", "Ülle", "Andres", "Kadri", "Siim", "Triin",
+               "Rasmus", "Anu", "Priit", "Kärt", "Mihkel", "Eve", "Toomas", "Helen"]
+LAST_NAMES = ["Tamm", "Saar", "Mägi", "Kask", "Õun", "Pärn", "Lepik", "Kukk", "Rebane", "Ilves", "Sepp", "Kõiv",
+              "Org", "Vaher", "Laur", "Kuusk", "Jõgi", "Männik", "Raud", "Sild"]
+CLUBS = ["KJK", "Pärnu JK", "ESS", "NYC", "Haapsalu JK", "Saaremaa MK", "TJK", "Kalev JK"]
+CODES = ["DNF", "DNC", "DNS", "OCS", "DSQ", "RET", "UFD", "BFD", "DNE"]
+HEADER_DIALECTS = [
+    {"sail_nr": "Sailno", "club": "Klubi", "name": "HelmName", "silver": "Silver", "gold": "Gold"},
+    {"sail_nr": "SailNr", "club": "Club", "name": "Name", "silver": "Hõbefinaal", "gold": "Kuldfinaal"},
+    {"sail_nr": "Sail", "club": "klubi", "name": "Skipper", "silver": "poolfinaal", "gold": "finaal"},
+]
+
+
+def generate_fleet(size: int, rng: random.Random) -> list:
+    """Generate fleet of (name, sail nr, club)."""
+    fleet = []
+    names = set()
+    while len(fleet) < size:
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        if name in names:
+            name = f"{name} {len(fleet)}"
+        names.add(name)
+        fleet.append((name, f"EST {rng.randint(1, 999999)}", rng.choice(CLUBS)))
+    return fleet
+
+
+def _race_cell(place: int, fleet_size: int, rng: random.Random, code_rate: float) -> tuple:
+    """Get (points, cell) for one race."""
+    if rng.random() < code_rate:
+        return fleet_size + 1, f"{fleet_size + 1}/{rng.choice(CODES)}"
+    return place, str(place)
+
+
+def generate_regatta(path: str, fleet: list, races: int = 8, finals: bool = False, qualifying: int = 0,
+                     seed: int = None, code_rate: float = 0.03, dialect: int = None):
+    """Write synthetic regatta results to csv."""
+    rng = random.Random(seed)
+    size = len(fleet)
+    headers = HEADER_DIALECTS[rng.randrange(len(HEADER_DIALECTS)) if dialect is None else dialect]
+    skill = {entry[0]: rng.random() for entry in fleet}
+    points = {entry[0]: [] for entry in fleet}
+    cells = {entry[0]: [] for entry in fleet}
+    for _ in range(races):
+        order = sorted(fleet, key=lambda x: skill[x[0]] + rng.gauss(0, 0.35))
+        for place, entry in enumerate(order):
+            race_points, cell = _race_cell(place + 1, size, rng, code_rate)
+            points[entry[0]].append(race_points)
+            cells[entry[0]].append(cell)
+
+    analyzer = Analyzer()
+    analyzer.import_data([Sailor(x[0], x[1], None, [], None, [Place(p, str(p)) for p in points[x[0]]], x[2])
+                          for x in fleet])
+    ranked = [x.name for x in analyzer.get_results(discount=1)]
+    for name in ranked:
+        worst = max(range(races), key=lambda i: points[name][i])
+        cells[name][worst] = f"({cells[name][worst]})"
+
+    silver = {}
+    gold = {}
+    if finals and size >= 10:
+        silver_fleet = ranked[3:10]
+        rng.shuffle(silver_fleet)
+        silver = {name: i + 1 for i, name in enumerate(silver_fleet)}
+        gold_fleet = ranked[:3] + silver_fleet[:1]
+        rng.shuffle(gold_fleet)
+        gold = {name: i + 1 for i, name in enumerate(gold_fleet)}
+
+    race_headers = [f"Q{i + 1}" for i in range(qualifying)] + [f"R{i + 1}" for i in range(races - qualifying)]
+    header = ["Rank", headers["sail_nr"], headers["name"], headers["club"]] + race_headers + ["Total", "Nett"]
+    if finals:
+        header += [headers["silver"], headers["gold"]]
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(",".join(header) + "\n")
+        for i, name in enumerate(ranked):
+            entry = next(x for x in fleet if x[0] == name)
+            row = [str(i + 1), entry[1], name, entry[2]] + cells[name] + [str(sum(points[name])), ""]
+            if finals:
+                row += [str(silver.get(name, "")), str(gold.get(name, ""))]
+            f.write(",".join(f'"{x}"' if "," in x else x for x in row) + "\n")
+
+
+def generate_split_regatta(path: str, fleet: list, qualifying: int = 4, final: int = 4, fleets: int = 4,
+                           seed: int = None, code_rate: float = 0.03):
+    """Write synthetic split fleet regatta, places are inside the fleet of each series."""
+    rng = random.Random(seed)
+    colors = ["Yellow", "Blue", "Red", "Green", "White", "Black"][:fleets]
+    finals = ["Gold", "Silver", "Bronze", "Emerald"][:max(fleets - 1, 1)]
+    skill = {entry[0]: rng.random() for entry in fleet}
+    qual_fleet = {entry[0]: colors[i % len(colors)] for i, entry in enumerate(rng.sample(fleet, len(fleet)))}
+    cells = {entry[0]: [] for entry in fleet}
+    points = {entry[0]: 0 for entry in fleet}
+
+    def sail(groups: dict):
+        for group in groups.values():
+            order = sorted(group, key=lambda x: skill[x[0]] + rng.gauss(0, 0.35))
+            for place, entry in enumerate(order):
+                race_points, cell = _race_cell(place + 1, len(group), rng, code_rate)
+                points[entry[0]] += race_points
+                cells[entry[0]].append(cell)
+
+    for _ in range(qualifying):
+        sail({color: [x for x in fleet if qual_fleet[x[0]] == color] for color in colors})
+    ranked = sorted(fleet, key=lambda x: points[x[0]])
+    size = math.ceil(len(fleet) / len(finals))
+    final_fleet = {entry[0]: finals[i // size] for i, entry in enumerate(ranked)}
+    for _ in range(final):
+        sail({name: [x for x in fleet if final_fleet[x[0]] == name] for name in finals})
+    header = ["Sailno", "HelmName", "Klubi", "Fleet", "Final fleet"] + [f"Q{i + 1}" for i in range(qualifying)] + \
+             [f"R{i + 1}" for i in range(final)]
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(",".join(header) + "\n")
+        for entry in fleet:
+            row = [entry[1], entry[0], entry[2], qual_fleet[entry[0]], final_fleet[entry[0]] if final else ""]
+            f.write(",".join(row + cells[entry[0]]) + "\n")
+
+
+def generate_season(folder: str, regattas: int = 5, fleet_size: int = 40, races: int = 8, finals_every: int = 2,
+                    seed: int = 0) -> list:
+    """Write synthetic season to folder, return csv paths."""
+    rng = random.Random(seed)
+    pool = generate_fleet(int(fleet_size * 1.5), rng)
+    paths = []
+    for n in range(regattas):
+        fleet = rng.sample(pool, fleet_size)
+        path = os.path.join(folder, f"regatta_{n + 1}.csv")
+        generate_regatta(path, fleet, races=races, finals=finals_every > 0 and n % finals_every == 0,
+                         qualifying=races // 2 if n % 3 == 2 else 0, seed=rng.randrange(2**32))
+        paths.append(path)
+    return paths
+
+
+def _cell_name(column: int) -> str:
+    """Get column letters of 0-based column."""
+    name = ""
+    column += 1
+    while column:
+        column, rest = divmod(column - 1, 26)
+        name = chr(ord("A") + rest) + name
+    return name
+
+
+def write_xlsx(path: str, sheets: dict):
+    """Write {sheet name: rows} workbook, numeric cells are numbers and text uses the shared strings table."""
+    main = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+    relations = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+    package = "http://schemas.openxmlformats.org/package/2006/relationships"
+    strings = {}
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", '<?xml version="1.0" encoding="UTF-8"?><Types xmlns="http://schemas.'
+                         'openxmlformats.org/package/2006/content-types"><Default Extension="xml" ContentType='
+                         '"application/xml"/></Types>')
+        archive.writestr("xl/workbook.xml", f'<workbook xmlns="{main}" xmlns:r="{relations}"><sheets>' + "".join(
+            f'<sheet name="{escape(name)}" sheetId="{i + 1}" r:id="rId{i + 1}"/>' for i, name in enumerate(sheets))
+            + "</sheets></workbook>")
+        archive.writestr("xl/_rels/workbook.xml.rels", f'<Relationships xmlns="{package}">' + "".join(
+            f'<Relationship Id="rId{i + 1}" Target="worksheets/sheet{i + 1}.xml"/>' for i in range(len(sheets)))
+            + "</Relationships>")
+        for i, rows in enumerate(sheets.values()):
+            with archive.open(f"xl/worksheets/sheet{i + 1}.xml", "w") as f:
+                f.write(f'<worksheet xmlns="{main}"><sheetData>'.encode())
+                for r, row in enumerate(rows):
+                    cells = []
+                    for c, value in enumerate(row):
+                        reference = f"{_cell_name(c)}{r + 1}"
+                        if value == "":
+                            continue
+                        if value.replace(".", "", 1).isdigit():
+                            cells.append(f'<c r="{reference}"><v>{value}</v></c>')
+                        else:
+                            index = strings.setdefault(value, len(strings))
+                            cells.append(f'<c r="{reference}" t="s"><v>{index}</v></c>')
+                    f.write(f'<row r="{r + 1}">{"".join(cells)}</row>'.encode())
+                f.write(b"</sheetData></worksheet>")
+        archive.writestr("xl/sharedStrings.xml", f'<sst xmlns="{main}">' + "".join(
+            f"<si><t>{escape(x)}</t></si>" for x in strings) + "</sst>")
+
+
+def csv_to_xlsx(paths: list, path: str):
+    """Write csv files as sheets of one workbook."""
+    import csv
+    sheets = {}
+    for csv_path in paths:
+        with open(csv_path, encoding="utf-8") as f:
+            sheets[os.path.splitext(os.path.basename(csv_path))[0]] = list(csv.reader(f))
+    write_xlsx(path, sheets)
+
+
+def _fresh(path: str) -> Analyzer:
+    """Get freshly loaded analyzer."""
+    analyzer = Analyzer()
+    analyzer.load_results(path)
+    return analyzer
+
+
+def _rate(paths: list) -> rating.RatingEngine:
+    """Get ratings of regattas."""
+    engine = rating.RatingEngine()
+    for path in paths:
+        engine.add_regatta(path)
+    return engine
+
+
+def _aggregate(paths: list) -> list:
+    """Get sailor table of regattas with every regatta spilled to disk, 1 kB is less than one regatta's records."""
+    with aggregator.Aggregator(max_memory=1 << 10) as records:
+        for path in paths:
+            records.add_regatta(path, 0, "")
+        return records.table(("sailor",))
+
+
+def measure(func, setup=None, repeat: int = 5) -> dict:
+    """Time function, setup is not timed."""
+    times = []
+    for _ in range(repeat):
+        arg = setup() if setup else None
+        start = time.perf_counter()
+        func(arg) if setup else func()
+        times.append(time.perf_counter() - start)
+    return {"runs": repeat, "min": min(times), "median": statistics.median(times), "mean": statistics.mean(times)}
+
+
+def get_scenarios(paths: list, work_dir: str) -> list:
+    """Get list of (name, func, setup)."""
+    import examples
+    plain = paths[1] if len(paths) > 1 else paths[0]
+    finals = paths[0]
+    sink = io.StringIO
+    scenarios = [
+        ("load_results", lambda: _fresh(plain), None),
+        ("load_results finals", lambda: _fresh(finals), None),
+        ("load_matrix", lambda: results_matrix.load_matrix(plain), None),
+    ]
+    workbook = os.path.join(work_dir, "season.xlsx")
+    csv_to_xlsx(paths, workbook)
+    scenarios.append(("load_results xlsx", lambda: Analyzer().load_results(workbook, os.path.basename(plain)[:-4]),
+                      None))
+    for discount in (0, 1, 2):
+        scenarios.append((f"get_results discount={discount}",
+                          lambda a, d=discount: a.get_results(discount=d), lambda: _fresh(plain)))
+    scenarios.append(("get_results races=-2", lambda a: a.get_results(discount=1, races=-2), lambda: _fresh(plain)))
+    scenarios.append(("get_results every race x discount 0-2",
+                      lambda a: [a.get_results(d, r) for r in range(1, len(a.data[0].races) + 1)
+                                 for d in range(min(3, r))],
+                      lambda: _fresh(plain)))
+    scenarios.append(("Sailor stats loop", lambda a: [(x.avg_place(1), x.std_dev, x.best_race, x.get_worst_race(1))
+                                                      for x in a.data], lambda: _fresh(plain)))
+    scenarios.append(("get_fleet_stats", lambda a: a.get_fleet_stats(1), lambda: _fresh(plain)))
+    scenarios.append(("get_results_progressive", lambda a: a.get_results_progressive(2), lambda: _fresh(plain)))
+    scenarios.append(("get_results_final_gold", lambda a: a.get_results_final_gold(discount=1),
+                      lambda: _fresh(finals)))
+    scenarios.append(("Regatta scenarios", lambda r: [getattr(r, x)() for x in scoring_rules.REGATTA_RULES],
+                      lambda: Regatta(finals)))
+    scenarios.append(("Regatta scenarios x3", lambda r: [getattr(r, x)() for _ in range(3)
+                                                         for x in scoring_rules.REGATTA_RULES],
+                      lambda: Regatta(finals)))
+    scenarios.append(("Regatta.get_results_batch", lambda r: r.get_results_batch(scoring_rules.REGATTA_RULES),
+                      lambda: Regatta(finals)))
+    split = os.path.join(work_dir, "split.csv")
+    generate_split_regatta(split, generate_fleet(400, random.Random(0)), seed=0)
+    scenarios.append(("get_results split 400 get_results", lambda a: a.get_results(discount=1),
+                      lambda: _fresh(split)))
+    scenarios.append(("get_results split 400 get_results_split", lambda a: a.get_results_split(discount=1),
+                      lambda: _fresh(split)))
+    for name in ["get_results", "get_results_finals", "get_results_old1", "get_results_old2", "get_results_old3",
+                 "get_results_new1", "get_results_new2", "get_results_new3", "get_results_new4",
+                 "get_results_new5", "get_results_new6"]:
+        scenarios.append((f"Season.{name}", lambda n=name: getattr(Season(paths), n)(), None))
+    scenarios.append(("Season.load_sync", lambda: Season(paths).load_sync(), None))
+    scenarios.append(("simulate_regatta 10000", lambda a: simulator.simulate_regatta(a, 2, simulations=10000, seed=0),
+                      lambda: _fresh(plain)))
+    scenarios.append(("RatingEngine season", lambda: _rate(paths), None))
+    scenarios.append(("HeadToHead season", lambda: head_to_head.HeadToHead().add_files(paths).wins, None))
+    scenarios.append(("Aggregator season", lambda: _aggregate(paths), None))
+    scenarios.append(("simulate_season 10000", lambda: simulator.simulate_season(Season(paths), simulations=10000,
+                                                                                seed=0), None))
+
+    graph = os.path.join(work_dir, "Graph")
+    scenarios += [
+        ("examples.write_file", lambda r: examples.write_file(sink(), r.get_results_normal(),
+                                                              r.get_results_newfinals_1(), False),
+         lambda: Regatta(plain)),
+        ("examples.write_medium_correl",
+         lambda r: examples.write_medium_correl(sink(), graph, r.get_results_normal(), r.get_results_newfinals_1(),
+                                                r.get_results_newfinals_2(), r.get_results_newfinals_3()),
+         lambda: Regatta(plain)),
+        ("examples.write_table",
+         lambda r: examples.write_table(sink(), r.get_results_normal_finals(), r.get_results_normal(),
+                                        r.get_results_2(), r.get_results_3(), r.get_results_4()),
+         lambda: Regatta(finals)),
+        ("examples.write_year", lambda s: examples.write_year(sink(), s.get_results_finals(), s.get_results(), paths),
+         lambda: Season(paths)),
+        ("examples.write_medium_correl_year",
+         lambda s: examples.write_medium_correl_year(sink(), graph, s.get_results(), s.get_results_new1(),
+                                                     s.get_results_new2(), s.get_results_new3()),
+         lambda: Season(paths)),
+    ]
+    return scenarios
+
+
+def run(fleet: int = 40, races: int = 8, regattas: int = 5, repeat: int = 5, seed: int = 0, only: str = None) -> dict:
+    """Run benchmarks."""
+    results = {}
+    with tempfile.TemporaryDirectory() as work_dir:
+        paths = generate_season(work_dir, regattas=regattas, fleet_size=fleet, races=races, seed=seed)
+        for name, func, setup in get_scenarios(paths, work_dir):
+            if only and only not in name:
+                continue
+            results[name] = measure(func, setup, repeat)
+            print(f"{name:<40} {results[name]['median'] * 1000:>10.3f} ms", file=sys.stderr)
+    return {
+        "meta": {"python": platform.python_version(), "platform": platform.platform(), "time": time.time(),
+                 "fleet": fleet, "races": races, "regattas": regattas, "repeat": repeat, "seed": seed},
+        "results": results,
+    }
+
+
+def compare(old: dict, new: dict, threshold: float = 0.1) -> list:
+    """Get scenarios slower than threshold."""
+    slower = []
+    for name, result in new["results"].items():
+        if name in old["results"]:
+            ratio = result["median"] / old["results"][name]["median"]
+            if ratio > 1 + threshold:
+                slower.append((name, ratio))
+    return slower
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark results analyzer on synthetic regattas.")
+    parser.add_argument("--fleet", type=int, default=40)
+    parser.add_argument("--races", type=int, default=8)
+    parser.add_argument("--regattas", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--only", help="run only scenarios containing this text")
+    parser.add_argument("--output", default="benchmark.json")
+    parser.add_argument("--compare", help="previous benchmark json to compare against")
+    args = parser.parse_args()
+    report = run(args.fleet, args.races, args.regattas, args.repeat, args.seed, args.only)
+    with open(args.output, "w") as out:
+        json.dump(report, out, indent=2)
+    if args.compare:
+        with open(args.compare) as prev:
+            for scenario, slowdown in compare(json.load(prev), report):
+                print(f"REGRESSION {scenario}: {slowdown:.2f}x slower", file=sys.stderr)
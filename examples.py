@@ -3,6 +3,8 @@ from results_analyzer import Analyzer
 from season import Regatta, Season
 from grapher import draw_graph
 import os
+import sys
+import instrumentation
 from numpy import array
 from scipy.stats import pearsonr
 
@@ -27,6 +29,16 @@ def get_line_syntax(races_count, separator, show_finals=False, display_stats=Fal
                     "Total", "Nett", separator, "Silver", "Gold", "Change", show_finals, display_stats)
 
 
+def sailor_places(sailors):
+    """Get {sailor id: index} of Sailor list."""
+    return {x.sailor_id: j for j, x in enumerate(sailors)}
+
+
+def row_places(rows):
+    """Get {name: index} of season results rows."""
+    return {x[0]: j for j, x in enumerate(rows)}
+
+
 def write_file(f, original, analyzed, original_has_finals):
     changes = []
     correl = []
@@ -36,14 +48,14 @@ def write_file(f, original, analyzed, original_has_finals):
     f.write("\t | \t")
     f.write(get_line_syntax(len(analyzed[0].races), "\t", not original_has_finals, True))
     f.write("\n")
+    original_places = sailor_places(original)
+    analyzed_places = sailor_places(analyzed)
     for i, sailor in enumerate(original):
-        for b in original:
-            if analyzed[i].name == b.name:
-                orig = original.index(b)
+        if analyzed[i].sailor_id in original_places:
+            orig = original_places[analyzed[i].sailor_id]
         change = orig - i
-        for g in analyzed:
-            if sailor.name == g.name:
-                ch = i - analyzed.index(g)
+        if sailor.sailor_id in analyzed_places:
+            ch = i - analyzed_places[sailor.sailor_id]
         chan += abs(ch)
         f.write(get_line(i + 1, sailor.name, sailor.club, sailor.races, sailor.get_points_after(races = len(sailor.races)),
                          sailor.get_points_after(races = len(sailor.races), discount=1), "\t", sailor.silver, sailor.gold, change, original_has_finals, False))
@@ -78,11 +90,11 @@ def write_file(f, original, analyzed, original_has_finals):
 def create_array(list1, list2, count):
     x = []
     y = []
+    places = sailor_places(list2)
     for i, line in enumerate(list1):
         x.append(i+1)
-        for j, line2 in enumerate(list2):
-            if line.name == line2.name:
-                y.append(j+1)
+        if line.sailor_id in places:
+            y.append(places[line.sailor_id] + 1)
         if i == count:
             break
     return x, y
@@ -91,11 +103,11 @@ def create_array(list1, list2, count):
 def create_array_season(list1, list2, count):
     x = []
     y = []
+    places = row_places(list2)
     for i, line in enumerate(list1):
         x.append(i+1)
-        for j, line2 in enumerate(list2):
-            if line[0] == line2[0]:
-                y.append(j+1)
+        if line[0] in places:
+            y.append(places[line[0]] + 1)
         if i == count:
             break
     return x, y
@@ -124,11 +136,11 @@ def write_year(f, original, converted, files):
     changes = []
     correl = []
     n = -1
+    places = row_places(original)
     for i, row in enumerate(original):
-        for k in original:
-            if converted[i][0] == k[0]:
-                change = original.index(k) - i
-                chan = chan + change
+        if converted[i][0] in places:
+            change = places[converted[i][0]] - i
+            chan = chan + change
         if i == 2 or 5 * n + 4 == i and i < 20:
             changes.append(round(chan / (i + 1), 2))
             x1, y1 = create_array_season(original, converted, i)
@@ -180,23 +192,11 @@ def write_medium_correl(f, path, original, list1, list2, list3):
     x = []
     y = []
     n = -1
+    places = [sailor_places(x) for x in (list1, list2, list3)]
     for i, sailor in enumerate(original):
         x.append(i+1)
-        a = 0
-        b = 0
-        for j, man in enumerate(list1):
-            if sailor.name == man.name:
-                a += j + 1
-                b += 1
-            if sailor.name == list2[j].name:
-                a += j + 1
-                b += 1
-            if sailor.name == list3[j].name:
-                a += j + 1
-                b += 1
-            if b == 3:
-                break
-        y.append(a/3)
+        sailor_id = sailor.sailor_id
+        y.append(sum(p[sailor_id] + 1 for p in places if sailor_id in p)/3)
         if i == 2 or 5 * n + 4 == i and i < 20:
             if i == 9:
                 draw_graph(x, y, path)
@@ -211,23 +211,10 @@ def write_medium_correl_year(f, path, original, list1, list2, list3):
     x = []
     y = []
     n = -1
+    places = [row_places(x) for x in (list1, list2, list3)]
     for i, sailor in enumerate(original):
         x.append(i+1)
-        a = 0
-        b = 0
-        for j, man in enumerate(list1):
-            if sailor[0] == man[0]:
-                a += j + 1
-                b += 1
-            if sailor[0] == list2[j][0]:
-                a += j + 1
-                b += 1
-            if sailor[0] == list3[j][0]:
-                a += j + 1
-                b += 1
-            if b == 3:
-                break
-        y.append(a/3)
+        y.append(sum(p[sailor[0]] + 1 for p in places if sailor[0] in p)/3)
         if i == 2 or 5 * n + 4 == i and i < 20:
             if i == 9:
                 draw_graph(x, y, path)
@@ -253,24 +240,13 @@ def write_table(f,original,list1,list2,list3,list4=None):
     d = []
     e = []
     tablematrix = []
+    places = [sailor_places(x) if x else {} for x in (list1, list2, list3, list4)]
     for i, sailor in enumerate(original):
         a.append(i+1)
-        end = 0
-        for j, man in enumerate(list1):
-            if sailor.name == man.name:
-                end += 1
-                b.append(j+1)
-            if sailor.name == list2[j].name:
-                end += 1
-                c.append(j+1)
-            if sailor.name == list3[j].name:
-                end += 1
-                d.append(j+1)
-            if list4 and sailor.name == list4[j].name:
-                end += 1
-                e.append(j+1)
-            if end == 4:
-                break
+        sailor_id = sailor.sailor_id
+        for column, column_places in zip((b, c, d, e), places):
+            if sailor_id in column_places:
+                column.append(column_places[sailor_id] + 1)
         if i == 2 or 5 * n + 4 == i and i < 20:
             maybe = [int(pearsonr(a, b)[0] * 100) / 100, int(pearsonr(a, c)[0] * 100) / 100,
                      int(pearsonr(a, d)[0] * 100) / 100]
@@ -324,82 +300,112 @@ def write_fulltable(f, matrix):
             f.write("\n")
 
 
-if __name__ == "__main__":
-    analyzer = Analyzer()
-    year_folders = [f.path for f in os.scandir("./Data/") if f.is_dir()]
+instrumentation.instrument(sys.modules[__name__], ["write_file", "write_year", "write_medium_correl",
+                                                   "write_medium_correl_year", "write_table", "write_fulltable",
+                                                   "pearsonr", "draw_graph"])
+
+
+def csv_files(boat: str) -> list:
+    """Get results csv file names of class folder in regatta order."""
+    return sorted(x for x in os.listdir(boat) if x.endswith(".csv"))
+
+
+def write_regatta_report(boat: str, k: int, file: str) -> list:
+    """Write k.txt report and graphs of regatta, return its correlation table."""
+    regatta = Regatta(file)
+    picpath = boat + "/" + "Graph " + str(k)
+    if regatta.analyzer.is_finals():
+        filew = boat+ "/" +str(k)+".txt"
+        f = open(filew, "w")
+        write_file(f, regatta.get_results_normal_finals(), regatta.get_results_normal(), True)
+        write_file(f, regatta.get_results_normal_finals(), regatta.get_results_2(), True)
+        write_file(f, regatta.get_results_normal_finals(), regatta.get_results_3(), True)
+        write_medium_correl(f, picpath, regatta.get_results_normal_finals(), regatta.get_results_normal(),
+                            regatta.get_results_2(), regatta.get_results_3())
+        write_file(f, regatta.get_results_normal_finals(), regatta.get_results_4(), True)
+        compmatrix = write_table(f, regatta.get_results_normal_finals(), regatta.get_results_normal(),
+                            regatta.get_results_2(), regatta.get_results_3(), regatta.get_results_4())
+        f.close()
+    else:
+        filew = boat+ "/" +str(k) + ".txt"
+        picpath2 = boat + "/" + "Graph " + str(k) + ".1.png"
+        f = open(filew, "w")
+        write_file(f, regatta.get_results_normal(), regatta.get_results_newfinals_1(), False)
+        write_file(f, regatta.get_results_normal(), regatta.get_results_newfinals_2(), False)
+        write_file(f, regatta.get_results_normal(), regatta.get_results_newfinals_3(), False)
+        write_medium_correl(f, picpath, regatta.get_results_normal(), regatta.get_results_newfinals_1(),
+                            regatta.get_results_newfinals_2(), regatta.get_results_newfinals_3())
+        compmatrix = write_table(f, regatta.get_results_normal(), regatta.get_results_newfinals_1(),
+                    regatta.get_results_newfinals_2(), regatta.get_results_newfinals_3())
+        write_file(f, regatta.get_results_normal(), regatta.get_results_oldfinals_1(), False)
+        write_file(f, regatta.get_results_normal(), regatta.get_results_oldfinals_2(), False)
+        write_file(f, regatta.get_results_normal(), regatta.get_results_oldfinals_3(), False)
+        write_medium_correl(f, picpath2, regatta.get_results_normal(), regatta.get_results_oldfinals_1(),
+                            regatta.get_results_oldfinals_2(), regatta.get_results_oldfinals_3())
+        compmatrix1 = write_table(f, regatta.get_results_normal(), regatta.get_results_oldfinals_1(),
+                            regatta.get_results_oldfinals_2(), regatta.get_results_oldfinals_3())
+        f.close()
+        for g,com in enumerate(compmatrix):
+            com += compmatrix1[g]
+    return compmatrix
+
+
+def write_season_report(boat: str, year: int, files: list):
+    """Write conclusion.txt and year graphs of class season."""
+    season = Season(files)
+    ypicpath = boat + "/" + "Year Graph"
+    if year > 2014:
+        filew = boat+ "/conclusion" + ".txt"
+        f = open(filew, "w")
+        write_year(f, season.get_results_finals(), season.get_results(), files)
+        write_year(f, season.get_results_finals(), season.get_results_old1(), files)
+        write_year(f, season.get_results_finals(), season.get_results_old2(), files)
+        write_medium_correl_year(f, ypicpath, season.get_results_finals(), season.get_results(), season.get_results_old1(), season.get_results_old2())
+        write_year(f, season.get_results_finals(), season.get_results_old3(), files)
+        f.close()
+    else:
+        filew = boat+ "/conclusion" + ".txt"
+        ypicpath2 = boat + "/" + "Year Graph 1"
+        f = open(filew, "w")
+        write_year(f, season.get_results(), season.get_results_new1(), files)
+        write_year(f, season.get_results(), season.get_results_new2(), files)
+        write_year(f, season.get_results(), season.get_results_new3(), files)
+        write_medium_correl_year(f, ypicpath, season.get_results(), season.get_results_new1(), season.get_results_new2(), season.get_results_new3())
+        write_year(f, season.get_results(), season.get_results_new4(), files)
+        write_year(f, season.get_results(), season.get_results_new5(), files)
+        write_year(f, season.get_results(), season.get_results_new6(), files)
+        write_medium_correl_year(f, ypicpath2, season.get_results(), season.get_results_new4(), season.get_results_new5(),
+                                 season.get_results_new6())
+        f.close()
+
+
+def write_correl_table(boat: str, yearmatrix: list):
+    """Write Correl table.txt of class season."""
+    ofile = boat + "/Correl table.txt"
+    with open(ofile, "w") as f:
+        write_fulltable(f, yearmatrix)
+
+
+def write_class(boat: str, year: int):
+    """Write all reports of class folder."""
+    files = [os.path.join(boat, x) for x in csv_files(boat)]
+    yearmatrix = [write_regatta_report(boat, k + 1, file) for k, file in enumerate(files)]
+    write_season_report(boat, year, files)
+    write_correl_table(boat, yearmatrix)
+
+
+def main(data: str = "./Data/"):
+    """Write reports of every Data/<year>/<class> folder."""
+    year_folders = [f.path for f in os.scandir(data) if f.is_dir()]
     for folder in year_folders:
         class_folders = [f.path for f in os.scandir(folder) if f.is_dir()]
         for boat in class_folders:
-            k = 0
-            files = []
-            yearmatrix = []
-            for csvfile in os.listdir(boat):
-                if csvfile.endswith(".csv"):
-                    k += 1
-                    file = os.path.join(boat, csvfile)
-                    files.append(file)
-                    regatta = Regatta(file)
-                    analyzer.load_results(file)
-                    picpath = boat + "/" + "Graph " + str(k)
-                    if analyzer.is_finals():
-                        filew = boat+ "/" +str(k)+".txt"
-                        f = open(filew, "w")
-                        write_file(f, regatta.get_results_normal_finals(), regatta.get_results_normal(), True)
-                        write_file(f, regatta.get_results_normal_finals(), regatta.get_results_2(), True)
-                        write_file(f, regatta.get_results_normal_finals(), regatta.get_results_3(), True)
-                        write_medium_correl(f, picpath, regatta.get_results_normal_finals(), regatta.get_results_normal(),
-                                            regatta.get_results_2(), regatta.get_results_3())
-                        write_file(f, regatta.get_results_normal_finals(), regatta.get_results_4(), True)
-                        compmatrix = write_table(f, regatta.get_results_normal_finals(), regatta.get_results_normal(),
-                                            regatta.get_results_2(), regatta.get_results_3(), regatta.get_results_4())
-                        f.close()
-                    else:
-                        filew = boat+ "/" +str(k) + ".txt"
-                        picpath2 = boat + "/" + "Graph " + str(k) + ".1.png"
-                        f = open(filew, "w")
-                        write_file(f, regatta.get_results_normal(), regatta.get_results_newfinals_1(), False)
-                        write_file(f, regatta.get_results_normal(), regatta.get_results_newfinals_2(), False)
-                        write_file(f, regatta.get_results_normal(), regatta.get_results_newfinals_3(), False)
-                        write_medium_correl(f, picpath, regatta.get_results_normal(), regatta.get_results_newfinals_1(),
-                                            regatta.get_results_newfinals_2(), regatta.get_results_newfinals_3())
-                        compmatrix = write_table(f, regatta.get_results_normal(), regatta.get_results_newfinals_1(),
-                                    regatta.get_results_newfinals_2(), regatta.get_results_newfinals_3())
-                        write_file(f, regatta.get_results_normal(), regatta.get_results_oldfinals_1(), False)
-                        write_file(f, regatta.get_results_normal(), regatta.get_results_oldfinals_2(), False)
-                        write_file(f, regatta.get_results_normal(), regatta.get_results_oldfinals_3(), False)
-                        write_medium_correl(f, picpath2, regatta.get_results_normal(), regatta.get_results_oldfinals_1(),
-                                            regatta.get_results_oldfinals_2(), regatta.get_results_oldfinals_3())
-                        compmatrix1 = write_table(f, regatta.get_results_normal(), regatta.get_results_oldfinals_1(),
-                                            regatta.get_results_oldfinals_2(), regatta.get_results_oldfinals_3())
-                        f.close()
-                        for g,com in enumerate(compmatrix):
-                            com += compmatrix1[g]
-                    yearmatrix.append(compmatrix)
-            season = Season(files)
-            ypicpath = boat + "/" + "Year Graph"
-            if int(folder.replace(os.curdir + "/Data/", "")) > 2014:
-                filew = boat+ "/conclusion" + ".txt"
-                f = open(filew, "w")
-                write_year(f, season.get_results_finals(), season.get_results(), files)
-                write_year(f, season.get_results_finals(), season.get_results_old1(), files)
-                write_year(f, season.get_results_finals(), season.get_results_old2(), files)
-                write_medium_correl_year(f, ypicpath, season.get_results_finals(), season.get_results(), season.get_results_old1(), season.get_results_old2())
-                write_year(f, season.get_results_finals(), season.get_results_old3(), files)
-                f.close()
-            else:
-                filew = boat+ "/conclusion" + ".txt"
-                ypicpath2 = boat + "/" + "Year Graph 1"
-                f = open(filew, "w")
-                write_year(f, season.get_results(), season.get_results_new1(), files)
-                write_year(f, season.get_results(), season.get_results_new2(), files)
-                write_year(f, season.get_results(), season.get_results_new3(), files)
-                write_medium_correl_year(f, ypicpath, season.get_results(), season.get_results_new1(), season.get_results_new2(), season.get_results_new3())
-                write_year(f, season.get_results(), season.get_results_new4(), files)
-                write_year(f, season.get_results(), season.get_results_new5(), files)
-                write_year(f, season.get_results(), season.get_results_new6(), files)
-                write_medium_correl_year(f, ypicpath2, season.get_results(), season.get_results_new4(), season.get_results_new5(),
-                                         season.get_results_new6())
-                f.close()
-            ofile = boat + "/Correl table.txt"
-            with open(ofile, "w") as f:
-                write_fulltable(f, yearmatrix)
\ No newline at end of file
+            write_class(boat, int(os.path.basename(folder)))
+
+
+instrumentation.instrument(sys.modules[__name__], ["write_regatta_report", "write_season_report",
+                                                   "write_correl_table"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""Place statistics of every sailor in a regatta or season."""
+import csv
+import sys
+import numpy as np
+import instrumentation
+import progressive
+import season_matrix
+
+COLUMNS = ["name", "races", "mean", "median", "stdev", "best", "worst", "cv", "iqr", "volatility", "rank_change"]
+
+
+class FleetStats:
+    """Statistics table, one row per sailor."""
+
+    def __init__(self, names: list, columns: dict):
+        """Init, columns maps column name to array in names order."""
+        self.names = names
+        self.columns = columns
+
+    def __len__(self):
+        """Len."""
+        return len(self.names)
+
+    def column(self, name: str):
+        """Get column as array."""
+        if name == "name":
+            return np.array(self.names, dtype=str)
+        return self.columns[name]
+
+    def rows(self) -> list:
+        """Get table as list of tuples in COLUMNS order."""
+        return list(zip(self.names, *[self.columns[x].tolist() for x in COLUMNS[1:]]))
+
+    def to_array(self):
+        """Get table as structured numpy array."""
+        return np.rec.fromarrays([self.column(x) for x in COLUMNS], names=COLUMNS)
+
+    def to_csv(self, f):
+        """Write table to csv file or path."""
+        if isinstance(f, str):
+            with open(f, "w", newline="", encoding="utf-8") as fi:
+                return self.to_csv(fi)
+        writer = csv.writer(f)
+        writer.writerow(COLUMNS)
+        writer.writerows(self.rows())
+
+
+def _quantile(ascending, counts, q: float):
+    """Get linear interpolated quantile of rows sorted ascending with counts values each."""
+    position = np.maximum(counts - 1, 0) * q
+    low = np.floor(position).astype(np.int64)
+    high = np.ceil(position).astype(np.int64)
+    low_values = np.take_along_axis(ascending, low[:, None], axis=1)[:, 0]
+    high_values = np.take_along_axis(ascending, high[:, None], axis=1)[:, 0]
+    return np.where(counts > 0, low_values + (high_values - low_values) * (position - low), np.nan)
+
+
+def place_stats(values, mask=None, discount: int = 0, discardable=None) -> dict:
+    """Get place statistics of values (sailors, races) where mask is set.
+
+    Mean is Sailor.avg_place(discount), worst is Sailor.get_worst_race(discount), stdev is the sample standard
+    deviation like Sailor.std_dev, nan where a statistic is not defined.
+    """
+    values = np.asarray(values, dtype=float)
+    mask = np.ones(values.shape, dtype=bool) if mask is None else np.asarray(mask, dtype=bool)
+    discardable = mask if discardable is None else mask & discardable
+    counts = mask.sum(axis=1)
+    if values.shape[1] == 0:
+        values = np.zeros((len(values), 1))
+        mask = discardable = np.zeros(values.shape, dtype=bool)
+    ascending = np.sort(np.where(mask, values, np.inf), axis=1)
+    descending = -np.sort(np.where(mask, -values, np.inf), axis=1)
+    dropped = -np.sort(np.where(discardable, -values, np.inf), axis=1)[:, :discount]
+    dropped = np.where(np.isinf(dropped), 0.0, dropped).sum(axis=1)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        total = np.where(mask, values, 0.0).sum(axis=1)
+        mean = (total - dropped) / (counts - discount)
+        mean = np.where(counts > discount, mean, np.nan)
+        plain_mean = total / counts
+        deviation = np.where(mask, values - plain_mean[:, None], 0.0)
+        stdev = np.sqrt((deviation ** 2).sum(axis=1) / (counts - 1))
+        stdev = np.where(counts > 1, stdev, np.nan)
+        best = np.where(counts > 0, ascending[:, 0], np.nan)
+        worst = descending[:, min(discount, descending.shape[1] - 1)]
+        worst = np.where(counts > discount, worst, np.nan)
+        return {
+            "races": counts,
+            "mean": mean,
+            "median": _quantile(ascending, counts, 0.5),
+            "stdev": stdev,
+            "best": best,
+            "worst": worst,
+            "cv": stdev / plain_mean,
+            "iqr": _quantile(ascending, counts, 0.75) - _quantile(ascending, counts, 0.25),
+        }
+
+
+def rank_volatility(positions, mask=None) -> tuple:
+    """Get (stdev of standing, mean absolute standing change) of positions (cutoffs, sailors) where mask is set."""
+    positions = np.asarray(positions, dtype=float)
+    mask = positions > 0 if mask is None else np.asarray(mask, dtype=bool)
+    counts = mask.sum(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = np.where(mask, positions, 0.0).sum(axis=0) / counts
+        deviation = np.where(mask, positions - mean, 0.0)
+        volatility = np.where(counts > 1, np.sqrt((deviation ** 2).sum(axis=0) / (counts - 1)), np.nan)
+        steps = mask[1:] & mask[:-1]
+        changes = np.where(steps, np.abs(np.diff(positions, axis=0)), 0.0).sum(axis=0) / steps.sum(axis=0)
+    return volatility, np.where(steps.sum(axis=0) > 0, changes, np.nan)
+
+
+def regatta_stats(analyzer, discount: int = 1) -> FleetStats:
+    """Get statistics of race places, rank volatility is of standings after every race with discount."""
+    points = np.array([[x.points for x in sailor.races] for sailor in analyzer.data], dtype=float)
+    discardable = np.array([[x.discardable for x in sailor.races] for sailor in analyzer.data], dtype=bool)
+    points = points.reshape(len(analyzer.data), -1)
+    discardable = discardable.reshape(points.shape)
+    columns = place_stats(points, discount=discount, discardable=discardable)
+    if points.shape[1]:
+        standings = progressive.progressive(points, discardable, discount)
+        columns["volatility"], columns["rank_change"] = rank_volatility(standings.positions[:, discount])
+    else:
+        columns["volatility"] = columns["rank_change"] = np.full(len(points), np.nan)
+    return FleetStats([x.name for x in analyzer.data], columns)
+
+
+def season_stats(season, discount: int = 0) -> FleetStats:
+    """Get statistics of regatta places in season results, rank volatility is of standings after every regatta."""
+    base = season.get_points_base(season.get_regatta(0, season.regattas[0]).get_results_normal())
+    dic = {name: row[:-2] for name, row in season.get_results()}
+    matrix = season_matrix.SeasonMatrix.from_dict(dic)
+    width = int(matrix.counts.max()) if len(matrix.keys) else 0
+    places = np.array([[base - x.points + 1 for x in dic[key]] + [0] * (width - len(dic[key]))
+                       for key in matrix.keys], dtype=float).reshape(len(matrix.keys), width)
+    mask = np.arange(width) < matrix.counts[:, None]
+    columns = place_stats(places, mask, discount)
+
+    regattas = matrix.shape[1]
+    positions = np.zeros((regattas, len(matrix.keys)), dtype=np.int64)
+    for cutoff in range(1, regattas + 1):
+        entries = matrix.regattas <= cutoff
+        sailed = np.bincount(matrix.rows[entries], minlength=len(matrix.keys)) > 0
+        standings = season_matrix.aggregate(season_matrix.SeasonMatrix(
+            matrix.keys, matrix.rows[entries], matrix.regattas[entries], matrix.points[entries],
+            matrix.extras[entries]))
+        order = standings.order[sailed[standings.order]]
+        positions[cutoff - 1, order] = np.arange(1, len(order) + 1)
+    columns["volatility"], columns["rank_change"] = rank_volatility(positions)
+    return FleetStats(matrix.keys, columns)
+
+
+instrumentation.instrument(sys.modules[__name__], ["regatta_stats", "season_stats"])
@@ -0,0 +1,234 @@
+"""Head-to-head records of sailors across races and regattas as sparse sailor x sailor matrices."""
+import argparse
+import json
+import os
+import sys
+import numpy as np
+import scipy.sparse
+import instrumentation
+import rating
+import registry
+import store
+from results_matrix import load_matrix
+
+
+def race_counts(points, rated) -> tuple:
+    """Get (wins, races) sparse sailors x sailors matrices of one regatta.
+
+    wins[i, j] is number of races where i had less points than j and races[i, j] number of races both were rated in,
+    the diagonal is left out. Win pairs are taken from the order of each race and summed by a sparse product, there
+    is no dense sailors x sailors matrix.
+    """
+    size = len(points)
+    common = scipy.sparse.csr_matrix(rated, dtype=np.int64)
+    races = (common @ common.T).tocoo()
+    other = races.row != races.col
+    races = scipy.sparse.coo_matrix((races.data[other], (races.row[other], races.col[other])), shape=(size, size))
+    places, counts, beaten = [np.zeros(0, dtype=np.int64)], [np.zeros(0, dtype=np.int64)], [np.zeros(0, dtype=np.int64)]
+    for race in range(points.shape[1]):
+        sailors = np.flatnonzero(rated[:, race])
+        sailors = sailors[np.argsort(points[sailors, race], kind="stable")]
+        race_points = points[sailors, race]
+        # a sailor beats everyone after the last sailor with equal points
+        first = np.searchsorted(race_points, race_points, side="right")
+        beats = len(sailors) - first
+        starts = np.cumsum(beats) - beats
+        places.append(sailors)
+        counts.append(beats)
+        beaten.append(sailors[np.arange(beats.sum()) + np.repeat(first - starts, beats)])
+    places, counts, beaten = np.concatenate(places), np.concatenate(counts), np.concatenate(beaten)
+    # row n of beaten_by are the sailors beaten by the sailor of place n
+    beaten_by = scipy.sparse.csr_matrix((np.ones(len(beaten), dtype=np.int64), beaten,
+                                         np.concatenate([[0], np.cumsum(counts)])), shape=(len(places), size))
+    sailor_places = scipy.sparse.csr_matrix((np.ones(len(places), dtype=np.int64), (places, np.arange(len(places)))),
+                                            shape=(size, len(places)))
+    return (sailor_places @ beaten_by).tocoo(), races
+
+
+class HeadToHead:
+    """Head-to-head record of every pair of sailors by registry id."""
+
+    def __init__(self, absent: list = None, sailors: registry.SailorRegistry = None, pending: int = 1000000):
+        """Init, pending is number of buffered pairs summed into the matrices at once."""
+        self.absent = rating.ABSENT if absent is None else absent
+        self.registry = sailors if sailors is not None else registry.SailorRegistry()
+        self.pending = pending
+        self._wins = scipy.sparse.csr_matrix((0, 0), dtype=np.int64)
+        self._races = scipy.sparse.csr_matrix((0, 0), dtype=np.int64)
+        self._losses = None
+        self._buffer = []
+        self._buffered = 0
+        self.files = []
+        self.fingerprints = {}
+
+    def reset(self):
+        """Drop records, added files and sailors."""
+        self.registry = registry.SailorRegistry()
+        self._wins = scipy.sparse.csr_matrix((0, 0), dtype=np.int64)
+        self._races = scipy.sparse.csr_matrix((0, 0), dtype=np.int64)
+        self._losses = None
+        self._buffer = []
+        self._buffered = 0
+        self.files = []
+        self.fingerprints = {}
+
+    def __len__(self):
+        """Len."""
+        return len(self.registry)
+
+    def add_matrix(self, matrix, name: str = None):
+        """Add races of ResultsMatrix."""
+        ids = self.registry.matrix_ids(matrix)
+        wins, races = race_counts(*rating.rated_points(matrix, self.absent))
+        self._buffer.append((ids[wins.row], ids[wins.col], wins.data, ids[races.row], ids[races.col], races.data))
+        self._buffered += len(wins.data) + len(races.data)
+        if self._buffered >= self.pending:
+            self._flush()
+        self.files.append(name)
+
+    def add_regatta(self, path: str, name: str = None):
+        """Parse results file and add its races, name (default path) is the key of the file in files."""
+        self.add_matrix(load_matrix(path), path if name is None else name)
+
+    def add_files(self, paths: list):
+        """Add results files, e.g. regattas of a season."""
+        for path in paths:
+            self.add_regatta(path)
+        return self
+
+    def add_archive(self, data: str = "./Data/", since: int = None, until: int = None):
+        """Add results files of Data/<year>/<class> tree of years since to until.
+
+        Files are known by their path relative to data and a hash of their contents, files added before are skipped.
+        Records of a file can not be taken out, so when an added file was edited or removed everything is counted
+        again.
+        """
+        files = [(year, os.path.relpath(path, data), path) for year, _, _, path in store.archive_files(data)]
+        fingerprints = {name: store.file_fingerprint(path) for _, name, path in files}
+        if any(self.fingerprints.get(x) is None or self.fingerprints[x] != fingerprints.get(x) for x in self.files):
+            self.reset()
+        done = set(self.files)
+        for year, name, path in files:
+            if name not in done and (since is None or year >= since) and (until is None or year <= until):
+                self.add_regatta(path, name)
+                self.fingerprints[name] = fingerprints[name]
+        return self
+
+    def _flush(self):
+        """Sum buffered pairs into the matrices."""
+        size = len(self.registry)
+        wins = self._resized(self._wins, size)
+        races = self._resized(self._races, size)
+        if self._buffer:
+            win_rows, win_columns, win_counts, rows, columns, common = [np.concatenate(x) for x in zip(*self._buffer)]
+            wins = wins + scipy.sparse.coo_matrix((win_counts, (win_rows, win_columns)), shape=(size, size)).tocsr()
+            races = races + scipy.sparse.coo_matrix((common, (rows, columns)), shape=(size, size)).tocsr()
+        self._wins, self._races, self._losses = wins, races, None
+        self._buffer = []
+        self._buffered = 0
+
+    @staticmethod
+    def _resized(matrix, size: int):
+        """Get csr matrix grown to size x size."""
+        if matrix.shape == (size, size):
+            return matrix
+        return scipy.sparse.csr_matrix((matrix.data, matrix.indices, np.append(
+            matrix.indptr, np.full(size - matrix.shape[0], matrix.indptr[-1]))), shape=(size, size))
+
+    @property
+    def wins(self):
+        """Get csr matrix of races row sailor beat column sailor."""
+        if self._buffer or self._wins.shape[0] != len(self.registry):
+            self._flush()
+        return self._wins
+
+    @property
+    def losses(self):
+        """Get csr matrix of races row sailor lost to column sailor, the transpose of wins kept for row access."""
+        wins = self.wins
+        if self._losses is None:
+            self._losses = wins.T.tocsr()
+        return self._losses
+
+    @property
+    def races(self):
+        """Get csr matrix of races sailed together."""
+        if self._buffer or self._races.shape[0] != len(self.registry):
+            self._flush()
+        return self._races
+
+    def _id(self, name: str, sail_nr: str = None) -> int:
+        """Get registry id of sailor."""
+        sailor_id = self.registry.find(name, sail_nr)
+        if sailor_id is None:
+            raise ValueError(f"Unknown sailor {name}!")
+        return sailor_id
+
+    def pair(self, name: str, other: str, sail_nr: str = None, other_sail_nr: str = None) -> dict:
+        """Get record of sailor against other sailor."""
+        first, second = self._id(name, sail_nr), self._id(other, other_sail_nr)
+        races = int(self.races[first, second])
+        wins, losses = int(self.wins[first, second]), int(self.wins[second, first])
+        return {"races": races, "wins": wins, "losses": losses, "ties": races - wins - losses}
+
+    def opponents(self, name: str, sail_nr: str = None, min_races: int = 1) -> list:
+        """Get [(opponent, races, wins, losses, ties)] of sailor, most common races first."""
+        sailor_id = self._id(name, sail_nr)
+        row = self.races[sailor_id]
+        columns, races = row.indices, row.data
+        keep = races >= min_races
+        columns, races = columns[keep], races[keep]
+        wins = self.wins[sailor_id].toarray()[0][columns]
+        losses = self.losses[sailor_id].toarray()[0][columns]
+        order = np.lexsort((columns, -races))
+        return [(self.registry.names[columns[n]], int(races[n]), int(wins[n]), int(losses[n]),
+                 int(races[n] - wins[n] - losses[n])) for n in order]
+
+    def save(self, path: str):
+        """Save matrices and registry to npz file, file is replaced at once."""
+        wins, races = self.wins.tocsr(), self.races.tocsr()
+        meta = {"absent": self.absent, "files": self.files, "fingerprints": self.fingerprints,
+                "registry": self.registry.to_dict()}
+        temporary = path + ".tmp"
+        with open(temporary, "wb") as f:
+            np.savez(f, wins_data=wins.data, wins_indices=wins.indices, wins_indptr=wins.indptr,
+                     races_data=races.data, races_indices=races.indices, races_indptr=races.indptr,
+                     meta=np.array(json.dumps(meta, ensure_ascii=False)))
+        os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, path: str):
+        """Load from npz file."""
+        with np.load(path) as data:
+            meta = json.loads(str(data["meta"]))
+            head_to_head = cls(meta["absent"], registry.SailorRegistry.from_dict(meta["registry"]))
+            size = len(head_to_head.registry)
+            head_to_head._wins = scipy.sparse.csr_matrix(
+                (data["wins_data"], data["wins_indices"], data["wins_indptr"]), shape=(size, size))
+            head_to_head._races = scipy.sparse.csr_matrix(
+                (data["races_data"], data["races_indices"], data["races_indptr"]), shape=(size, size))
+        head_to_head.files = meta["files"]
+        head_to_head.fingerprints = meta.get("fingerprints", {})
+        return head_to_head
+
+
+instrumentation.instrument(HeadToHead, ["add_matrix", "_flush"])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Head-to-head record of sailors across races.")
+    parser.add_argument("data", nargs="?", default="./Data/")
+    parser.add_argument("sailors", nargs="*", help="one sailor for all opponents, two for their record")
+    parser.add_argument("--file", help="npz file to load and save the records")
+    parser.add_argument("--min-races", type=int, default=1)
+    args = parser.parse_args()
+
+    records = HeadToHead.load(args.file) if args.file and os.path.exists(args.file) else HeadToHead()
+    records.add_archive(args.data)
+    if args.file:
+        records.save(args.file)
+    if len(args.sailors) == 2:
+        print(json.dumps(records.pair(*args.sailors), ensure_ascii=False))
+    elif len(args.sailors) == 1:
+        for opponent, races, wins, losses, ties in records.opponents(args.sailors[0], min_races=args.min_races):
+            print(f"{opponent:<30} {races:>5} {wins:>5} {losses:>5} {ties:>5}")
@@ -0,0 +1,128 @@
+"""Opt-in call counting and timing.
+
+Set RESULTS_ANALYZER_PROFILE to 1/table or json (or call enable()) to time the registered hot paths.
+The summary is written to stderr at exit, or to RESULTS_ANALYZER_PROFILE_FILE if set.
+When disabled the original functions are left in place, so there is no overhead.
+"""
+import atexit
+import functools
+import json
+import os
+import sys
+import time
+
+ENV_VAR = "RESULTS_ANALYZER_PROFILE"
+FILE_ENV_VAR = "RESULTS_ANALYZER_PROFILE_FILE"
+
+_targets = []
+_stats = {}
+_enabled = False
+_report_format = None
+
+
+def _label(owner, name: str) -> str:
+    """Get label for attribute."""
+    if isinstance(owner, type):
+        return f"{owner.__name__}.{name}"
+    module = owner.__name__
+    if module == "__main__" and getattr(owner, "__file__", None):
+        module = os.path.splitext(os.path.basename(owner.__file__))[0]
+    return f"{module}.{name}"
+
+
+def _wrap(label: str, func):
+    """Wrap function with timer."""
+    stat = _stats.setdefault(label, [0, 0.0, 0.0])
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            stat[0] += 1
+            stat[1] += time.perf_counter() - wall
+            stat[2] += time.process_time() - cpu
+    wrapper.__instrumented__ = func
+    return wrapper
+
+
+def _patch(owner, name: str):
+    """Replace attribute with timed wrapper."""
+    original = vars(owner)[name]
+    if not hasattr(original, "__instrumented__"):
+        setattr(owner, name, _wrap(_label(owner, name), original))
+
+
+def instrument(owner, names: list):
+    """Register functions of class or module for timing."""
+    for name in names:
+        _targets.append((owner, name))
+        if _enabled:
+            _patch(owner, name)
+
+
+def enable(report: str = "table"):
+    """Start timing registered functions, report is 'table', 'json' or None for no report at exit."""
+    global _enabled, _report_format
+    if not _enabled:
+        _enabled = True
+        for owner, name in _targets:
+            _patch(owner, name)
+    if report and _report_format is None:
+        atexit.register(dump)
+    _report_format = report or _report_format
+
+
+def disable():
+    """Stop timing and restore original functions."""
+    global _enabled
+    _enabled = False
+    for owner, name in _targets:
+        func = vars(owner)[name]
+        if hasattr(func, "__instrumented__"):
+            setattr(owner, name, func.__instrumented__)
+
+
+def is_enabled() -> bool:
+    """Check if instrumentation is enabled."""
+    return _enabled
+
+
+def reset():
+    """Reset collected stats."""
+    for stat in _stats.values():
+        stat[:] = [0, 0.0, 0.0]
+
+
+def summary() -> dict:
+    """Get {label: {calls, wall, cpu}} for called functions."""
+    return {label: {"calls": stat[0], "wall": stat[1], "cpu": stat[2]}
+            for label, stat in sorted(_stats.items(), key=lambda x: x[1][1], reverse=True) if stat[0]}
+
+
+def format_table() -> str:
+    """Get summary as text table."""
+    lines = ["{0:<45} {1:>10} {2:>12} {3:>12} {4:>12}".format("Function", "Calls", "Wall ms", "CPU ms",
+                                                              "Wall/call us")]
+    for label, stat in summary().items():
+        lines.append("{0:<45} {1:>10d} {2:>12.3f} {3:>12.3f} {4:>12.3f}".format(
+            label, stat["calls"], stat["wall"] * 1000, stat["cpu"] * 1000, stat["wall"] / stat["calls"] * 10**6))
+    return "\n".join(lines)
+
+
+def dump(report: str = None):
+    """Write summary to stderr or profile file."""
+    report = report or _report_format or "table"
+    text = json.dumps(summary(), indent=2) if report == "json" else format_table()
+    path = os.environ.get(FILE_ENV_VAR)
+    if path:
+        with open(path, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text, file=sys.stderr)
+
+
+if os.environ.get(ENV_VAR, "").lower() not in ("", "0", "false", "no"):
+    enable("json" if os.environ[ENV_VAR].lower() == "json" else "table")
@@ -0,0 +1,233 @@
+"""Incremental report build, only reports whose inputs changed are written again.
+
+Nodes of a Data/<year>/<class> folder are: one report per regatta csv (k.txt and graphs, its correlation table is
+kept in the state file), the season conclusion (all csv files of the class) and the correlation table (all
+regatta correlation tables). Every node stores the fingerprint of its inputs and is rebuilt when it changes or
+an output file is missing. Regatta nodes are keyed by csv file, a report that only got a new number k is renamed,
+outputs of removed csv files are deleted.
+"""
+import argparse
+import ast
+import hashlib
+import json
+import os
+import sys
+import time
+import examples
+import instrumentation
+import store
+
+STATE_FILE = ".pipeline.json"
+REPORT_MODULE = "examples.py"
+
+
+def fingerprint(*parts) -> str:
+    """Get hash of json serializable parts."""
+    return hashlib.sha256(json.dumps(parts, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def code_files(module: str = REPORT_MODULE) -> list:
+    """Get module and every module of this folder it imports, directly or not."""
+    folder = os.path.dirname(os.path.abspath(__file__))
+    files, todo = set(), [module]
+    while todo:
+        name = todo.pop()
+        if name in files or not os.path.isfile(os.path.join(folder, name)):
+            continue
+        files.add(name)
+        with open(os.path.join(folder, name), encoding="utf-8") as f:
+            tree = ast.parse(f.read(), name)
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                todo += [x.name.split(".")[0] + ".py" for x in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                todo.append(node.module.split(".")[0] + ".py")
+    return sorted(files)
+
+
+def code_fingerprint() -> str:
+    """Get hash of report code, reports are rebuilt when it changes."""
+    folder = os.path.dirname(os.path.abspath(__file__))
+    return fingerprint([(x, store.file_fingerprint(os.path.join(folder, x))) for x in code_files()])
+
+
+def load_state(path: str) -> dict:
+    """Get saved state, empty if there is none."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def save_state(path: str, state: dict):
+    """Save state, file is replaced at once so an interrupted build keeps the old state."""
+    temporary = path + ".tmp"
+    with open(temporary, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(temporary, path)
+
+
+def _stale(node: dict, key: str) -> bool:
+    """Check if node must be built again."""
+    return node is None or node.get("fingerprint") != key or not all(os.path.exists(x) for x in node["outputs"])
+
+
+def regatta_outputs(boat: str, k: int) -> list:
+    """Get files a regatta report can write, graphs are only drawn for some fleets."""
+    return [os.path.join(boat, x) for x in (f"{k}.txt", f"Graph {k}.png", f"Graph {k}.1.png")]
+
+
+def season_outputs(boat: str) -> list:
+    """Get files a season report can write."""
+    return [os.path.join(boat, x) for x in ("conclusion.txt", "Year Graph.png", "Year Graph 1.png")]
+
+
+def _remove(paths: list):
+    """Delete files, missing ones are skipped."""
+    for path in paths:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def _written(paths: list) -> list:
+    """Get the files of paths that exist."""
+    return [x for x in paths if os.path.exists(x)]
+
+
+def _renumber(boat: str, moves: list):
+    """Rename outputs of regatta reports [(node, new k)], through temporary names so numbers can be swapped."""
+    pending = []
+    for node, k in moves:
+        renamed = [(old, new) for old, new in zip(regatta_outputs(boat, node["k"]), regatta_outputs(boat, k))
+                   if old in node["outputs"]]
+        for old, _ in renamed:
+            os.replace(old, old + ".move")
+        pending += renamed
+        node["k"], node["outputs"] = k, [new for _, new in renamed]
+    for old, new in pending:
+        os.replace(old + ".move", new)
+
+
+def build_class(boat: str, year: int, force: bool = False, code: str = None) -> list:
+    """Build stale reports of class folder, return names of rebuilt nodes."""
+    code = code or code_fingerprint()
+    state_path = os.path.join(boat, STATE_FILE)
+    state = {} if force else load_state(state_path)
+    regattas = state.get("regattas", {})
+    built = []
+
+    names = examples.csv_files(boat)
+    files = [os.path.join(boat, x) for x in names]
+    sources = [store.file_fingerprint(x) for x in files]
+    numbers = {name: k for k, name in enumerate(names, 1)}
+    for name in set(regattas) - set(names):
+        _remove(regattas.pop(name)["outputs"])
+    moves = []
+    for name, source in zip(names, sources):
+        node = regattas.get(name)
+        if _stale(node, fingerprint(code, source)):
+            if node is not None:
+                _remove(node["outputs"])
+                del regattas[name]
+        elif node["k"] != numbers[name]:
+            moves.append((node, numbers[name]))
+            built.append(f"{name} -> {numbers[name]}")
+    _renumber(boat, moves)
+    state["regattas"] = regattas
+    save_state(state_path, state)
+
+    new_regattas = {}
+    for name, file, source in zip(names, files, sources):
+        key = fingerprint(code, source)
+        node = regattas.get(name)
+        if node is None:
+            k = numbers[name]
+            _remove(regatta_outputs(boat, k))
+            compmatrix = examples.write_regatta_report(boat, k, file)
+            node = {"fingerprint": key, "k": k, "outputs": _written(regatta_outputs(boat, k)),
+                    "compmatrix": compmatrix, "result": fingerprint(compmatrix)}
+            built.append(name)
+        new_regattas[name] = node
+    state["regattas"] = new_regattas
+    save_state(state_path, state)
+
+    key = fingerprint(code, sources, year)
+    if _stale(state.get("season"), key):
+        _remove(season_outputs(boat))
+        examples.write_season_report(boat, year, files)
+        state["season"] = {"fingerprint": key, "outputs": _written(season_outputs(boat))}
+        built.append("conclusion")
+        save_state(state_path, state)
+
+    yearmatrix = [new_regattas[x]["compmatrix"] for x in names]
+    key = fingerprint(code, [new_regattas[x]["result"] for x in names])
+    if _stale(state.get("table"), key):
+        examples.write_correl_table(boat, yearmatrix)
+        state["table"] = {"fingerprint": key, "outputs": [os.path.join(boat, "Correl table.txt")]}
+        built.append("correl table")
+        save_state(state_path, state)
+    return built
+
+
+def class_folders(data: str) -> list:
+    """Get [(class folder, year)] of Data/<year>/<class> tree."""
+    folders = []
+    for year in sorted((x for x in os.scandir(data) if x.is_dir() and x.name.isdigit()), key=lambda x: x.name):
+        folders += [(x.path, int(year.name)) for x in sorted(os.scandir(year.path), key=lambda x: x.name)
+                    if x.is_dir()]
+    return folders
+
+
+def build(data: str = "./Data/", force: bool = False) -> dict:
+    """Build stale reports of every class folder, return {class folder: rebuilt nodes}."""
+    code = code_fingerprint()
+    return {boat: build_class(boat, year, force, code) for boat, year in class_folders(data)}
+
+
+def snapshot(data: str) -> dict:
+    """Get (modified time, size) of every csv file in tree."""
+    files = {}
+    for boat, _ in class_folders(data):
+        for name in examples.csv_files(boat):
+            stat = os.stat(os.path.join(boat, name))
+            files[os.path.join(boat, name)] = (stat.st_mtime_ns, stat.st_size)
+    return files
+
+
+def watch(data: str = "./Data/", interval: float = 2.0, callback=None):
+    """Build and then poll for new, edited or removed csv files, building again after changes."""
+    callback = callback or (lambda result: None)
+    callback(build(data))
+    files = snapshot(data)
+    while True:
+        time.sleep(interval)
+        current = snapshot(data)
+        if current != files:
+            files = current
+            callback(build(data))
+
+
+instrumentation.instrument(sys.modules[__name__], ["build_class"])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write only reports whose results files changed.")
+    parser.add_argument("data", nargs="?", default="./Data/")
+    parser.add_argument("--force", action="store_true", help="rebuild everything")
+    parser.add_argument("--watch", action="store_true", help="keep running and rebuild on changes")
+    parser.add_argument("--interval", type=float, default=2.0)
+    args = parser.parse_args()
+
+    def report(result: dict):
+        for boat, nodes in result.items():
+            if nodes:
+                print(f"{boat}: {', '.join(nodes)}", file=sys.stderr)
+
+    if args.watch:
+        try:
+            watch(args.data, args.interval, report)
+        except KeyboardInterrupt:
+            pass
+    else:
+        report(build(args.data, args.force))
@@ -0,0 +1,96 @@
+"""Standings after every race for several discard counts in one pass."""
+import sys
+import numpy as np
+import instrumentation
+import scoring
+
+
+class ProgressiveStandings:
+    """Standings of every race cutoff and discount."""
+
+    def __init__(self, names: list, nett, order):
+        """Init, nett and order are (races, discounts, sailors), cutoff r is index r - 1 and invalid cells are -1."""
+        self.names = names
+        self.nett = nett
+        self.order = order
+
+    @property
+    def shape(self) -> tuple:
+        """Get (races, discounts, sailors)."""
+        return self.order.shape
+
+    @property
+    def positions(self):
+        """Get 1-based place of every sailor (races, discounts, sailors), -1 where races <= discount."""
+        races, discounts, sailors = self.shape
+        positions = np.full(self.shape, -1, dtype=np.int64)
+        valid = self.order[..., 0] >= 0
+        places = np.empty((int(valid.sum()), sailors), dtype=np.int64)
+        np.put_along_axis(places, self.order[valid], np.arange(1, sailors + 1), axis=-1)
+        positions[valid] = places
+        return positions
+
+    def standings(self, discount: int = 0, races: int = None) -> list:
+        """Get row order like Analyzer.get_results(discount, races)."""
+        races = scoring.race_count(self.shape[0], races)
+        if races <= discount or discount < 0 or discount >= self.shape[1] or races > self.shape[0]:
+            raise ValueError("You cannot discount all races nor negative amount of races!")
+        return self.order[races - 1, discount].tolist()
+
+    def history(self, row: int, discount: int = 0) -> list:
+        """Get place of sailor after every race, None before discount is possible."""
+        return [x if x > 0 else None for x in self.positions[:, discount, row].tolist()]
+
+
+def _insert(values, column, descending: bool = False):
+    """Insert column into rows of sorted values (sailors, n)."""
+    sailors, width = values.shape
+    if descending:
+        at = (values >= column[:, None]).sum(axis=1)
+    else:
+        at = (values <= column[:, None]).sum(axis=1)
+    index = np.arange(width + 1)
+    padded = np.concatenate([values, column[:, None]], axis=1)
+    shifted = np.concatenate([column[:, None], values], axis=1)
+    return np.where(index < at[:, None], padded, np.where(index == at[:, None], column[:, None], shifted))
+
+
+def progressive(points, discardable=None, max_discount: int = 2, names: list = None) -> ProgressiveStandings:
+    """Get standings after every race of points (sailors, races) for discounts 0..max_discount.
+
+    Totals and the first tie break part are prefix sums, sorted race points and worst discardable races are kept by
+    inserting each race into the previous cutoff, nett points use the same float arithmetic as
+    Sailor.get_points_after, so every cutoff and discount equals Analyzer.get_results(discount, races).
+    """
+    points = np.asarray(points, dtype=float)
+    sailors, races = points.shape
+    discardable = np.ones(points.shape, dtype=bool) if discardable is None else np.asarray(discardable, dtype=bool)
+    discounts = max_discount + 1
+    nett = np.full((races, discounts, sailors), np.nan)
+    order = np.full((races, discounts, sailors), -1, dtype=np.int64)
+
+    total = np.zeros(sailors)
+    second = np.zeros(sailors)
+    ascending = np.zeros((sailors, 0))
+    worst = np.zeros((sailors, 0))
+    for r in range(races):
+        total = total + points[:, r]
+        second = second + (r + 1)**7 * points[:, r] * 10**-15
+        ascending = _insert(ascending, points[:, r])
+        worst = _insert(worst, np.where(discardable[:, r], points[:, r], -np.inf), descending=True)
+        first = scoring.running_sum(ascending * np.array([(i + 1)**-1 for i in range(r + 1)]) * 10**-3)
+        discounted = np.cumsum(np.where(np.isinf(worst), 0.0, worst), axis=1)
+        for d in range(min(discounts, r + 1)):
+            nett[r, d] = (total + (first + second)) - (discounted[:, d - 1] if d else 0.0)
+            order[r, d] = np.argsort(nett[r, d], kind="stable")
+    return ProgressiveStandings(names, nett, order)
+
+
+def from_analyzer(analyzer, max_discount: int = 2) -> ProgressiveStandings:
+    """Get progressive standings of Analyzer data."""
+    points = [[x.points for x in sailor.races] for sailor in analyzer.data]
+    discardable = [[x.discardable for x in sailor.races] for sailor in analyzer.data]
+    return progressive(points, discardable, max_discount, [x.name for x in analyzer.data])
+
+
+instrumentation.instrument(sys.modules[__name__], ["progressive"])
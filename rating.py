@@ -0,0 +1,229 @@
+"""All-time Elo rating of sailors, every race of every regatta is a multi-player ranking.
+
+Each race updates the ratings of its sailors at once: every pair of sailors is a game won by the better place, so the
+update is the row sum of an N x N outcome minus expected score matrix. Big fleets are scored in row blocks so the
+matrix never has more than block_size rows, or only against the window nearest places.
+"""
+import argparse
+import json
+import os
+import sys
+import numpy as np
+import instrumentation
+import registry
+import special_codes
+import store
+from results_matrix import load_matrix
+
+ABSENT = ["DNC", "DNS"]
+
+
+def rated_points(matrix, absent: list = None) -> tuple:
+    """Get (points, rated) matrices of ResultsMatrix, races without points or with absent codes are not rated."""
+    points, _ = matrix.scored_points()
+    codes = [special_codes.code_id(x) for x in (ABSENT if absent is None else absent)]
+    return points, (points > 0) & ~np.isin(matrix.codes, codes)
+
+
+def expected(ratings, other, scale: float = 400.0):
+    """Get expected scores of ratings (rows) against other ratings (columns)."""
+    return 1 / (1 + 10 ** ((other[None, :] - ratings[:, None]) / scale))
+
+
+def outcome(points, other):
+    """Get scores of points (rows) against other points (columns), lower points win and ties are half."""
+    return (points[:, None] < other[None, :]) + 0.5 * (points[:, None] == other[None, :])
+
+
+def pairwise_delta(ratings, points, scale: float = 400.0):
+    """Get summed score minus expected score of every sailor against the others of the race."""
+    return (outcome(points, points) - expected(ratings, ratings, scale)).sum(axis=1)
+
+
+def blocked_delta(ratings, points, scale: float = 400.0, block_size: int = 256):
+    """Get pairwise_delta in blocks of block_size rows."""
+    delta = np.empty(len(ratings))
+    for start in range(0, len(ratings), block_size):
+        rows = slice(start, start + block_size)
+        delta[rows] = (outcome(points[rows], points) - expected(ratings[rows], ratings, scale)).sum(axis=1)
+    return delta
+
+
+def window_delta(ratings, points, scale: float = 400.0, window: int = 10) -> tuple:
+    """Get (delta, games) of sailors against only the window nearest places on both sides."""
+    order = np.argsort(points, kind="stable")
+    delta = np.zeros(len(ratings))
+    games = np.zeros(len(ratings))
+    for distance in range(1, min(window, len(order) - 1) + 1):
+        first, second = order[:-distance], order[distance:]
+        score = (points[first] < points[second]) + 0.5 * (points[first] == points[second])
+        change = score - 1 / (1 + 10 ** ((ratings[second] - ratings[first]) / scale))
+        np.add.at(delta, first, change)
+        np.add.at(delta, second, -change)
+        np.add.at(games, first, 1)
+        np.add.at(games, second, 1)
+    return delta, games
+
+
+class RatingEngine:
+    """Ratings of all sailors by registry id."""
+
+    def __init__(self, k: float = 32.0, initial: float = 1500.0, scale: float = 400.0, block_size: int = 256,
+                 window: int = None, absent: list = None, sailors: registry.SailorRegistry = None):
+        """Init, fleets bigger than block_size are scored in blocks, or against window nearest places if set.
+
+        Race codes in absent (default DNC and DNS) and races without points are not rated.
+        """
+        self.k = k
+        self.initial = initial
+        self.scale = scale
+        self.block_size = block_size
+        self.window = window
+        self.absent = ABSENT if absent is None else absent
+        self.registry = sailors if sailors is not None else registry.SailorRegistry()
+        self.ratings = np.zeros(0)
+        self.races = np.zeros(0, dtype=np.int64)
+        self.files = []
+        self.fingerprints = {}
+
+    def reset(self):
+        """Drop ratings, rated files and sailors."""
+        self.registry = registry.SailorRegistry()
+        self.ratings = np.zeros(0)
+        self.races = np.zeros(0, dtype=np.int64)
+        self.files = []
+        self.fingerprints = {}
+
+    def __len__(self):
+        """Len."""
+        return len(self.registry)
+
+    def _grow(self):
+        """Add initial ratings of new registry ids."""
+        added = len(self.registry) - len(self.ratings)
+        if added > 0:
+            self.ratings = np.concatenate([self.ratings, np.full(added, self.initial)])
+            self.races = np.concatenate([self.races, np.zeros(added, dtype=np.int64)])
+
+    def update_race(self, ids, points):
+        """Rate one race of sailors ids with points."""
+        if len(ids) < 2:
+            return
+        ratings = self.ratings[ids]
+        if len(ids) <= self.block_size:
+            delta = pairwise_delta(ratings, points, self.scale) / (len(ids) - 1)
+        elif self.window:
+            delta, games = window_delta(ratings, points, self.scale, self.window)
+            delta = delta / np.maximum(games, 1)
+        else:
+            delta = blocked_delta(ratings, points, self.scale, self.block_size) / (len(ids) - 1)
+        np.add.at(self.ratings, ids, self.k * delta)
+        np.add.at(self.races, ids, 1)
+
+    def add_matrix(self, matrix, name: str = None):
+        """Rate every race of ResultsMatrix in order."""
+        ids = self.registry.matrix_ids(matrix)
+        self._grow()
+        points, rated = rated_points(matrix, self.absent)
+        for race in range(matrix.races):
+            self.update_race(ids[rated[:, race]], points[rated[:, race], race])
+        self.files.append(name)
+
+    def add_regatta(self, path: str, name: str = None):
+        """Parse results file and rate its races, name (default path) is the key of the file in files."""
+        self.add_matrix(load_matrix(path), path if name is None else name)
+
+    def run(self, data: str = "./Data/", checkpoint: str = None, every: int = 50, callback=None) -> int:
+        """Rate results files of Data/<year>/<class> tree in date order, return number of rated files.
+
+        Files are known by their path relative to data and a hash of their contents. Files rated before (e.g. by a
+        loaded checkpoint) are skipped, so an interrupted run resumes where it stopped. Ratings depend on the order
+        of races, so when a rated file was edited or removed, or a new file comes before a rated one, everything is
+        rated again from the start.
+        The checkpoint is saved every `every` files and at the end.
+        """
+        paths = [x[3] for x in store.archive_files(data, date_order=True)]
+        names = [os.path.relpath(x, data) for x in paths]
+        fingerprints = {name: store.file_fingerprint(path) for name, path in zip(names, paths)}
+        done = set(self.files)
+        last = max((n for n, name in enumerate(names) if name in done), default=-1)
+        if (any(self.fingerprints.get(x) is None or self.fingerprints[x] != fingerprints.get(x) for x in self.files)
+                or any(x not in done for x in names[:last])):
+            self.reset()
+            done = set()
+        count = 0
+        for name, path in zip(names, paths):
+            if name in done:
+                continue
+            self.add_regatta(path, name)
+            self.fingerprints[name] = fingerprints[name]
+            count += 1
+            if callback:
+                callback(path)
+            if checkpoint and count % every == 0:
+                self.save(checkpoint)
+        if checkpoint:
+            self.save(checkpoint)
+        return count
+
+    def rating(self, name: str, sail_nr: str = None) -> float:
+        """Get rating of sailor, initial rating for unknown sailors."""
+        sailor_id = self.registry.find(name, sail_nr)
+        return self.initial if sailor_id is None else float(self.ratings[sailor_id])
+
+    def table(self, min_races: int = 1) -> list:
+        """Get [(name, club, rating, races)] best first."""
+        rated = np.flatnonzero(self.races >= min_races)
+        order = rated[np.argsort(-self.ratings[rated], kind="stable")]
+        return [(self.registry.names[x], self.registry.clubs[x], float(self.ratings[x]), int(self.races[x]))
+                for x in order]
+
+    def save(self, path: str):
+        """Save checkpoint, file is replaced at once so an interrupted save keeps the old one."""
+        meta = {"k": self.k, "initial": self.initial, "scale": self.scale, "block_size": self.block_size,
+                "window": self.window, "absent": self.absent, "files": self.files, "fingerprints": self.fingerprints,
+                "registry": self.registry.to_dict()}
+        temporary = path + ".tmp"
+        with open(temporary, "wb") as f:
+            np.savez(f, ratings=self.ratings, races=self.races, meta=np.array(json.dumps(meta, ensure_ascii=False)))
+        os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, path: str):
+        """Load checkpoint."""
+        with np.load(path) as data:
+            meta = json.loads(str(data["meta"]))
+            ratings, races = data["ratings"], data["races"]
+        engine = cls(meta["k"], meta["initial"], meta["scale"], meta["block_size"], meta["window"], meta["absent"],
+                     registry.SailorRegistry.from_dict(meta["registry"]))
+        engine.ratings, engine.races, engine.files = ratings, races, meta["files"]
+        engine.fingerprints = meta.get("fingerprints", {})
+        return engine
+
+
+instrumentation.instrument(RatingEngine, ["add_matrix", "run"])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rate all sailors of results archive.")
+    parser.add_argument("data", nargs="?", default="./Data/")
+    parser.add_argument("--checkpoint", help="npz file to resume from and save to")
+    parser.add_argument("--k", type=float, help="rating change factor, default 32")
+    parser.add_argument("--window", type=int, help="rate big fleets only against this many nearest places")
+    parser.add_argument("--min-races", type=int, default=10)
+    parser.add_argument("--top", type=int, default=50)
+    args = parser.parse_args()
+
+    if args.checkpoint and os.path.exists(args.checkpoint):
+        engine = RatingEngine.load(args.checkpoint)
+        changed = [f"--{name} {value} (checkpoint has {getattr(engine, name)})"
+                   for name, value in [("k", args.k), ("window", args.window)]
+                   if value is not None and value != getattr(engine, name)]
+        if changed:
+            parser.error(f"{args.checkpoint} was rated with other parameters: {', '.join(changed)}, "
+                         "use a new checkpoint")
+    else:
+        engine = RatingEngine(32.0 if args.k is None else args.k, window=args.window)
+    engine.run(args.data, args.checkpoint)
+    for n, (name, club, value, races) in enumerate(engine.table(args.min_races)[:args.top]):
+        print(f"{n + 1:>4} {name:<30} {club or '':<20} {value:>7.1f} {races:>5}")
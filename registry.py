@@ -0,0 +1,144 @@
+"""Sailor identity registry with dense integer ids."""
+import json
+import threading
+import unicodedata
+import numpy as np
+
+
+def normalize_name(name: str) -> str:
+    """Get name without case, diacritics and extra whitespace."""
+    if not name:
+        return ""
+    if name.isascii():
+        return " ".join(name.casefold().split())
+    name = unicodedata.normalize("NFKD", name.replace("\xa0", " "))
+    name = "".join(x for x in name if not unicodedata.combining(x))
+    return " ".join(name.casefold().split())
+
+
+def normalize_sail_nr(sail_nr: str) -> str:
+    """Get sail number without spaces, dashes and case."""
+    if not sail_nr:
+        return ""
+    return "".join(x for x in sail_nr.upper() if x.isalnum())
+
+
+class SailorRegistry:
+    """Registry of sailors across regattas.
+
+    Ids are local to the registry and the process, Sailor objects keep the id of the registry that gave it and get a
+    new one from any other registry, pickled Sailors (e.g. from a process pool) get ids again where they are used.
+    """
+
+    def __init__(self, match_sail_nr: bool = False):
+        """Init, with match_sail_nr the same name with different sail numbers are different sailors."""
+        self.match_sail_nr = match_sail_nr
+        self.names = []
+        self.sail_nrs = []
+        self.clubs = []
+        self._ids = {}
+        self._strings = {}
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        """Get state without lock."""
+        state = dict(vars(self))
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        """Set state."""
+        vars(self).update(state)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        """Len."""
+        return len(self.names)
+
+    def key(self, name: str, sail_nr: str = None) -> tuple:
+        """Get identity key of sailor."""
+        return (normalize_sail_nr(sail_nr) if self.match_sail_nr else "", normalize_name(name))
+
+    def intern(self, value: str) -> str:
+        """Get shared copy of string."""
+        if value is None:
+            return None
+        return self._strings.setdefault(value, value)
+
+    def get_id(self, name: str, sail_nr: str = None, club: str = None) -> int:
+        """Get id of sailor, new sailors get next id."""
+        key = self.key(name, sail_nr)
+        sailor_id = self._ids.get(key)
+        if sailor_id is None:
+            with self._lock:
+                sailor_id = self._ids.get(key)
+                if sailor_id is None:
+                    sailor_id = len(self.names)
+                    self.names.append(name)
+                    self.sail_nrs.append(sail_nr)
+                    self.clubs.append(self.intern(club))
+                    self._ids[key] = sailor_id
+        return sailor_id
+
+    def find(self, name: str, sail_nr: str = None) -> int:
+        """Get id of sailor, None for unknown sailors."""
+        return self._ids.get(self.key(name, sail_nr))
+
+    def sailor_id(self, sailor) -> int:
+        """Get id of Sailor, registering it if needed."""
+        if sailor.sailor_id is None or sailor.registry is not self:
+            sailor.sailor_id = self.get_id(sailor.name, sailor.sail_nr, sailor.club)
+            sailor.registry = self
+        return sailor.sailor_id
+
+    def register(self, sailors: list):
+        """Set ids of Sailor objects and share their club and nationality strings, return ids array."""
+        ids = []
+        for sailor in sailors:
+            sailor.club = self.intern(sailor.club)
+            sailor.nationality = self.intern(sailor.nationality)
+            ids.append(self.sailor_id(sailor))
+        return np.array(ids, dtype=np.int64)
+
+    def ids(self, sailors: list):
+        """Get ids of Sailor objects as array."""
+        return np.fromiter((self.sailor_id(x) for x in sailors), dtype=np.int64, count=len(sailors))
+
+    def matrix_ids(self, matrix):
+        """Get ids of ResultsMatrix rows as array, registering new sailors."""
+        sail_nrs = matrix.column("sail_nr")
+        return np.array([self.get_id(x, sail_nrs[n], matrix.clubs[n]) for n, x in enumerate(matrix.names)],
+                        dtype=np.int64)
+
+    def positions(self, sailors: list):
+        """Get array of first list index by sailor id, -1 for sailors not in list."""
+        ids = self.ids(sailors)
+        positions = np.full(len(self), -1, dtype=np.int64)
+        unique, first = np.unique(ids, return_index=True)
+        positions[unique] = first
+        return positions
+
+    def to_dict(self) -> dict:
+        """Get registry as json serializable dict."""
+        return {"match_sail_nr": self.match_sail_nr, "names": self.names, "sail_nrs": self.sail_nrs,
+                "clubs": self.clubs}
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        """Get registry from to_dict result."""
+        registry = cls(data["match_sail_nr"])
+        for name, sail_nr, club in zip(data["names"], data["sail_nrs"], data["clubs"]):
+            registry.get_id(name, sail_nr, club)
+        return registry
+
+    def save(self, path: str):
+        """Save registry to json file."""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path: str):
+        """Load registry from json file."""
+        with open(path, encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
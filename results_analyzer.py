@@ -1,14 +1,20 @@
 """Results analyzer."""
 import statistics
+import instrumentation
+import registry
+
+# brackets and dashes of discarded race cells
+_UNWANTED = str.maketrans("", "", "()[]-")
 
 
 class Place(object):
     """Place obj."""
 
-    def __init__(self, points: int, symbol: str):
+    def __init__(self, points: int, symbol: str, discardable: bool = None):
         """Init."""
         self.points = points
         self.symbol = symbol
+        self.discardable = symbol != 'DNE' if discardable is None else discardable
 
     def __le__(self, other):
         """Le."""
@@ -42,7 +48,7 @@ class Sailor:
     """Sailor"""
 
     def __init__(self, name: str, sail_nr: str, gender: str, sub_categories: list, nationality: str, races: list,
-                 club: str, silver: int = None, gold: int = None):
+                 club: str, silver: int = None, gold: int = None, qual_fleet: str = None, final_fleet: str = None):
         """Init."""
         self.name = name
         self.sail_nr = sail_nr
@@ -53,6 +59,16 @@ class Sailor:
         self.club = club
         self.silver = silver
         self.gold = gold
+        self.qual_fleet = qual_fleet
+        self.final_fleet = final_fleet
+        self.sailor_id = None
+        self.registry = None
+
+    def __getstate__(self):
+        """Get state, registry ids are local to the process so they are not pickled."""
+        state = dict(vars(self))
+        state["sailor_id"] = state["registry"] = None
+        return state
 
     @property
     def total_points(self) -> int:
@@ -75,12 +91,12 @@ class Sailor:
 
     def get_worst_race(self, discount: int = 0) -> Place:
         """Get place in worst race"""
-        discounted = sorted(self.races, key=lambda x: x.points, reverse=True)[:discount]
-        return max([x for x in self.races if x not in discounted], key=lambda x: x.points)
+        discounted = {id(x) for x in sorted(self.races, key=lambda x: x.points, reverse=True)[:discount]}
+        return max([x for x in self.races if id(x) not in discounted], key=lambda x: x.points)
 
     def get_points_after(self, races: int, discount: int = 0, calc_extras: bool = False):
         """Get points after x races."""
-        discounts = sum(sorted([x.points for x in self.races[:races] if x.symbol != 'DNE'], reverse=True)[:discount])
+        discounts = sum(sorted([x.points for x in self.races[:races] if x.discardable], reverse=True)[:discount])
         if calc_extras:
             extra = sum([(i + 1)**-1 * x.points * 10**-3 for i, x in
                          enumerate(sorted(self.races[:races], key=lambda x: x.points))])
@@ -91,8 +107,11 @@ class Sailor:
 
     def copy(self):
         """Copy."""
-        return Sailor(self.name, self.sail_nr, self.gender, self.sub_categories, self.nationality, self.races.copy(),
-                      self.club, self.silver, self.gold)
+        sailor = Sailor(self.name, self.sail_nr, self.gender, self.sub_categories, self.nationality, self.races.copy(),
+                        self.club, self.silver, self.gold, self.qual_fleet, self.final_fleet)
+        sailor.sailor_id = self.sailor_id
+        sailor.registry = self.registry
+        return sailor
 
     def fleet_races(self, races):
         if not races:
@@ -111,36 +130,90 @@ class Sailor:
 class Analyzer:
     """Results Analyzer."""
 
-    def __init__(self):
-        """Init."""
+    def __init__(self, sailors: registry.SailorRegistry = None):
+        """Init, loaded sailors get ids of sailors registry (default is a new registry of this analyzer)."""
+        self.registry = sailors if sailors is not None else registry.SailorRegistry()
         self.data = None
         self.syntax = None
-        self.special_codes = ["dne", "ocs", "ufd", "bfd", "dsq", "ret", "dnc", "dns"]
-
-    def load_results(self, file_name: str):
-        """Load results from file."""
+        self.race_series = None
+        self.matrix = None
+        self.codes = None
+        self.version = 0
+        self.special_codes = ["dne", "ocs", "ufd", "bfd", "dsq", "ret", "dnc", "dns", "dnf"]
+
+    def load_results(self, file_name: str, sheet=None):
+        """Load results from csv or xlsx file, sheet is xlsx sheet name or index."""
+        if file_name.lower().endswith(".xlsx"):
+            import xlsx_reader
+            self.load_lines(xlsx_reader.iter_rows(file_name, sheet))
+            return
         import csv
-        self.data = []
         with open(file_name, 'r') as f:
-            lines = csv.reader(f, delimiter=',')
-            for i, line in enumerate(lines):
-                if i == 0:
-                    self.try_get_syntax(line)
-                    continue
+            self.load_lines(csv.reader(f, delimiter=','))
 
-                obj = self.get_clean_data(line)
-                self.data.append(obj)
+    def load_lines(self, lines):
+        """Load results from csv rows."""
+        self.data = []
+        self.changed()
+        for i, line in enumerate(lines):
+            if i == 0:
+                self.try_get_syntax(line)
+                continue
+
+            obj = self.get_clean_data(line)
+            self.data.append(obj)
+        self.registry.register(self.data)
+        self.get_codes()
+
+    def get_codes(self):
+        """Get special code id matrix of races (sailors x races), codes are resolved once per data version."""
+        if self.codes is None:
+            import special_codes
+            self.codes = special_codes.sailor_codes(self.data or [])
+        return self.codes
+
+    def apply_codes(self, table=None, fleet_size: int = None):
+        """Score special codes in races by code table, default penalty is fleet size + 1."""
+        from special_codes import CodeTable
+        codes = self.get_codes()
+        (table or CodeTable(self.special_codes)).apply_to_sailors(self.data, fleet_size, codes)
+        self.changed()
+        # symbols did not change
+        self.codes = codes
+
+    def __getstate__(self):
+        """Get state without registry and code ids, they are local to the process.
+
+        Unpickled analyzers get a new registry and resolve codes again.
+        """
+        state = dict(vars(self))
+        del state["registry"]
+        state["matrix"] = state["codes"] = None
+        return state
+
+    def __setstate__(self, state):
+        """Set state."""
+        vars(self).update(state)
+        self.registry = registry.SailorRegistry()
+
+    def changed(self):
+        """Mark data as changed, results cached from older data are computed again."""
+        self.matrix = None
+        self.codes = None
+        self.version += 1
 
     def import_data(self, data: list):
         """Import races."""
         if isinstance(data, list) and isinstance(data[0], Sailor):
             self.data = data
+            self.changed()
         else:
             raise ValueError("Invalid data type for importing, must be list[Sailor]!")
 
     def try_get_syntax(self, data) -> bool:
         """Try to get syntax."""
         syntax = []
+        race_series = []
         for n in data:
             if n.lower() in ["sailno", "sailnr", "sail"]:
                 syntax.append("sail_nr")
@@ -156,13 +229,19 @@ class Analyzer:
                 syntax.append(f"sub_cat_{n}")  # something better here
             elif ((n.lower().startswith('r') or n.lower().startswith('q')) and n[1:].isdigit()) or n.lower().isdigit():
                 syntax.append("race")
+                race_series.append("Q" if n.lower().startswith('q') else "F")
             elif n.lower() in ["silver", "poolfinaal", "hõbe", "hõbefinaal"]:
                 syntax.append("silver")
             elif n.lower() in ["gold", "finaal", "kuldfinaal", "kuld"]:
                 syntax.append("gold")
+            elif n.lower() in ["fleet", "qfleet", "qualifying fleet", "laevastik", "grupp"]:
+                syntax.append("qual_fleet")
+            elif n.lower() in ["ffleet", "final fleet", "finalfleet", "finaalgrupp", "finaallaevastik"]:
+                syntax.append("final_fleet")
             else:
                 syntax.append("null")
         self.syntax = syntax
+        self.race_series = race_series
         if data:
             return True
         return False
@@ -178,28 +257,36 @@ class Analyzer:
         club = None
         silver = None
         gold = None
+        qual_fleet = None
+        final_fleet = None
+        syntax = self.syntax
         for i, node in enumerate(line):
-            if self.syntax[i] == "name":
+            kind = syntax[i]
+            # race cells are most of a row
+            if kind == "race":
+                races.append(self._get_clean_place(node.translate(_UNWANTED).strip()))
+            elif kind == "name":
                 name = node.replace(' ', ' ').strip()
-            elif self.syntax[i] == "sail_nr":
+            elif kind == "sail_nr":
                 sail_nr = node
-            elif self.syntax[i] == "club":
+            elif kind == "club":
                 club = node
-            elif self.syntax[i] == "nat":
+            elif kind == "nat":
                 nat = node
-            elif self.syntax[i] == "gender":
+            elif kind == "gender":
                 gender = node
-            elif "sub_cat" in self.syntax[i]:
-                sub_cats.append(self.syntax[i].replace("sub_cat_", ""))
-            elif self.syntax[i] == "race":
-                node = node.replace('(', '').replace(')', '').replace('[', '').replace(']', '').replace('-', '').strip()
-                races.append(self._get_clean_place(node))
-            elif self.syntax[i] == "silver":
+            elif "sub_cat" in kind:
+                sub_cats.append(kind.replace("sub_cat_", ""))
+            elif kind == "silver":
                 silver = self._get_clean_place(node) if node != '' else None
-            elif self.syntax[i] == "gold":
+            elif kind == "gold":
                 gold = self._get_clean_place(node) if node != '' else None
+            elif kind == "qual_fleet":
+                qual_fleet = node.strip() or None
+            elif kind == "final_fleet":
+                final_fleet = node.strip() or None
 
-        return Sailor(name.strip(), sail_nr, gender, sub_cats, nat, races, club, silver, gold)
+        return Sailor(name.strip(), sail_nr, gender, sub_cats, nat, races, club, silver, gold, qual_fleet, final_fleet)
 
     def get_competitors(self) -> list:
         """Get competitors."""
@@ -220,9 +307,24 @@ class Analyzer:
             n.races = n.races[:races]"""
         return results
 
+    def get_results_split(self, discount: int = 1, executor=None, workers: int = None) -> list:
+        """Get results of split fleet event, fleets are scored in executor or process pool of workers."""
+        import split_fleet
+        return split_fleet.get_results(self, discount, executor=executor, workers=workers)
+
+    def get_results_progressive(self, max_discount: int = 2):
+        """Get standings after every race for discounts 0..max_discount."""
+        import progressive
+        return progressive.from_analyzer(self, max_discount)
+
+    def get_fleet_stats(self, discount: int = 1):
+        """Get place statistics table of all sailors."""
+        import fleet_stats
+        return fleet_stats.regatta_stats(self, discount)
+
     def get_results_final(self, discount: int = 0, races: int = None):
-        """Get results with finals."""
-        results = self.get_results(discount=discount, races=races)
+        """Get results with finals, ranked Sailors are copies so data is not changed."""
+        results = [x.copy() for x in self.get_results(discount=discount, races=races)]
         results[3:10] = sorted(results[3:10], key=lambda x: x.silver.points)
         results[3].silver = Place(0, "0")
         results[:4] = sorted(results[:4], key=lambda x: x.gold.points)
@@ -246,6 +348,9 @@ class Analyzer:
 
     def _get_clean_place(self, input: str) -> Place:
         """Get clean place."""
+        if input.isascii() and input.isdigit():
+            pos = float(input)
+            return Place(pos, str(pos))
         if '/' in input:
             pos = float(input.split('/')[0].replace(',00', '').replace('.00', '').replace('.0', '').replace(',0', ''))
             sym = input.split('/')[1]
@@ -262,11 +367,11 @@ class Analyzer:
 
     def is_finals(self):
         """Check if competition has finals."""
-        return any([x.silver for x in self.get_competitors()])
+        return any([x.silver for x in self.data])
 
     def get_real_places(self, list_1):
-        """Get real places."""
-        results = list_1
+        """Get real places, Sailors with new places are copies."""
+        results = [x.copy() for x in list_1[:10]] + list_1[10:]
         for n, i in enumerate(results[:4]):
             if i.silver:
                 if i.silver.points != 0:
@@ -280,3 +385,7 @@ class Analyzer:
             i.gold = None
             i.silver = Place(n + 2, str(n + 2))
         return results
+
+
+instrumentation.instrument(Analyzer, ["load_results", "get_clean_data", "_get_clean_place", "get_results",
+                                      "get_results_final", "get_results_final_gold", "get_real_places"])
@@ -0,0 +1,303 @@
+"""Columnar results and fast csv ingestion."""
+import csv
+import itertools
+import mmap
+import sys
+import numpy as np
+import instrumentation
+import scoring
+import special_codes
+from results_analyzer import Analyzer, Place, Sailor
+
+DELIMITERS = [b",", b";", b"\t"]
+ENCODINGS = ["utf-8", "cp1257"]
+_UNWANTED = b"()[]-"
+_DECIMALS = [b",00", b".00", b".0", b",0"]
+# points of plain place cells, race columns are converted by lookup and only other cells are parsed one by one
+_PLACES = {}
+
+
+class ResultsMatrix:
+    """Regatta results as columns, race points as sailors x races float matrix."""
+
+    def __init__(self, syntax: list, names: list, clubs: list, points, symbols: dict = None, silver=None, gold=None,
+                 raw_columns: dict = None, encoding: str = "utf-8", codes=None, race_series: list = None):
+        """Init, symbols maps (row, column) to code symbol of cells like '45/DNF', column is race index or
+        'silver'/'gold'. Codes is matrix of special code ids, resolved from symbols if not given. Race series
+        marks each race as qualifying 'Q' or final 'F' series."""
+        self.syntax = syntax
+        self.names = names
+        self.clubs = clubs
+        self.points = points
+        self.symbols = symbols or {}
+        self.silver = silver if silver is not None else np.full(len(names), np.nan)
+        self.gold = gold if gold is not None else np.full(len(names), np.nan)
+        self.raw_columns = raw_columns or {}
+        self.encoding = encoding
+        self.codes = codes if codes is not None else special_codes.resolve(self.symbols, points.shape)
+        self.race_series = race_series if race_series is not None else ["F"] * points.shape[1]
+
+    def __len__(self):
+        """Len."""
+        return len(self.names)
+
+    @property
+    def races(self) -> int:
+        """Get number of races."""
+        return self.points.shape[1]
+
+    def column(self, name: str) -> list:
+        """Get decoded text column (sail_nr, nat, gender, qual_fleet, final_fleet)."""
+        return [None if x is None else x.decode(self.encoding) for x in self.raw_columns.get(name, [None] * len(self))]
+
+    @property
+    def sub_categories(self) -> list:
+        """Get sub categories."""
+        return [x.replace("sub_cat_", "") for x in self.syntax if "sub_cat" in x]
+
+    def is_finals(self) -> bool:
+        """Check if competition has finals."""
+        return bool(np.any(~np.isnan(self.silver)))
+
+    def set_code(self, row: int, race: int, symbol: str):
+        """Set special code of race, e.g. after protest."""
+        self.symbols[(row, race)] = symbol
+        self.codes[row, race] = special_codes.code_id(symbol)
+
+    def scored_points(self, table: special_codes.CodeTable = None) -> tuple:
+        """Get (points, discardable) matrices, code penalties of table are applied if given."""
+        if table is None:
+            return self.points, special_codes.DEFAULT_TABLE.lookup(len(self))[1][self.codes]
+        return table.score(self.points, self.codes, len(self))
+
+    def get_order(self, discount: int = 0, races: int = None, table: special_codes.CodeTable = None):
+        """Get row order of Analyzer.get_results."""
+        points, discardable = self.scored_points(table)
+        return scoring.get_order(points, discount, races, discardable)
+
+    def _place(self, row: int, column, points: float) -> Place:
+        """Get Place like Analyzer._get_clean_place."""
+        return Place(points, self.symbols.get((row, column), str(points)))
+
+    def to_sailors(self) -> list:
+        """Get list of Sailor objects."""
+        sail_nrs = self.column("sail_nr")
+        nats = self.column("nat")
+        genders = self.column("gender")
+        qual_fleets = self.column("qual_fleet")
+        final_fleets = self.column("final_fleet")
+        sub_cats = self.sub_categories
+        points = self.points.tolist()
+        sailors = []
+        for i, name in enumerate(self.names):
+            races = [self._place(i, j, x) for j, x in enumerate(points[i])]
+            silver = None if np.isnan(self.silver[i]) else self._place(i, "silver", float(self.silver[i]))
+            gold = None if np.isnan(self.gold[i]) else self._place(i, "gold", float(self.gold[i]))
+            sailors.append(Sailor(name, sail_nrs[i], genders[i], list(sub_cats), nats[i], races, self.clubs[i],
+                                  silver, gold, qual_fleets[i], final_fleets[i]))
+        return sailors
+
+    def to_analyzer(self) -> Analyzer:
+        """Get Analyzer with this data."""
+        analyzer = Analyzer()
+        analyzer.syntax = self.syntax
+        analyzer.race_series = self.race_series
+        analyzer.import_data(self.to_sailors())
+        analyzer.matrix = self
+        analyzer.codes = self.codes
+        return analyzer
+
+    @classmethod
+    def from_sailors(cls, sailors: list, syntax: list = None, race_series: list = None):
+        """Get matrix from Sailor objects."""
+        races = max((len(x.races) for x in sailors), default=0)
+        points = np.zeros((len(sailors), races))
+        symbols = {}
+        for i, sailor in enumerate(sailors):
+            for j, place in enumerate(sailor.races):
+                points[i, j] = place.points
+                if place.symbol != str(place.points):
+                    symbols[(i, j)] = place.symbol
+            for column in ("silver", "gold"):
+                place = getattr(sailor, column)
+                if place is not None and place.symbol != str(place.points):
+                    symbols[(i, column)] = place.symbol
+        silver = np.array([np.nan if x.silver is None else x.silver.points for x in sailors], dtype=float)
+        gold = np.array([np.nan if x.gold is None else x.gold.points for x in sailors], dtype=float)
+        raw_columns = {column: [None if getattr(x, attr) is None else getattr(x, attr).encode("utf-8")
+                                for x in sailors]
+                       for column, attr in (("sail_nr", "sail_nr"), ("nat", "nationality"), ("gender", "gender"),
+                                            ("qual_fleet", "qual_fleet"), ("final_fleet", "final_fleet"))}
+        return cls(syntax or [], [x.name for x in sailors], [x.club for x in sailors], points, symbols, silver, gold,
+                   raw_columns, race_series=race_series)
+
+    @classmethod
+    def from_analyzer(cls, analyzer: Analyzer):
+        """Get matrix of loaded Analyzer."""
+        return cls.from_sailors(analyzer.data, analyzer.syntax, analyzer.race_series)
+
+
+def detect_delimiter(header: bytes) -> bytes:
+    """Get most common delimiter of header line."""
+    return max(DELIMITERS, key=header.count)
+
+
+def detect_encoding(samples: list) -> str:
+    """Get first encoding which decodes all samples, ValueError if none does."""
+    data = b"\n".join(samples)
+    for encoding in ENCODINGS:
+        try:
+            data.decode(encoding)
+            return encoding
+        except UnicodeDecodeError:
+            continue
+    raise ValueError(f"Results are not in any of encodings {', '.join(ENCODINGS)}!")
+
+
+def _clean_number(cell: bytes) -> float:
+    """Get number like Analyzer._get_clean_place."""
+    for decimal in _DECIMALS:
+        cell = cell.replace(decimal, b"")
+    return float(cell)
+
+
+def _clean_place(cell: bytes) -> tuple:
+    """Get (points, symbol or None) of cell."""
+    if cell.isdigit():
+        return float(cell), None
+    if b"/" in cell:
+        number, symbol = cell.split(b"/")[:2]
+        return _clean_number(number), symbol.decode("ascii", "replace")
+    if b" " in cell:
+        number, symbol = cell.split(b" ")[:2]
+        return _clean_number(number), symbol.decode("ascii", "replace")
+    if cell == b"":
+        return 0, "0"
+    return _clean_number(cell), None
+
+
+def _places(size: int) -> dict:
+    """Get points of place cells, the table grows to at least size places."""
+    if len(_PLACES) < size:
+        _PLACES.update({str(x).encode(): float(x) for x in range(len(_PLACES), size)})
+    return _PLACES
+
+
+def _column_points(cells: tuple) -> tuple:
+    """Get (points, {row: symbol}) of race column."""
+    places = _places(max(len(cells) + 2, 1000))
+    points = np.fromiter(map(places.get, cells, itertools.repeat(np.nan)), float, len(cells))
+    others = np.flatnonzero(np.isnan(points)).tolist()
+    values = []
+    symbols = {}
+    for row in others:
+        value, symbol = _clean_place(cells[row].translate(None, _UNWANTED).strip())
+        values.append(value)
+        if symbol is not None:
+            symbols[row] = symbol
+    points[others] = values
+    return points, symbols
+
+
+def _split_lines(data, delimiter: bytes, start: int = 0):
+    """Yield list of cells of each line."""
+    end = len(data)
+    while start < end:
+        stop = data.find(b"\n", start)
+        if stop == -1:
+            stop = end
+        line = data[start:stop].rstrip(b"\r")
+        start = stop + 1
+        if not line:
+            continue
+        if b'"' in line:
+            while line.count(b'"') % 2 and start < end:
+                # quoted field with line break
+                stop = data.find(b"\n", start)
+                stop = end if stop == -1 else stop
+                line += b"\n" + data[start:stop].rstrip(b"\r")
+                start = stop + 1
+            yield [x.encode("latin-1") for x in next(csv.reader([line.decode("latin-1")],
+                                                                delimiter=delimiter.decode()))]
+        else:
+            yield line.split(delimiter)
+
+
+def parse_bytes(data, delimiter: bytes = None, encoding: str = None) -> ResultsMatrix:
+    """Parse results from bytes like object."""
+    start = 0
+    if data[:3] == b"\xef\xbb\xbf":
+        start = 3
+        encoding = encoding or "utf-8"
+    header_end = data.find(b"\n", start)
+    header = data[start:header_end if header_end != -1 else len(data)].rstrip(b"\r")
+    delimiter = delimiter or detect_delimiter(header)
+    lines = _split_lines(data, delimiter, start)
+    header_cells = next(lines, [])
+    analyzer = Analyzer()
+    analyzer.try_get_syntax([x.decode(encoding or detect_encoding([header])) for x in header_cells])
+    syntax = analyzer.syntax
+    width = len(syntax)
+
+    name_index = syntax.index("name") if "name" in syntax else None
+    race_indexes = [i for i, x in enumerate(syntax) if x == "race"]
+    # like Analyzer rows must have the name and every race, missing cells after them are empty
+    needed = max(race_indexes + [-1 if name_index is None else name_index]) + 1
+    rows = []
+    for cells in lines:
+        if len(cells) < width:
+            if len(cells) < needed:
+                raise ValueError(f"Row {len(rows) + 1} has {len(cells)} cells, name and races need {needed}!")
+            cells += [b""] * (width - len(cells))
+        rows.append(cells)
+    # cells by column, columns after the header are not used
+    columns = list(zip(*rows)) if rows else [()] * width
+    empty = [None] * len(rows)
+
+    names = list(columns[name_index]) if name_index is not None else empty
+    clubs = list(columns[syntax.index("club")]) if "club" in syntax else empty
+    raw_columns = {x: list(columns[syntax.index(x)]) for x in ("sail_nr", "nat", "gender", "qual_fleet", "final_fleet")
+                   if x in syntax}
+    points = np.zeros((len(rows), len(race_indexes)))
+    symbols = {}
+    for race, index in enumerate(race_indexes):
+        points[:, race], race_symbols = _column_points(columns[index])
+        symbols.update(((row, race), symbol) for row, symbol in race_symbols.items())
+    finals = {}
+    for column in ("silver", "gold"):
+        finals[column] = np.full(len(rows), np.nan)
+        for row, cell in enumerate(columns[syntax.index(column)] if column in syntax else ()):
+            if cell != b"":
+                finals[column][row], symbol = _clean_place(cell)
+                if symbol is not None:
+                    symbols[(row, column)] = symbol
+
+    encoding = encoding or detect_encoding([header] + [x for x in names + clubs if x] +
+                                           [x for column in raw_columns.values() for x in column if x])
+    names = [None if x is None else x.decode(encoding).replace("\xa0", " ").strip() for x in names]
+    clubs = [None if x is None else x.decode(encoding) for x in clubs]
+    return ResultsMatrix(syntax, names, clubs, points, symbols, finals["silver"], finals["gold"], raw_columns, encoding,
+                         race_series=analyzer.race_series)
+
+
+def load_matrix(file_name: str, delimiter: str = None, encoding: str = None) -> ResultsMatrix:
+    """Load results from file with memory map."""
+    with open(file_name, "rb") as f:
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # empty file cannot be mapped
+            data = b""
+        try:
+            return parse_bytes(data, delimiter.encode() if delimiter else None, encoding)
+        finally:
+            if isinstance(data, mmap.mmap):
+                data.close()
+
+
+def load_analyzer(file_name: str, delimiter: str = None, encoding: str = None) -> Analyzer:
+    """Load Analyzer with fast ingestion."""
+    return load_matrix(file_name, delimiter, encoding).to_analyzer()
+
+
+instrumentation.instrument(sys.modules[__name__], ["parse_bytes", "load_matrix"])
@@ -0,0 +1,63 @@
+"""Vectorized scoring with the same float arithmetic as Sailor.get_points_after."""
+import numpy as np
+
+
+def race_count(total: int, races: int = None) -> int:
+    """Get races cutoff like Analyzer.get_results."""
+    if not races:
+        return total
+    while races < 1:
+        races += total
+    return races
+
+
+def running_sum(values):
+    """Sum over last axis left to right like builtin sum."""
+    total = np.zeros(values.shape[:-1])
+    for j in range(values.shape[-1]):
+        total = total + values[..., j]
+    return total
+
+
+def tie_break(points):
+    """Get tie break extras of get_points_after for points (..., races)."""
+    races = points.shape[-1]
+    ascending = np.sort(points, axis=-1)
+    first = running_sum(ascending * np.array([(i + 1)**-1 for i in range(races)]) * 10**-3)
+    second = running_sum(np.array([(i + 1)**7 for i in range(races)], dtype=float) * points * 10**-15)
+    return first + second
+
+
+def discount_sums(points, discardable=None):
+    """Get sums of the 1, 2, ... worst discardable races for points (..., races), prefix sums of one sort."""
+    if discardable is not None:
+        points = np.where(discardable, points, -np.inf)
+    worst = -np.sort(-points, axis=-1)
+    return np.cumsum(np.where(np.isinf(worst), 0.0, worst), axis=-1)
+
+
+def discounts(points, discount: int, discardable=None):
+    """Get sum of the worst discardable races for points (..., races)."""
+    if discount <= 0 or points.shape[-1] == 0:
+        return np.zeros(points.shape[:-1])
+    return discount_sums(points, discardable)[..., min(discount, points.shape[-1]) - 1]
+
+
+def nett_points(points, discount: int = 0, races: int = None, discardable=None, calc_extras: bool = False):
+    """Get get_points_after(races, discount, calc_extras) of every row of points (..., races)."""
+    races = points.shape[-1] if races is None else races
+    points = points[..., :races]
+    if discardable is not None:
+        discardable = discardable[..., :races]
+    total = running_sum(points)
+    if calc_extras:
+        total = total + tie_break(points)
+    return total - discounts(points, discount, discardable)
+
+
+def get_order(points, discount: int = 0, races: int = None, discardable=None):
+    """Get row order of Analyzer.get_results(discount, races)."""
+    races = race_count(points.shape[-1], races)
+    if races <= discount or discount < 0:
+        raise ValueError("You cannot discount all races nor negative amount of races!")
+    return np.argsort(nett_points(points, discount, races, discardable, True), axis=-1, kind="stable")
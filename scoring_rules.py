@@ -0,0 +1,395 @@
+"""Declarative scoring rules, Regatta scenarios are rule sets and a new scoring proposal is only configuration.
+
+A Scorer builds the race points matrix of a loaded regatta once and ranks every rule set on it with the vectorized
+get_points_after of scoring, rankings with the same series races, discount and cutoff are shared. Finals are only
+applied to the top sailors, so they are done on Sailor objects like Analyzer.get_results_final.
+"""
+import dataclasses
+import itertools
+import operator
+import sys
+import numpy as np
+import instrumentation
+import scoring
+from results_analyzer import Place, Sailor
+
+FINALS_RACES = [None, "single", "both"]
+FINALS = [None, "final", "gold"]
+PLACES = ["analyzer", "regatta"]
+
+
+@dataclasses.dataclass(frozen=True, repr=False)
+class ScoringRules:
+    """Scoring rules of one scenario, frozen because rules are hashed as cache keys.
+
+    discount: worst races dropped, races: races cutoff like Analyzer.get_results, negative counts from the end.
+    finals_races: how finals are added to the series, None, 'single' (one race: gold, silver + silver_offset or the
+    rounded average place) or 'both' (silver and gold race, a missing one repeats a series race).
+    multiplier: points factor of races added from finals.
+    finals_from_races: (silver, gold) race indexes used as finals places of the top finalists.
+    finals: None, 'final' (gold fleet of the first gold_direct sailors and the silver fleet winner) or 'gold'
+    (silver fleet then ordered by nett points plus silver place), finalists are the sailors of both fleets.
+    places: 'analyzer' or 'regatta' numbering of finals places like their get_real_places.
+    Analyzer data is never changed, Sailors with other races or places are copies.
+    """
+
+    discount: int = 1
+    races: int = None
+    finals_races: str = None
+    silver_offset: int = 3
+    multiplier: int = 1
+    finals_from_races: tuple = None
+    finals: str = None
+    places: str = "analyzer"
+    gold_direct: int = 3
+    finalists: int = 10
+
+    def __post_init__(self):
+        """Check rules."""
+        if self.finals_races not in FINALS_RACES:
+            raise ValueError(f"Unknown finals races {self.finals_races}!")
+        if self.finals not in FINALS:
+            raise ValueError(f"Unknown finals {self.finals}!")
+        if self.places not in PLACES:
+            raise ValueError(f"Unknown places {self.places}!")
+        if self.gold_direct < 0 or self.finalists <= self.gold_direct:
+            raise ValueError("Finalists must be more than sailors going straight to gold fleet!")
+        object.__setattr__(self, "finals_from_races", tuple(self.finals_from_races) if self.finals_from_races else None)
+
+    def to_dict(self) -> dict:
+        """Get rules as dict."""
+        return {x.name: getattr(self, x.name) for x in dataclasses.fields(self)}
+
+    def replace(self, **changes):
+        """Get copy of rules with changes."""
+        return dataclasses.replace(self, **changes)
+
+    def __repr__(self):
+        """Repr."""
+        default = ScoringRules()
+        changed = [f"{key}={value!r}" for key, value in self.to_dict().items() if getattr(default, key) != value]
+        return f"ScoringRules({', '.join(changed)})"
+
+
+def _convert(races: int = None):
+    """Get rules of Regatta.convert_finals."""
+    return ScoringRules(races=races, finals_from_races=(-1, -1) if races == -1 else (-2, -1))
+
+
+REGATTA_RULES = {
+    "get_results_normal": ScoringRules(),
+    "get_results_normal_finals": ScoringRules(finals="gold"),
+    "get_results_2": ScoringRules(finals_races="single"),
+    "get_results_3": ScoringRules(finals_races="both"),
+    "get_results_4": ScoringRules(finals="final"),
+    "convert_finals": _convert(),
+    "convert_finals_2": _convert(-2),
+    "convert_finals_3": _convert(-1),
+    "get_results_newfinals_1": _convert().replace(finals="gold"),
+    "get_results_oldfinals_1": _convert().replace(finals="final", places="regatta"),
+    "get_results_newfinals_2": _convert(-2).replace(finals="gold"),
+    "get_results_oldfinals_2": _convert(-2).replace(finals="final"),
+    "get_results_newfinals_3": _convert(-1).replace(finals="gold"),
+    "get_results_oldfinals_3": _convert(-1).replace(finals="final"),
+}
+
+
+def _scaled(place: Place, multiplier) -> Place:
+    """Get place with points multiplied."""
+    if multiplier == 1:
+        return place
+    return Place(place.points * multiplier, str(place.points * multiplier), place.discardable)
+
+
+# Sailor attributes a ranking keeps, races and finals places are kept separately
+_FIELDS = operator.attrgetter("name", "sail_nr", "gender", "sub_categories", "nationality", "club", "qual_fleet",
+                              "final_fleet", "sailor_id", "registry")
+_POINTS = operator.attrgetter("points")
+_DISCARDABLE = operator.attrgetter("discardable")
+
+
+def _sailor(fields: tuple, races: tuple, silver: Place, gold: Place) -> Sailor:
+    """Get new Sailor of ranking entry."""
+    name, sail_nr, gender, sub_categories, nationality, club, qual_fleet, final_fleet, sailor_id, registry = fields
+    sailor = Sailor(name, sail_nr, gender, sub_categories, nationality, list(races), club, silver, gold, qual_fleet,
+                    final_fleet)
+    sailor.sailor_id = sailor_id
+    sailor.registry = registry
+    return sailor
+
+
+def _matrix(rows: list, attribute, dtype) -> np.ndarray:
+    """Get sailors x races matrix of attribute of Places of rows."""
+    width = len(rows[0]) if rows else 0
+    if any(len(x) != width for x in rows):
+        raise ValueError("Every sailor must have the same number of races!")
+    places = list(itertools.chain.from_iterable(rows))
+    return np.fromiter(map(attribute, places), dtype, len(places)).reshape(len(rows), width)
+
+
+class RankingSnapshot:
+    """Immutable ranking, sailors, races and finals places are frozen when it is scored so later changes do not reach
+    it. Entries are (sailor fields, races, silver, gold) tuples, Sailor objects are only made by sailors().
+    """
+
+    def __init__(self, sailors: list, rows: list = None, discount: int = 1, version: int = None, races: int = None):
+        """Init, rows are analyzer data rows of ranked sailors and version the analyzer data version.
+
+        races is the races cutoff the ranking was sorted by like Analyzer.get_results, total and nett are after it.
+        """
+        self.rows = tuple(range(len(sailors)) if rows is None else rows)
+        self.discount = discount
+        self.version = version
+        self.races = races
+        self.entries = tuple((_FIELDS(x), tuple(x.races), x.silver, x.gold) for x in sailors)
+
+    @classmethod
+    def from_entries(cls, entries: list, rows: list, discount: int = 1, version: int = None, races: int = None):
+        """Get snapshot of ranked entries of Scorer.ranked."""
+        snapshot = cls([], rows, discount, version, races)
+        snapshot.entries = tuple(entries)
+        return snapshot
+
+    def __len__(self):
+        """Len."""
+        return len(self.entries)
+
+    @property
+    def names(self) -> tuple:
+        """Get names in ranked order."""
+        return tuple(x[0][0] for x in self.entries)
+
+    @property
+    def positions(self) -> dict:
+        """Get {data row: 1-based position}."""
+        return {row: n + 1 for n, row in enumerate(self.rows)}
+
+    @property
+    def silver(self) -> tuple:
+        """Get silver fleet places in ranked order."""
+        return tuple(x[2] for x in self.entries)
+
+    @property
+    def gold(self) -> tuple:
+        """Get gold fleet places in ranked order."""
+        return tuple(x[3] for x in self.entries)
+
+    def _counted(self) -> list:
+        """Get races before the cutoff of every entry."""
+        return [races[:scoring.race_count(len(races), self.races)] for _, races, _, _ in self.entries]
+
+    @property
+    def total(self) -> tuple:
+        """Get total points after the races cutoff in ranked order."""
+        return tuple(sum([x.points for x in races]) for races in self._counted())
+
+    @property
+    def nett(self) -> tuple:
+        """Get points after races cutoff and discount like Sailor.get_points_after in ranked order."""
+        nett = []
+        for races in self._counted():
+            discounts = sum(sorted([x.points for x in races if x.discardable], reverse=True)[:self.discount])
+            nett.append(sum([x.points for x in races]) - discounts)
+        return tuple(nett)
+
+    def sailors(self) -> list:
+        """Get ranking as new Sailor objects."""
+        return [_sailor(*x) for x in self.entries]
+
+
+class Scorer:
+    """Scoring rules compiled over one loaded regatta.
+
+    Rules are compiled in steps that are shared by rule sets: series (points matrix with races added from finals),
+    cutoff (nett points before discards and sums of the worst races, one sort per series and cutoff) and order.
+    """
+
+    def __init__(self, analyzer):
+        """Init."""
+        self.analyzer = analyzer
+        self.reset()
+
+    def reset(self):
+        """Drop matrices and rankings, needed after the analyzer data changed."""
+        data = self.analyzer.data
+        self.version = self.analyzer.version
+        self.races = [tuple(x.races) for x in data]
+        self.points = _matrix(self.races, _POINTS, float)
+        self.discardable = _matrix(self.races, _DISCARDABLE, bool)
+        self.fields = list(map(_FIELDS, data))
+        self.finals = [(x.silver, x.gold) for x in data]
+        self.series_cache = {}
+        self.cutoff_cache = {}
+        self.order_cache = {}
+
+    def added_races(self, rules: ScoringRules) -> list:
+        """Get races added from finals of every sailor."""
+        return self.series(rules)[2]
+
+    def _added_races(self, rules: ScoringRules) -> list:
+        """Get races added from finals of every sailor as tuples."""
+        data = self.analyzer.data
+        if rules.finals_races == "single":
+            races = self.points.shape[1]
+            average = scoring.running_sum(self.points) / races if races else None
+            added = []
+            for n, sailor in enumerate(data):
+                if sailor.gold:
+                    place = sailor.gold
+                elif sailor.silver:
+                    place = sailor.silver + rules.silver_offset
+                else:
+                    value = round(float(average[n]))
+                    place = Place(value, str(value))
+                added.append((_scaled(place, rules.multiplier),))
+            return added
+        if rules.finals_races == "both":
+            return [(_scaled(sailor.silver, rules.multiplier) if sailor.silver else races[len(races) - 2],
+                     _scaled(sailor.gold, rules.multiplier) if sailor.gold else races[len(races) - 1])
+                    for sailor, races in zip(data, self.races)]
+        return [() for _ in data]
+
+    def series(self, rules: ScoringRules) -> tuple:
+        """Get (points, discardable, added races) of series of rules, races added from finals are the last columns."""
+        key = (rules.finals_races, rules.silver_offset, rules.multiplier)
+        series = self.series_cache.get(key)
+        if series is None:
+            added = self._added_races(rules)
+            points, discardable = self.points, self.discardable
+            if rules.finals_races:
+                points = np.hstack([points, _matrix(added, _POINTS, float)])
+                discardable = np.hstack([discardable, _matrix(added, _DISCARDABLE, bool)])
+            series = self.series_cache[key] = (points, discardable, added)
+        return series
+
+    def cutoff(self, rules: ScoringRules) -> tuple:
+        """Get (races, nett points with tie break before discards, sums of 1, 2, ... worst races) of series races
+        before the races cutoff of rules."""
+        points, discardable, _ = self.series(rules)
+        races = scoring.race_count(points.shape[1], rules.races)
+        key = (rules.finals_races, rules.silver_offset, rules.multiplier, races)
+        cutoff = self.cutoff_cache.get(key)
+        if cutoff is None:
+            points, discardable = points[:, :races], discardable[:, :races]
+            total = scoring.running_sum(points) + scoring.tie_break(points)
+            cutoff = self.cutoff_cache[key] = (races, total, scoring.discount_sums(points, discardable))
+        return cutoff
+
+    def order(self, rules: ScoringRules):
+        """Get row order of series ranking."""
+        key = (rules.finals_races, rules.silver_offset, rules.multiplier, rules.discount, rules.races)
+        order = self.order_cache.get(key)
+        if order is None:
+            races, total, sums = self.cutoff(rules)
+            if races <= rules.discount or rules.discount < 0:
+                raise ValueError("You cannot discount all races nor negative amount of races!")
+            if rules.discount and sums.shape[1]:
+                total = total - sums[:, min(rules.discount, sums.shape[1]) - 1]
+            order = self.order_cache[key] = np.argsort(total, kind="stable")
+        return order
+
+    def race_count(self, rules: ScoringRules) -> int:
+        """Get races cutoff of rules as number of races, races added from finals included."""
+        return scoring.race_count(self.series(rules)[0].shape[1], rules.races)
+
+    def ranked(self, rules: ScoringRules) -> tuple:
+        """Get (ranked entries, their data rows), entries are (sailor fields, races, silver, gold) tuples.
+
+        Analyzer data is not copied, only finalists become Sailor objects when finals are applied.
+        """
+        order = self.order(rules).tolist()
+        added = self.series(rules)[2]
+        fields, races, finals = self.fields, self.races, self.finals
+        entries = [(fields[n], races[n] + added[n]) + finals[n] for n in order]
+        if rules.finals_from_races:
+            silver, gold = rules.finals_from_races
+            entries[:rules.finalists] = [(x[0], x[1], x[1][silver], x[1][gold]) for x in entries[:rules.finalists]]
+        if not rules.finals:
+            return entries, order
+        finalists = [_sailor(*x) for x in entries[:rules.finalists]]
+        positions = {id(x): n for n, x in enumerate(finalists)}
+        apply_finals(finalists, rules)
+        head = [positions[id(x)] for x in finalists]
+        entries = [(entries[n][0], tuple(x.races), x.silver, x.gold) for n, x in zip(head, finalists)] + \
+            [(x[0], x[1][:scoring.race_count(len(x[1]), rules.races)], x[2], x[3]) for x in entries[rules.finalists:]]
+        return entries, [order[n] for n in head] + order[rules.finalists:]
+
+    def score(self, rules: ScoringRules) -> list:
+        """Get ranked list of new Sailors."""
+        return [_sailor(*x) for x in self.ranked(rules)[0]]
+
+    def snapshot(self, rules: ScoringRules) -> RankingSnapshot:
+        """Get ranking snapshot."""
+        entries, rows = self.ranked(rules)
+        return RankingSnapshot.from_entries(entries, rows, rules.discount, self.version, self.race_count(rules))
+
+    def score_all(self, rule_sets: dict) -> dict:
+        """Get {name: ranked list of Sailors} of rule sets in order."""
+        return {name: self.score(rules) for name, rules in rule_sets.items()}
+
+
+def apply_finals(results: list, rules: ScoringRules) -> list:
+    """Order finalists of series ranking by finals places and number the places like Analyzer.get_results_final.
+
+    Sailors of results are changed, they must be copies. Races of sailors after the finalists are not cut by the
+    races cutoff when results has only the finalists.
+    """
+    direct, finalists = rules.gold_direct, rules.finalists
+    for sailor in results[direct:finalists]:
+        if sailor.silver is None:
+            raise ValueError(f"{sailor.name} has no silver fleet place!")
+    results[direct:finalists] = sorted(results[direct:finalists], key=lambda x: x.silver.points)
+    results[direct].silver = Place(0, "0")
+    for sailor in results[:direct + 1]:
+        if sailor.gold is None:
+            raise ValueError(f"{sailor.name} has no gold fleet place!")
+    results[:direct + 1] = sorted(results[:direct + 1], key=lambda x: x.gold.points)
+    for sailor in results:
+        sailor.fleet_races(rules.races)
+    for n, sailor in enumerate(results[:direct + 1]):
+        sailor.silver = Place(1, "1") if sailor.silver and sailor.silver.points == 0 else None
+        sailor.gold = Place(n + 1, str(n + 1))
+    for n, sailor in enumerate(results[direct + 1:finalists]):
+        sailor.gold = None
+        sailor.silver = Place(n + 2, str(n + 2))
+
+    if rules.finals == "gold":
+        def nett(sailor):
+            return sailor.get_points_after(rules.races, rules.discount)
+        fleet = sorted(results[direct + 1:finalists], key=lambda x: nett(x) + x.silver.points)
+        for _ in range(len(fleet) - 1):
+            for i in range(len(fleet) - 1):
+                # equal finals points, better series first
+                if nett(fleet[i]) + fleet[i].silver.points == nett(fleet[i + 1]) + fleet[i + 1].silver.points:
+                    if nett(fleet[i]) > nett(fleet[i + 1]):
+                        fleet[i], fleet[i + 1] = fleet[i + 1], fleet[i]
+        results[direct + 1:finalists] = fleet
+
+    if rules.places == "regatta":
+        for n, sailor in enumerate(results[:direct + 1]):
+            sailor.silver = None
+            sailor.gold = Place(n + 1, str(n + 1))
+        for n, sailor in enumerate(results[direct:finalists]):
+            if n:
+                sailor.gold = None
+            sailor.silver = Place(n + 1, str(n + 1))
+    return results
+
+
+def score(analyzer, rules: ScoringRules) -> list:
+    """Get ranked list of Sailors of analyzer with rules."""
+    return Scorer(analyzer).score(rules)
+
+
+def snapshot(analyzer, rules: ScoringRules) -> RankingSnapshot:
+    """Get ranking snapshot of analyzer with rules."""
+    return Scorer(analyzer).snapshot(rules)
+
+
+def evaluate(analyzer, rule_sets: dict) -> dict:
+    """Get {name: ranked list of Sailors} of every rule set, the regatta is loaded into matrices once."""
+    return Scorer(analyzer).score_all(rule_sets)
+
+
+instrumentation.instrument(Scorer, ["reset", "ranked"])
+instrumentation.instrument(sys.modules[__name__], ["evaluate"])
@@ -1,6 +1,13 @@
 from results_analyzer import Analyzer
 from results_analyzer import Place
+import asyncio
+import csv
+import io
 import math
+import instrumentation
+import registry
+import scoring_rules
+import season_matrix
 
 
 class Participant:
@@ -27,14 +34,24 @@ class Competition:
 class Regatta:
     """Regatta."""
 
-    def __init__(self, data_path: str):
-        """Init."""
-        self.analyzer = Analyzer()
-        self.analyzer.load_results(data_path)
+    def __init__(self, data_path: str, analyzer: Analyzer = None):
+        """Init, already loaded analyzer is used instead of reading data path."""
+        self.data_path = data_path
+        self.analyzer = analyzer
+        if analyzer is None:
+            self.analyzer = Analyzer()
+            self.analyzer.load_results(data_path)
+        self.scorer = None
+        self.snapshots = {}
+
+    def invalidate(self):
+        """Drop cached results, they are also dropped when analyzer.changed() was called."""
+        self.scorer = None
+        self.snapshots = {}
 
     def get_real_places(self, list_1):
-        """Get real places"""
-        results = list_1
+        """Get real places, Sailors with new places are copies."""
+        results = [x.copy() for x in list_1[:10]] + list_1[10:]
         for n, i in enumerate(results[:4]):
             i.silver = None
             i.gold = Place(n + 1, str(n + 1))
@@ -46,440 +63,264 @@ class Regatta:
                 i.silver = Place(n + 1, str(n + 1))
         return results
 
+    def get_scorer(self) -> scoring_rules.Scorer:
+        """Get scorer of current analyzer data."""
+        scorer = self.scorer
+        if scorer is None or scorer.version != self.analyzer.version:
+            scorer = self.scorer = scoring_rules.Scorer(self.analyzer)
+        return scorer
+
+    def get_snapshot(self, rules: scoring_rules.ScoringRules) -> scoring_rules.RankingSnapshot:
+        """Get ranking snapshot of scoring rules, computed once per analyzer data version."""
+        snapshot = self.snapshots.get(rules)
+        if snapshot is None or snapshot.version != self.analyzer.version:
+            snapshot = self.snapshots[rules] = self.get_scorer().snapshot(rules)
+        return snapshot
+
+    def get_results_rules(self, rules: scoring_rules.ScoringRules) -> list:
+        """Get results with scoring rules, computed once per analyzer data version, Sailors are new copies."""
+        return self.get_snapshot(rules).sailors()
+
+    def get_results_batch(self, rule_sets: dict) -> dict:
+        """Get {name: results} of scoring rule sets, rule sets share the points matrix and cutoff sums of one scorer."""
+        return {name: self.get_results_rules(rules) for name, rules in rule_sets.items()}
+
     def get_results_normal(self):
         """Get normal results."""
-        return self.analyzer.get_results(discount=1)
+        return self.get_results_rules(scoring_rules.REGATTA_RULES["get_results_normal"])
 
     def get_results_normal_finals(self):
         """Get normal results with finals."""
-        return self.analyzer.get_results_final_gold(discount=1)
+        return self.get_results_rules(scoring_rules.REGATTA_RULES["get_results_normal_finals"])
 
     def get_results_2(self):
         """Get results 2."""
-        new = self.analyzer.get_competitors()
-        for i in new:
-            if not i.silver and not i.gold:
-                i.races.append(Place(round(i.avg_place()), str(round(i.avg_place()))))
-            elif i.silver and i.gold:
-                i.races.append(i.gold)
-            elif i.gold and not i.silver:
-                i.races.append(i.gold)
-            elif i.silver and not i.gold:
-                i.races.append(i.silver + 3)
-
-        new_analyzer = Analyzer()
-        new_analyzer.import_data(new)
-        return new_analyzer.get_results(discount=1)
+        return self.get_results_rules(scoring_rules.REGATTA_RULES["get_results_2"])
 
     def get_results_3(self):
         """Get results 3."""
-        new_2 = self.analyzer.get_competitors()
-        for i in new_2:
-            if not i.silver and not i.gold:
-                i.races.append(i.races[len(i.races) - 2])
-                i.races.append(i.races[len(i.races) - 2])
-            elif i.silver and i.gold:
-                i.races.append(i.silver)
-                i.races.append(i.gold)
-            elif i.gold and not i.silver:
-                i.races.append(i.races[len(i.races) - 2])
-                i.races.append(i.gold)
-            elif i.silver and not i.gold:
-                i.races.append(i.silver)
-                i.races.append(i.races[len(i.races) - 2])
-
-        new_analyzer_2 = Analyzer()
-        new_analyzer_2.import_data(new_2)
-        return new_analyzer_2.get_results(discount=1)
+        return self.get_results_rules(scoring_rules.REGATTA_RULES["get_results_3"])
 
     def get_results_4(self):
         """Get results 4."""
-        return self.analyzer.get_results_final(discount=1)
+        return self.get_results_rules(scoring_rules.REGATTA_RULES["get_results_4"])
 
     def convert_finals(self):
         """Convert finals."""
-        new_3_data = self.analyzer.get_competitors()
-        new_analyzer_3 = Analyzer()
-        new_analyzer_3.import_data(new_3_data)
-        new_3 = new_analyzer_3.get_results(discount=1)
-        for i in new_3[:10]:
-            i.silver = i.races[len(i.races) - 2]
-            i.gold = i.races[len(i.races) - 1]
-        return new_3
+        return self.get_results_rules(scoring_rules.REGATTA_RULES["convert_finals"])
 
     def convert_finals_2(self):
         """Convert finals 2."""
-        new_4_data = self.analyzer.get_competitors()
-        new_analyzer_4 = Analyzer()
-        new_analyzer_4.import_data(new_4_data)
-        new_4 = new_analyzer_4.get_results(discount=1, races=-2)
-        for i in new_4[:10]:
-            i.silver = i.races[len(i.races) - 2]
-            i.gold = i.races[len(i.races) - 1]
-        return new_4
+        return self.get_results_rules(scoring_rules.REGATTA_RULES["convert_finals_2"])
 
     def convert_finals_3(self):
         """Convert finals 3."""
-        new_5_data = self.analyzer.get_competitors()
-        new_analyzer_5 = Analyzer()
-        new_analyzer_5.import_data(new_5_data)
-        new_5 = new_analyzer_5.get_results(discount=1, races=-1)
-        for i in new_5[:10]:
-            i.silver = i.races[len(i.races) - 1]
-            i.gold = i.races[len(i.races) - 1]
-        return new_5
+        return self.get_results_rules(scoring_rules.REGATTA_RULES["convert_finals_3"])
 
     def get_results_newfinals_1(self):
         """Get results with new finals."""
-        new_3 = self.convert_finals()
-        new_analyzer_3 = Analyzer()
-        new_analyzer_3.import_data(new_3)
-        results = new_analyzer_3.get_results_final_gold(discount=1)
-        return results
+        return self.get_results_rules(scoring_rules.REGATTA_RULES["get_results_newfinals_1"])
 
     def get_results_oldfinals_1(self):
         """Get results with old finals."""
-        new_3 = self.convert_finals()
-        new_analyzer_3 = Analyzer()
-        new_analyzer_3.import_data(new_3)
-        results = new_analyzer_3.get_results_final(discount=1)
-        results = self.get_real_places(results)
-        return results
+        return self.get_results_rules(scoring_rules.REGATTA_RULES["get_results_oldfinals_1"])
 
     def get_results_newfinals_2(self):
         """Get results with new finals 2."""
-        new_4 = self.convert_finals_2()
-        new_analyzer_4 = Analyzer()
-        new_analyzer_4.import_data(new_4)
-        results = new_analyzer_4.get_results_final_gold(discount=1, races=-2)
-        return results
+        return self.get_results_rules(scoring_rules.REGATTA_RULES["get_results_newfinals_2"])
 
     def get_results_oldfinals_2(self):
         """Get results with old finals 2."""
-        new_4 = self.convert_finals_2()
-        new_analyzer_4 = Analyzer()
-        new_analyzer_4.import_data(new_4)
-        results = new_analyzer_4.get_results_final(discount=1, races=-2)
-        return results
+        return self.get_results_rules(scoring_rules.REGATTA_RULES["get_results_oldfinals_2"])
 
     def get_results_newfinals_3(self):
         """Get results with new finals 3."""
-        new_5 = self.convert_finals_3()
-        new_analyzer_5 = Analyzer()
-        new_analyzer_5.import_data(new_5)
-        results = new_analyzer_5.get_results_final_gold(discount=1, races=-1)
-        return results
+        return self.get_results_rules(scoring_rules.REGATTA_RULES["get_results_newfinals_3"])
 
     def get_results_oldfinals_3(self):
         """Get results with old finals 3."""
-        new_5 = self.convert_finals_3()
-        new_analyzer_5 = Analyzer()
-        new_analyzer_5.import_data(new_5)
-        results = new_analyzer_5.get_results_final(discount=1, races=-1)
-        return results
+        return self.get_results_rules(scoring_rules.REGATTA_RULES["get_results_oldfinals_3"])
+
+
+def read_file(path: str) -> bytes:
+    """Read file."""
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def parse_results(data: bytes) -> Analyzer:
+    """Parse results file contents like Analyzer.load_results."""
+    analyzer = Analyzer()
+    analyzer.load_lines(csv.reader(io.TextIOWrapper(io.BytesIO(data)), delimiter=','))
+    return analyzer
 
 
 class Season:
     """Season"""
 
-    def __init__(self, regattas):
-        """Init."""
+    def __init__(self, regattas, sailors: registry.SailorRegistry = None):
+        """Init, sailors of regattas are joined by ids of sailors registry (default is a new registry of the season)."""
         self.regattas = regattas
+        self.registry = sailors if sailors is not None else registry.SailorRegistry()
+        self.loaded = {}
+
+    @classmethod
+    def from_regattas(cls, analyzers: list, paths: list = None, sailors: registry.SailorRegistry = None):
+        """Get season of already loaded regattas."""
+        season = cls(paths if paths is not None else [None] * len(analyzers), sailors)
+        season.loaded = dict(enumerate(analyzers))
+        return season
+
+    async def iter_loaded(self, concurrency: int = 8, executor=None):
+        """Read files concurrently and yield (number, Regatta) as soon as each is parsed.
+
+        At most concurrency files are read at once in threads, parsing runs in executor (thread or process pool,
+        default is the event loop's thread pool). Parsed sailors get their ids here, so standings are the same as
+        with sequential loading.
+        """
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def fetch(n: int, path: str) -> tuple:
+            async with semaphore:
+                data = await loop.run_in_executor(None, read_file, path)
+            return n, await loop.run_in_executor(executor, parse_results, data)
+
+        for future in asyncio.as_completed([fetch(n, path) for n, path in enumerate(self.regattas)]):
+            n, analyzer = await future
+            # ids given in a worker process are not valid here
+            self.registry.register(analyzer.data)
+            self.loaded[n] = analyzer
+            yield n, Regatta(self.regattas[n], analyzer)
+
+    async def load(self, concurrency: int = 8, executor=None):
+        """Load all regattas of season concurrently."""
+        async for _ in self.iter_loaded(concurrency, executor):
+            pass
+        return self
+
+    def load_sync(self, concurrency: int = 8, executor=None):
+        """Load all regattas of season concurrently from synchronous code."""
+        return asyncio.run(self.load(concurrency, executor))
+
+    def get_regatta(self, n: int, path: str) -> Regatta:
+        """Get regatta, scoring does not change loaded data so it is shared.
+
+        Files which are not loaded yet are read with the season registry, their sailors need no new ids.
+        """
+        if n not in self.loaded:
+            analyzer = Analyzer(self.registry)
+            analyzer.load_results(path)
+            return Regatta(path, analyzer)
+        return Regatta(path, self.loaded[n])
 
     def sort_year(self, dic):
         """Sort year."""
-        for i in dic:
-            total = 0
-            if len(dic[i]) > 3:
-                discount_dic = sorted(dic[i], key=lambda x: x.total)[1:]
+        return season_matrix.sort_year(dic)
+
+    def get_fleet_stats(self, discount: int = 0):
+        """Get regatta place statistics table of all sailors of season."""
+        import fleet_stats
+        return fleet_stats.season_stats(self, discount)
+
+    def get_points_base(self, normal: list) -> int:
+        """Get season points of regatta winner from normal results of the first regatta."""
+        return int(math.ceil((len(normal) + 20)/10))*10
+
+    def _add_regatta(self, results: dict, names: dict, n: int, points: int, ranking: list, normal: list = None):
+        """Add Competition of every sailor in ranking to results by sailor id.
+
+        With normal results given, the extra is for sailors in top 3 of normal results, else for top 3 of ranking.
+        """
+        places = None
+        if normal is not None:
+            places = {}
+            for j, man in enumerate(normal):
+                places.setdefault(self.registry.sailor_id(man), j)
+        extra = 0
+        for i, sailor in enumerate(ranking):
+            sailor_id = self.registry.sailor_id(sailor)
+            if places is None:
+                extra = 3 - i if i < 3 else 0
+            elif sailor_id in places:
+                extra = 3 - i if places[sailor_id] < 3 else 0
+            names.setdefault(sailor_id, sailor.name)
+            results.setdefault(sailor_id, []).append(Competition(n + 1, points - i, extra))
+
+    def _get_year(self, finals: str = None, always: bool = False, points: int = None):
+        """Get season results, regattas with finals are ranked by Regatta method finals.
+
+        Without always only regattas with finals use finals ranking, the others use normal results and points base
+        if given. Sailors are joined by registry id and named by their first appearance in the season, rows are keyed
+        by id until they are sorted so sailors with the same name stay apart.
+        """
+        results = {}
+        names = {}
+        for n, regatta in enumerate(self.regattas):
+            newregatta = self.get_regatta(n, regatta)
+            if finals and (always or newregatta.analyzer.is_finals()):
+                ranking = getattr(newregatta, finals)()
+                normal = newregatta.get_results_normal()
+            else:
+                ranking = normal = newregatta.get_results_normal()
+            if n == 0:
+                count = self.get_points_base(normal)
+            if ranking is normal:
+                self._add_regatta(results, names, n, count if points is None else points, ranking)
             else:
-                discount_dic = dic[i]
-            for j in discount_dic:
-                total = total + j.total
-            extra = sum([(i + 1) ** -1 * x.total * 10 ** -3 for i, x in
-                         enumerate(sorted(discount_dic, key=lambda x: x.total, reverse=True))])
-            extra += sum([(i + 1) ** 7 * x.total * 10 ** -15 for i, x in enumerate(discount_dic)])
-            dic[i].append(total)
-            dic[i].append(extra)
-        return sorted(dic.items(), key=lambda x: x[1][len(x[1]) - 1], reverse=True)
+                self._add_regatta(results, names, n, count, ranking, normal)
+        return [(names[x], row) for x, row in self.sort_year(results)]
 
     def get_results(self):
         """Get results."""
-        results = {}
-        for n, regatta in enumerate(self.regattas):
-            newregatta = Regatta(regatta)
-            if n == 0:
-                count = int(math.ceil((len(newregatta.get_results_normal()) + 20)/10))*10
-            for i, sailor in enumerate(newregatta.get_results_normal()):
-                if i < 3:
-                    extra = 3-i
-                else:
-                    extra = 0
-                if sailor.name not in results:
-                    results[sailor.name] = [Competition(n+1, count-i, extra)]
-                else:
-                    results[sailor.name].append(Competition(n+1, count-i, extra))
-        return self.sort_year(results)
+        return self._get_year()
 
     def get_results_finals(self):
         """Get results with finals."""
-        results = {}
-        analyzer = Analyzer()
-        for n, regatta in enumerate(self.regattas):
-            newregatta = Regatta(regatta)
-            analyzer.load_results(regatta)
-            if n == 0:
-                count = int(math.ceil((len(newregatta.get_results_normal()) + 20)/10))*10
-            if analyzer.is_finals():
-                for i, sailor in enumerate(newregatta.get_results_normal_finals()):
-                    for j, man in enumerate(newregatta.get_results_normal()):
-                        if sailor.name == man.name:
-                            if j < 3:
-                                extra = 3 - i
-                            else:
-                                extra = 0
-                            break
-                    if sailor.name not in results:
-                        results[sailor.name] = [Competition(n + 1, count - i, extra)]
-                    else:
-                        results[sailor.name].append(Competition(n + 1, count - i, extra))
-            else:
-                for i, sailor in enumerate(newregatta.get_results_normal()):
-                    if i < 3:
-                        extra = 3 - i
-                    else:
-                        extra = 0
-                    if sailor.name not in results:
-                        results[sailor.name] = [Competition(n + 1, count - i, extra)]
-                    else:
-                        results[sailor.name].append(Competition(n + 1, count - i, extra))
-        return self.sort_year(results)
+        return self._get_year("get_results_normal_finals")
 
     def get_results_old1(self):
         """Get results old."""
-        results = {}
-        analyzer = Analyzer()
-        for n, regatta in enumerate(self.regattas):
-            newregatta = Regatta(regatta)
-            analyzer.load_results(regatta)
-            if n == 0:
-                count = int(math.ceil((len(newregatta.get_results_normal()) + 20)/10))*10
-            if analyzer.is_finals():
-                for i, sailor in enumerate(newregatta.get_results_2()):
-                    for j, man in enumerate(newregatta.get_results_normal()):
-                        if sailor.name == man.name:
-                            if j < 3:
-                                extra = 3 - i
-                            else:
-                                extra = 0
-                            break
-                    if sailor.name not in results:
-                        results[sailor.name] = [Competition(n + 1, count - i, extra)]
-                    else:
-                        results[sailor.name].append(Competition(n + 1, count - i, extra))
-            else:
-                for i, sailor in enumerate(newregatta.get_results_normal()):
-                    if i < 3:
-                        extra = 3 - i
-                    else:
-                        extra = 0
-                    if sailor.name not in results:
-                        results[sailor.name] = [Competition(n + 1, count - i, extra)]
-                    else:
-                        results[sailor.name].append(Competition(n + 1, count - i, extra))
-
-        return self.sort_year(results)
+        return self._get_year("get_results_2")
 
     def get_results_old2(self):
         """Get results old 2."""
-        results = {}
-        analyzer = Analyzer()
-        for n, regatta in enumerate(self.regattas):
-            newregatta = Regatta(regatta)
-            analyzer.load_results(regatta)
-            if n == 0:
-                count = int(math.ceil((len(newregatta.get_results_normal()) + 20)/10))*10
-            if analyzer.is_finals():
-                for i, sailor in enumerate(newregatta.get_results_3()):
-                    for j, man in enumerate(newregatta.get_results_normal()):
-                        if sailor.name == man.name:
-                            if j < 3:
-                                extra = 3 - i
-                            else:
-                                extra = 0
-                            break
-                    if sailor.name not in results:
-                        results[sailor.name] = [Competition(n + 1, count - i, extra)]
-                    else:
-                        results[sailor.name].append(Competition(n + 1, count - i, extra))
-            else:
-                for i, sailor in enumerate(newregatta.get_results_normal()):
-                    if i < 3:
-                        extra = 3 - i
-                    else:
-                        extra = 0
-                    if sailor.name not in results:
-                        results[sailor.name] = [Competition(n + 1, 50 - i, extra)]
-                    else:
-                        results[sailor.name].append(Competition(n + 1, 50 - i, extra))
-        return self.sort_year(results)
+        return self._get_year("get_results_3", points=50)
 
     def get_results_old3(self):
         """Get results old 3."""
-        results = {}
-        analyzer = Analyzer()
-        for n, regatta in enumerate(self.regattas):
-            newregatta = Regatta(regatta)
-            analyzer.load_results(regatta)
-            if n == 0:
-                count = int(math.ceil((len(newregatta.get_results_normal()) + 20)/10))*10
-            if analyzer.is_finals():
-                for i, sailor in enumerate(newregatta.get_results_4()):
-                    for j, man in enumerate(newregatta.get_results_normal()):
-                        if sailor.name == man.name:
-                            if j < 3:
-                                extra = 3 - i
-                            else:
-                                extra = 0
-                            break
-                    if sailor.name not in results:
-                        results[sailor.name] = [Competition(n + 1, count - i, extra)]
-                    else:
-                        results[sailor.name].append(Competition(n + 1, count - i, extra))
-            else:
-                for i, sailor in enumerate(newregatta.get_results_normal()):
-                    if i < 3:
-                        extra = 3 - i
-                    else:
-                        extra = 0
-                    if sailor.name not in results:
-                        results[sailor.name] = [Competition(n + 1, count - i, extra)]
-                    else:
-                        results[sailor.name].append(Competition(n + 1, count - i, extra))
-        return self.sort_year(results)
+        return self._get_year("get_results_4")
 
     def get_results_new1(self):
         """Get results new."""
-        results = {}
-        for n, regatta in enumerate(self.regattas):
-            newregatta = Regatta(regatta)
-            if n == 0:
-                count = int(math.ceil((len(newregatta.get_results_normal()) + 20)/10))*10
-            for i, sailor in enumerate(newregatta.get_results_newfinals_1()):
-                for j, man in enumerate(newregatta.get_results_normal()):
-                    if sailor.name == man.name:
-                        if j < 3:
-                            extra = 3 - i
-                        else:
-                            extra = 0
-                        break
-                if sailor.name not in results:
-                    results[sailor.name] = [Competition(n + 1, count - i, extra)]
-                else:
-                    results[sailor.name].append(Competition(n + 1, count - i, extra))
-        return self.sort_year(results)
+        return self._get_year("get_results_newfinals_1", always=True)
 
     def get_results_new2(self):
         """Get results new 2."""
-        results = {}
-        for n, regatta in enumerate(self.regattas):
-            newregatta = Regatta(regatta)
-            if n == 0:
-                count = int(math.ceil((len(newregatta.get_results_normal()) + 20)/10))*10
-            for i, sailor in enumerate(newregatta.get_results_newfinals_2()):
-                for j, man in enumerate(newregatta.get_results_normal()):
-                    if sailor.name == man.name:
-                        if j < 3:
-                            extra = 3 - i
-                        else:
-                            extra = 0
-                        break
-                if sailor.name not in results:
-                    results[sailor.name] = [Competition(n + 1, count - i, extra)]
-                else:
-                    results[sailor.name].append(Competition(n + 1, count - i, extra))
-        return self.sort_year(results)
+        return self._get_year("get_results_newfinals_2", always=True)
 
     def get_results_new3(self):
         """Get results new 3."""
-        results = {}
-        for n, regatta in enumerate(self.regattas):
-            newregatta = Regatta(regatta)
-            if n == 0:
-                count = int(math.ceil((len(newregatta.get_results_normal()) + 20)/10))*10
-            for i, sailor in enumerate(newregatta.get_results_newfinals_3()):
-                for j, man in enumerate(newregatta.get_results_normal()):
-                    if sailor.name == man.name:
-                        if j < 3:
-                            extra = 3 - i
-                        else:
-                            extra = 0
-                        break
-                if sailor.name not in results:
-                    results[sailor.name] = [Competition(n + 1, count - i, extra)]
-                else:
-                    results[sailor.name].append(Competition(n + 1, count - i, extra))
-        return self.sort_year(results)
+        return self._get_year("get_results_newfinals_3", always=True)
 
     def get_results_new4(self):
         """Get results new 4."""
-        results = {}
-        for n, regatta in enumerate(self.regattas):
-            newregatta = Regatta(regatta)
-            if n == 0:
-                count = int(math.ceil((len(newregatta.get_results_normal()) + 20)/10))*10
-            for i, sailor in enumerate(newregatta.get_results_oldfinals_1()):
-                for j, man in enumerate(newregatta.get_results_normal()):
-                    if sailor.name == man.name:
-                        if j < 3:
-                            extra = 3 - i
-                        else:
-                            extra = 0
-                        break
-                if sailor.name not in results:
-                    results[sailor.name] = [Competition(n + 1, count - i, extra)]
-                else:
-                    results[sailor.name].append(Competition(n + 1, count - i, extra))
-        return self.sort_year(results)
+        return self._get_year("get_results_oldfinals_1", always=True)
 
     def get_results_new5(self):
         """Get results new 5."""
-        results = {}
-        for n, regatta in enumerate(self.regattas):
-            newregatta = Regatta(regatta)
-            if n == 0:
-                count = int(math.ceil((len(newregatta.get_results_normal()) + 20)/10))*10
-            for i, sailor in enumerate(newregatta.get_results_oldfinals_2()):
-                for j, man in enumerate(newregatta.get_results_normal()):
-                    if sailor.name == man.name:
-                        if j < 3:
-                            extra = 3 - i
-                        else:
-                            extra = 0
-                        break
-                if sailor.name not in results:
-                    results[sailor.name] = [Competition(n + 1, count - i, extra)]
-                else:
-                    results[sailor.name].append(Competition(n + 1, count - i, extra))
-        return self.sort_year(results)
+        return self._get_year("get_results_oldfinals_2", always=True)
 
     def get_results_new6(self):
         """Get results new 6."""
-        results = {}
-        for n, regatta in enumerate(self.regattas):
-            newregatta = Regatta(regatta)
-            if n == 0:
-                count = int(math.ceil((len(newregatta.get_results_normal()) + 20)/10))*10
-            for i, sailor in enumerate(newregatta.get_results_oldfinals_3()):
-                for j, man in enumerate(newregatta.get_results_normal()):
-                    if sailor.name == man.name:
-                        if j < 3:
-                            extra = 3 - i
-                        else:
-                            extra = 0
-                        break
-                if sailor.name not in results:
-                    results[sailor.name] = [Competition(n + 1, count - i, extra)]
-                else:
-                    results[sailor.name].append(Competition(n + 1, count - i, extra))
-        return self.sort_year(results)
+        return self._get_year("get_results_oldfinals_3", always=True)
+
+
+instrumentation.instrument(Regatta, ["get_results_normal", "get_results_normal_finals", "get_results_2",
+                                     "get_results_3", "get_results_4", "convert_finals", "convert_finals_2",
+                                     "convert_finals_3", "get_results_newfinals_1", "get_results_oldfinals_1",
+                                     "get_results_newfinals_2", "get_results_oldfinals_2", "get_results_newfinals_3",
+                                     "get_results_oldfinals_3"])
+instrumentation.instrument(Season, ["sort_year", "get_results", "get_results_finals", "get_results_old1",
+                                    "get_results_old2", "get_results_old3", "get_results_new1", "get_results_new2",
+                                    "get_results_new3", "get_results_new4", "get_results_new5", "get_results_new6"])
@@ -0,0 +1,143 @@
+"""Vectorized season aggregation over sailors x regattas points."""
+import sys
+import numpy as np
+import instrumentation
+import scoring
+
+
+class SeasonMatrix:
+    """Sparse season points, one entry per sailor and regatta sailed."""
+
+    def __init__(self, keys: list, rows, regattas, points, extras=None):
+        """Init, entry i is sailor keys[rows[i]] in regatta regattas[i], entries of a sailor are in sailed order."""
+        self.keys = keys
+        self.rows = np.asarray(rows, dtype=np.int64)
+        self.regattas = np.asarray(regattas, dtype=np.int64)
+        self.points = np.asarray(points)
+        self.extras = np.zeros(len(self.rows), dtype=self.points.dtype) if extras is None else np.asarray(extras)
+
+    @classmethod
+    def from_dict(cls, dic: dict):
+        """Get matrix from {sailor: [Competition, ...]}."""
+        keys = list(dic)
+        rows = []
+        regattas = []
+        points = []
+        extras = []
+        for row, key in enumerate(keys):
+            for competition in dic[key]:
+                rows.append(row)
+                regattas.append(competition.number)
+                points.append(competition.points)
+                extras.append(competition.extra)
+        integral = all(isinstance(x, int) for x in points) and all(isinstance(x, int) for x in extras)
+        dtype = np.int64 if integral else float
+        return cls(keys, rows, regattas, np.array(points, dtype=dtype), np.array(extras, dtype=dtype))
+
+    @property
+    def totals(self):
+        """Get points + extra of every entry."""
+        return self.points + self.extras
+
+    @property
+    def counts(self):
+        """Get number of regattas of every sailor."""
+        return np.bincount(self.rows, minlength=len(self.keys))
+
+    @property
+    def shape(self) -> tuple:
+        """Get (sailors, regattas) of dense matrix."""
+        return len(self.keys), int(self.regattas.max()) if len(self.regattas) else 0
+
+    def dense(self) -> tuple:
+        """Get (totals, mask) sailors x regattas matrices, regatta n is column n - 1 and mask marks sailed events."""
+        totals = np.zeros(self.shape, dtype=self.points.dtype)
+        mask = np.zeros(self.shape, dtype=bool)
+        totals[self.rows, self.regattas - 1] = self.totals
+        mask[self.rows, self.regattas - 1] = True
+        return totals, mask
+
+    def compact(self) -> tuple:
+        """Get (values, mask) sailors x max entries, entries of each sailor moved to the front in sailed order."""
+        counts = self.counts
+        width = int(counts.max()) if len(counts) else 0
+        order = np.argsort(self.rows, kind="stable")
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        positions = np.arange(len(order)) - starts[self.rows[order]]
+        values = np.zeros((len(self.keys), width), dtype=self.points.dtype)
+        mask = np.zeros((len(self.keys), width), dtype=bool)
+        values[self.rows[order], positions] = self.totals[order]
+        mask[self.rows[order], positions] = True
+        return values, mask
+
+
+class SeasonStandings:
+    """Season standings."""
+
+    def __init__(self, matrix: SeasonMatrix, order, totals, extras, dropped):
+        """Init, order is row order from first place, dropped marks sailors whose worst regatta was dropped."""
+        self.matrix = matrix
+        self.order = order
+        self.totals = totals
+        self.extras = extras
+        self.dropped = dropped
+
+    @property
+    def keys(self) -> list:
+        """Get sailors from first place."""
+        return [self.matrix.keys[i] for i in self.order]
+
+    def position(self, key) -> int:
+        """Get place of sailor."""
+        return self.keys.index(key) + 1
+
+    def to_legacy(self, dic: dict) -> list:
+        """Get result of Season.sort_year, [Competition, ...] lists of dic get total and extra appended."""
+        totals = self.totals.tolist()
+        extras = self.extras.tolist()
+        for row, key in enumerate(self.matrix.keys):
+            dic[key].append(totals[row])
+            dic[key].append(extras[row])
+        return [(key, dic[key]) for key in self.keys]
+
+
+def score(values, mask, keep_all: int = 3) -> tuple:
+    """Get (totals, extras, dropped) of compact (..., sailors, entries) values, see aggregate."""
+    counts = mask.sum(axis=-1)
+    dropped = counts > keep_all
+    width = values.shape[-1]
+    if width:
+        # counted results: ascending without the worst for dropped sailors, else in sailed order
+        ascending = np.sort(np.where(mask, values, np.iinfo(np.int64).max if values.dtype == np.int64 else np.inf),
+                            axis=-1, kind="stable")
+        counted = np.where(dropped[..., None], np.roll(ascending, -1, axis=-1), values)
+        counted_mask = np.arange(width) < (counts - dropped)[..., None]
+        counted = np.where(counted_mask, counted, 0)
+    else:
+        counted = values
+        counted_mask = mask
+    totals = counted.sum(axis=-1) if counted.dtype == np.int64 else scoring.running_sum(counted)
+    descending = -np.sort(np.where(counted_mask, -counted.astype(float), np.inf), axis=-1)
+    descending = np.where(counted_mask, descending, 0.0)
+    extras = scoring.running_sum(descending * np.array([(i + 1)**-1 for i in range(width)]) * 10**-3)
+    extras = extras + scoring.running_sum(np.array([(i + 1)**7 for i in range(width)], dtype=float) * counted * 10**-15)
+    return totals, extras, dropped
+
+
+def aggregate(matrix: SeasonMatrix, keep_all: int = 3) -> SeasonStandings:
+    """Get standings, worst regatta is dropped for sailors with more than keep_all regattas.
+
+    Tie break extras and ordering use the same float arithmetic as the old Season.sort_year: standings are sorted
+    by the extras, the sum weighted by 1/place of the results from best and by place**7 in counted order.
+    """
+    totals, extras, dropped = score(*matrix.compact(), keep_all)
+    order = np.argsort(-extras, kind="stable")
+    return SeasonStandings(matrix, order, totals, extras, dropped)
+
+
+def sort_year(dic: dict) -> list:
+    """Get Season.sort_year result of {sailor: [Competition, ...]}."""
+    return aggregate(SeasonMatrix.from_dict(dic)).to_legacy(dic)
+
+
+instrumentation.instrument(sys.modules[__name__], ["aggregate"])
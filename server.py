@@ -0,0 +1,291 @@
+"""Local HTTP/JSON results server, parsed regattas and computed standings stay in memory."""
+import argparse
+import json
+import os
+import sys
+import threading
+import traceback
+from collections import OrderedDict
+from concurrent.futures import Future
+import instrumentation
+import registry
+import scoring
+import scoring_rules
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from results_analyzer import Analyzer
+from season import Regatta, Season
+
+REGATTA_SCENARIOS = ["get_results_normal", "get_results_normal_finals", "get_results_2", "get_results_3",
+                     "get_results_4", "get_results_newfinals_1", "get_results_oldfinals_1", "get_results_newfinals_2",
+                     "get_results_oldfinals_2", "get_results_newfinals_3", "get_results_oldfinals_3"]
+SEASON_VARIANTS = ["get_results", "get_results_finals", "get_results_old1", "get_results_old2", "get_results_old3",
+                   "get_results_new1", "get_results_new2", "get_results_new3", "get_results_new4", "get_results_new5",
+                   "get_results_new6"]
+
+
+def _place(place) -> dict:
+    """Get Place as json."""
+    return None if place is None else {"points": place.points, "symbol": place.symbol}
+
+
+def sailor_row(place: int, sailor, discount: int = 1, races: int = None) -> dict:
+    """Get standings row of Sailor as json, total and nett are after the races cutoff the standings are sorted by."""
+    races = scoring.race_count(len(sailor.races), races)
+    return {"place": place, "name": sailor.name, "sail_nr": sailor.sail_nr, "club": sailor.club,
+            "races": [x.symbol for x in sailor.races], "total": sailor.get_points_after(races),
+            "nett": sailor.get_points_after(races, discount), "silver": _place(sailor.silver),
+            "gold": _place(sailor.gold)}
+
+
+def season_row(place: int, row: tuple) -> dict:
+    """Get Season standings row as json."""
+    name, competitions = row
+    return {"place": place, "name": name, "total": competitions[-2], "extra": competitions[-1],
+            "regattas": [{"number": x.number, "points": x.points, "extra": x.extra} for x in competitions[:-2]]}
+
+
+class ResultsCache:
+    """Parsed regattas and encoded responses by results file, files must be inside root."""
+
+    def __init__(self, root: str = ".", max_responses: int = 1024):
+        """Init, sailors of cached files get ids of the cache's own registry.
+
+        Only the max_responses last used responses are kept.
+        """
+        self.root = os.path.realpath(root)
+        self.registry = registry.SailorRegistry()
+        self.analyzers = {}
+        self.loading = {}
+        self.regattas = {}
+        self.responses = OrderedDict()
+        self.max_responses = max_responses
+        self.generation = 0
+        self.lock = threading.RLock()
+
+    def path(self, name: str) -> str:
+        """Get real path of results file inside root."""
+        if not name:
+            raise ValueError("Results file is missing!")
+        path = os.path.realpath(os.path.join(self.root, name))
+        if os.path.commonpath([self.root, path]) != self.root:
+            raise ValueError(f"{name} is outside of results folder!")
+        if not os.path.isfile(path):
+            raise FileNotFoundError(name)
+        return path
+
+    def load(self, path: str) -> Analyzer:
+        """Parse results file, files without sailors are rejected."""
+        analyzer = Analyzer(self.registry)
+        try:
+            analyzer.load_results(path)
+        except (IndexError, KeyError, AttributeError) as e:
+            raise ValueError(f"{os.path.relpath(path, self.root)} is not a results file ({e})!")
+        if not analyzer.data or not analyzer.data[0].races:
+            raise ValueError(f"{os.path.relpath(path, self.root)} has no results!")
+        return analyzer
+
+    def analyzer(self, path: str) -> Analyzer:
+        """Get cached Analyzer of file, file is parsed on first use.
+
+        Parsing is done outside the lock, other requests for the same file wait for its future.
+        """
+        analyzer = self.analyzers.get(path)
+        if analyzer is not None:
+            return analyzer
+        with self.lock:
+            if path in self.analyzers:
+                return self.analyzers[path]
+            future = self.loading.get(path)
+            loads = future is None
+            if loads:
+                future = self.loading[path] = Future()
+        if not loads:
+            return future.result()
+        try:
+            analyzer = self.load(path)
+        except BaseException as e:
+            with self.lock:
+                del self.loading[path]
+            future.set_exception(e)
+            raise
+        with self.lock:
+            # a reload while parsing has the newer file
+            analyzer = self.analyzers.setdefault(path, analyzer)
+            del self.loading[path]
+        future.set_result(analyzer)
+        return analyzer
+
+    def regatta(self, path: str) -> Regatta:
+        """Get cached Regatta of file, scenarios are scored once."""
+        analyzer = self.analyzer(path)
+        with self.lock:
+            regatta = self.regattas.get(path)
+            if regatta is None or regatta.analyzer is not analyzer:
+                regatta = self.regattas[path] = Regatta(path, analyzer)
+            return regatta
+
+    def reload(self, path: str) -> int:
+        """Parse file again and drop responses computed from it, return number of dropped responses.
+
+        Sailors which are in no cached file any more are dropped from the registry by starting a new one when it has
+        twice the sailors of the cached files, cached Sailors get new ids when they are joined again. Parsing is
+        done outside the lock, registries are safe to share between threads.
+        """
+        analyzer = self.load(path)
+        with self.lock:
+            self.analyzers[path] = analyzer
+            if len(self.registry) > 2 * sum(len(x.data) for x in self.analyzers.values()):
+                self.registry = registry.SailorRegistry()
+            self.regattas.pop(path, None)
+            self.generation += 1
+            stale = [key for key in self.responses if path in key[1]]
+            for key in stale:
+                del self.responses[key]
+        return len(stale)
+
+    def response(self, key: tuple, compute) -> bytes:
+        """Get cached json response, key is (query, paths, ...) and compute() builds the json object."""
+        with self.lock:
+            response = self.responses.get(key)
+            if response is not None:
+                self.responses.move_to_end(key)
+                return response
+            generation = self.generation
+        response = json.dumps(compute(), ensure_ascii=False).encode("utf-8")
+        with self.lock:
+            # a reload while computing may have made the response stale
+            if generation == self.generation:
+                self.responses[key] = response
+                while len(self.responses) > self.max_responses:
+                    self.responses.popitem(last=False)
+        return response
+
+    def standings(self, path: str, discount: int = 1, races: int = None) -> bytes:
+        """Get Analyzer.get_results standings."""
+        def compute():
+            results = self.analyzer(path).get_results(discount=discount, races=races)
+            return [sailor_row(i + 1, x, discount, races) for i, x in enumerate(results)]
+        return self.response(("standings", (path,), discount, races), compute)
+
+    def scenario(self, path: str, scenario: str = "get_results_normal_finals") -> bytes:
+        """Get standings of Regatta scenario."""
+        if scenario not in REGATTA_SCENARIOS:
+            raise ValueError(f"Unknown scenario {scenario}!")
+
+        def compute():
+            results = getattr(self.regatta(path), scenario)()
+            rules = scoring_rules.REGATTA_RULES[scenario]
+            return [sailor_row(i + 1, x, rules.discount, rules.races) for i, x in enumerate(results)]
+        return self.response(("scenario", (path,), scenario), compute)
+
+    def season(self, paths: tuple, variant: str = "get_results") -> bytes:
+        """Get Season standings of files in order."""
+        if variant not in SEASON_VARIANTS:
+            raise ValueError(f"Unknown season variant {variant}!")
+
+        def compute():
+            season = Season.from_regattas([self.analyzer(x) for x in paths], list(paths), self.registry)
+            return [season_row(i + 1, x) for i, x in enumerate(getattr(season, variant)())]
+        return self.response(("season", paths, variant), compute)
+
+
+class Handler(BaseHTTPRequestHandler):
+    """Request handler.
+
+    GET /standings?file=F&discount=1&races=N, /finals?file=F&scenario=S, /season?file=F1&file=F2&variant=V,
+    /regattas and POST /reload?file=F.
+    """
+
+    cache = None
+    protocol_version = "HTTP/1.1"
+
+    def _send(self, status: int, body: bytes):
+        """Send json response."""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, status: int, message: str):
+        """Send json error."""
+        self._send(status, json.dumps({"error": message}, ensure_ascii=False).encode("utf-8"))
+
+    def _dispatch(self, routes: dict):
+        """Answer request by route."""
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        route = routes.get(url.path.rstrip("/"))
+        if route is None:
+            return self._error(404, f"Unknown path {url.path}")
+        try:
+            body = route(query)
+        except FileNotFoundError as e:
+            return self._error(404, f"No results file {e}")
+        except ValueError as e:
+            return self._error(400, str(e))
+        except Exception as e:
+            self.log_error("%s", traceback.format_exc())
+            return self._error(500, f"{type(e).__name__}: {e}")
+        self._send(200, body)
+
+    def _int(self, query: dict, name: str, default: int = None) -> int:
+        """Get int query parameter."""
+        value = query.get(name, [None])[-1]
+        if value is None or value == "":
+            return default
+        try:
+            return int(value)
+        except ValueError:
+            raise ValueError(f"{name} must be a number!")
+
+    def do_GET(self):
+        """Get."""
+        cache = self.cache
+        self._dispatch({
+            "/standings": lambda q: cache.standings(cache.path(q.get("file", [None])[-1]),
+                                                    self._int(q, "discount", 1), self._int(q, "races")),
+            "/finals": lambda q: cache.scenario(cache.path(q.get("file", [None])[-1]),
+                                                q.get("scenario", ["get_results_normal_finals"])[-1]),
+            "/season": lambda q: cache.season(tuple(cache.path(x) for x in q.get("file", [])),
+                                              q.get("variant", ["get_results"])[-1]),
+            "/regattas": lambda q: json.dumps([os.path.relpath(x, cache.root) for x in cache.analyzers]).encode(),
+        })
+
+    def do_POST(self):
+        """Post."""
+        cache = self.cache
+        self._dispatch({
+            "/reload": lambda q: json.dumps({"dropped": cache.reload(cache.path(q.get("file", [None])[-1]))}).encode(),
+        })
+
+    def log_message(self, format, *args):
+        """Log only with profiling on."""
+        if instrumentation.is_enabled():
+            super().log_message(format, *args)
+
+
+def make_server(root: str = ".", host: str = "127.0.0.1", port: int = 8000) -> ThreadingHTTPServer:
+    """Get server of results files in root, run it with serve_forever()."""
+    handler = type("ResultsHandler", (Handler,), {"cache": ResultsCache(root)})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+instrumentation.instrument(ResultsCache, ["analyzer", "reload", "standings", "scenario", "season"])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve standings of results files as json.")
+    parser.add_argument("root", nargs="?", default=".", help="folder of results files")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+    server = make_server(args.root, args.host, args.port)
+    print(f"Serving {os.path.realpath(args.root)} on http://{args.host}:{server.server_port}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,327 @@
+"""Shadow mode: run legacy and optimized scoring side by side and compare rankings.
+
+The legacy paths are the frozen original code of legacy.py.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import legacy
+import progressive
+import results_matrix
+import scoring_rules
+from results_analyzer import Analyzer
+from season import Regatta, Season
+
+
+class Divergence:
+    """First position where two rankings differ."""
+
+    def __init__(self, position: int, legacy, optimized):
+        """Init."""
+        self.position = position
+        self.legacy = legacy
+        self.optimized = optimized
+
+    def __repr__(self):
+        """Repr."""
+        return f"position {self.position + 1}: legacy {self.legacy} != optimized {self.optimized}"
+
+
+class ShadowResult:
+    """Result of one shadow call."""
+
+    def __init__(self, name: str, legacy_time: float, optimized_time: float, divergence: Divergence = None,
+                 rejected: bool = False):
+        """Init, rejected is set when both paths raised on the input."""
+        self.name = name
+        self.legacy_time = legacy_time
+        self.optimized_time = optimized_time
+        self.divergence = divergence
+        self.rejected = rejected
+
+    @property
+    def speedup(self) -> float:
+        """Get speedup of optimized path."""
+        return self.legacy_time / self.optimized_time if self.optimized_time else float("inf")
+
+    def __repr__(self):
+        """Repr."""
+        status = "REJECTED" if self.rejected else "OK" if self.divergence is None else f"DIVERGED at {self.divergence}"
+        return f"{self.name}: {self.speedup:.2f}x {status}"
+
+
+def describe(entry) -> tuple:
+    """Get comparable description of ranking entry."""
+    if hasattr(entry, "races") and hasattr(entry, "sail_nr"):
+        # Sailor of results_analyzer or legacy
+        return (entry.name, entry.sail_nr, tuple(x.points for x in entry.races),
+                entry.silver.points if entry.silver else None, entry.gold.points if entry.gold else None)
+    if isinstance(entry, tuple) and len(entry) == 2 and isinstance(entry[1], list):
+        # Season.sort_year row: (name, [Competition, ..., total, extra])
+        return (entry[0], tuple((x.number, x.points, x.extra) for x in entry[1][:-2]), entry[1][-2], entry[1][-1])
+    return entry
+
+
+def first_divergence(legacy: list, optimized: list) -> Divergence:
+    """Get first diverging position or None."""
+    legacy = list(legacy)
+    optimized = list(optimized)
+    for i in range(max(len(legacy), len(optimized))):
+        a = describe(legacy[i]) if i < len(legacy) else None
+        b = describe(optimized[i]) if i < len(optimized) else None
+        if a != b:
+            return Divergence(i, a, b)
+    return None
+
+
+class ShadowRunner:
+    """Runs legacy and optimized paths on the same input and records speedup and divergences."""
+
+    def __init__(self, serve: str = "legacy", raise_on_divergence: bool = False):
+        """Init, serve is the path whose result is returned."""
+        self.serve = serve
+        self.raise_on_divergence = raise_on_divergence
+        self.records = []
+
+    def run(self, name: str, legacy, optimized, *args, **kwargs):
+        """Call both paths with same arguments, errors of the served path are raised after recording.
+
+        Inputs both paths raise on are recorded as rejected, an error of only one path is a divergence.
+        """
+        legacy_result, legacy_error, legacy_time = _timed(legacy, args, kwargs)
+        optimized_result, optimized_error, optimized_time = _timed(optimized, args, kwargs)
+        if legacy_error is not None or optimized_error is not None:
+            legacy_value = "result" if legacy_error is None else repr(legacy_error)
+            optimized_value = "result" if optimized_error is None else repr(optimized_error)
+            rejected = legacy_error is not None and optimized_error is not None
+            divergence = None if rejected else Divergence(-1, legacy_value, optimized_value)
+        else:
+            rejected = False
+            divergence = first_divergence(legacy_result, optimized_result)
+        record = ShadowResult(name, legacy_time, optimized_time, divergence, rejected)
+        self.records.append(record)
+        if record.divergence and self.raise_on_divergence:
+            raise AssertionError(repr(record))
+        if self.serve == "optimized":
+            legacy_result, legacy_error = optimized_result, optimized_error
+        if legacy_error is not None:
+            raise legacy_error
+        return legacy_result
+
+    @property
+    def divergences(self) -> list:
+        """Get records with divergence."""
+        return [x for x in self.records if x.divergence]
+
+    @property
+    def rejected(self) -> list:
+        """Get records of inputs both paths rejected."""
+        return [x for x in self.records if x.rejected]
+
+    def report(self) -> str:
+        """Get summary per name."""
+        lines = []
+        for name in dict.fromkeys(x.name for x in self.records):
+            records = [x for x in self.records if x.name == name]
+            compared = [x for x in records if not x.rejected]
+            legacy_time = sum(x.legacy_time for x in compared)
+            optimized_time = sum(x.optimized_time for x in compared)
+            diverged = [x for x in records if x.divergence]
+            speedup = legacy_time / optimized_time if optimized_time else 0
+            line = f"{name:<40} calls {len(records):>5} rejected {len(records) - len(compared):>5}"
+            line += f" speedup {speedup:>7.2f}x diverged {len(diverged)}"
+            line += f" (first {diverged[0].divergence})" if diverged else ""
+            lines.append(line)
+        return "\n".join(lines)
+
+
+def _timed(func, args: tuple, kwargs: dict) -> tuple:
+    """Get (result, error, seconds) of call."""
+    start = time.perf_counter()
+    try:
+        return func(*args, **kwargs), None, time.perf_counter() - start
+    except Exception as e:
+        return None, e, time.perf_counter() - start
+
+
+# name: (kind, legacy(input), optimized(input), finals), kind 'regatta' gets csv path, 'season' gets list of csv
+# paths, generated regattas of engines with finals set always have finals
+ENGINES = {}
+
+
+def register_engine(name: str, kind: str, legacy, optimized, finals: bool = False):
+    """Register optimized path with its legacy reference, finals engines are only checked on regattas with finals."""
+    if kind not in ("regatta", "season"):
+        raise ValueError(f"Unknown engine kind {kind}!")
+    ENGINES[name] = (kind, legacy, optimized, finals)
+
+
+def generate_case(folder: str, rng: random.Random, kind: str, fleet: int = None, finals: bool = False) -> tuple:
+    """Generate random regatta or season, return (input, params)."""
+    import benchmark
+    drawn_fleet = rng.randint(4, 60)
+    params = {
+        "fleet": fleet or drawn_fleet,
+        "races": rng.randint(3, 12),
+        "finals": rng.random() < 0.5 or finals,
+        "code_rate": rng.choice([0, 0.02, 0.1, 0.3]),
+        "seed": rng.randrange(2**32),
+    }
+    if kind == "season":
+        params["regattas"] = rng.randint(1, 6)
+        params["races"] = max(params["races"], 4)
+        params["fleet"] = max(params["fleet"], 10)
+        paths = benchmark.generate_season(folder, params["regattas"], params["fleet"], params["races"],
+                                          1 if params["finals"] else 0, params["seed"])
+        return paths, params
+    if params["finals"]:
+        params["fleet"] = max(params["fleet"], 10)
+    path = os.path.join(folder, "case.csv")
+    benchmark.generate_regatta(path, benchmark.generate_fleet(params["fleet"], random.Random(params["seed"])),
+                               params["races"], params["finals"], seed=params["seed"], code_rate=params["code_rate"])
+    return path, params
+
+
+def _check(name: str, engine: tuple, folder: str, case_seed: int, runner: ShadowRunner, fleet: int = None) -> tuple:
+    """Run one generated case, return (params, ShadowResult)."""
+    case, params = generate_case(folder, random.Random(case_seed), engine[0], fleet, engine[3])
+    try:
+        runner.run(name, engine[1], engine[2], case)
+    except Exception:
+        # the error is recorded as rejected input or divergence
+        pass
+    return params, runner.records[-1]
+
+
+def fuzz(names: list = None, runs: int = 100, seed: int = 0, shrink: bool = True,
+         runner: ShadowRunner = None) -> list:
+    """Compare engines on random fleets, return [(name, params, ShadowResult)] of failures.
+
+    Cases both paths reject are not failures, they are counted in runner.rejected and its report.
+    """
+    rng = random.Random(seed)
+    runner = runner if runner is not None else ShadowRunner()
+    failures = []
+    with tempfile.TemporaryDirectory() as folder:
+        for name in names or list(ENGINES):
+            engine = ENGINES[name]
+            for _ in range(runs):
+                case_seed = rng.randrange(2**32)
+                params, record = _check(name, engine, folder, case_seed, runner)
+                if record.divergence is None:
+                    continue
+                while shrink and params["fleet"] > 4:
+                    # shrink fleet size with the same random stream while it still fails
+                    smaller_params, smaller = _check(name, engine, folder, case_seed, ShadowRunner(),
+                                                     params["fleet"] - 1)
+                    if smaller.divergence is None:
+                        break
+                    if smaller_params["fleet"] >= params["fleet"]:
+                        break
+                    params, record = smaller_params, smaller
+                failures.append((name, params, record))
+    return failures
+
+
+def _load(path: str) -> legacy.Analyzer:
+    """Load legacy analyzer."""
+    analyzer = legacy.Analyzer()
+    analyzer.load_results(path)
+    return analyzer
+
+
+def _matrix_results(path: str, discount: int, races: int = None) -> list:
+    """Get results with vectorized scoring."""
+    matrix = results_matrix.load_matrix(path)
+    sailors = matrix.to_sailors()
+    return [sailors[i] for i in matrix.get_order(discount, races)]
+
+
+register_engine("load_results", "regatta", lambda path: _load(path).data,
+                lambda path: results_matrix.load_analyzer(path).data)
+for _discount, _races in ((0, None), (1, None), (2, None), (1, -2), (1, 3)):
+    register_engine(f"get_results({_discount}, {_races})", "regatta",
+                    lambda path, d=_discount, r=_races: _load(path).get_results(d, r),
+                    lambda path, d=_discount, r=_races: _matrix_results(path, d, r))
+
+
+def _all_cutoffs(analyzer: legacy.Analyzer, max_discount: int = 2) -> list:
+    """Get get_results of every valid race cutoff and discount, one after another."""
+    results = []
+    for races in range(1, len(analyzer.data[0].races) + 1):
+        for discount in range(min(max_discount + 1, races)):
+            results += analyzer.get_results(discount, races)
+    return results
+
+
+def _progressive_results(path: str, max_discount: int = 2) -> list:
+    """Get results of every cutoff and discount from progressive standings."""
+    analyzer = Analyzer()
+    analyzer.load_results(path)
+    standings = progressive.from_analyzer(analyzer, max_discount)
+    return [analyzer.data[i] for races in range(1, standings.shape[0] + 1)
+            for discount in range(min(max_discount + 1, races)) for i in standings.standings(discount, races)]
+
+
+register_engine("progressive", "regatta", lambda path: _all_cutoffs(_load(path)), _progressive_results)
+# legacy scenarios which need finals places
+_FINALS_ONLY = ["get_results_normal_finals", "get_results_4"]
+
+
+for _name in scoring_rules.REGATTA_RULES:
+    register_engine(f"Regatta.{_name}", "regatta", lambda path, n=_name: getattr(legacy.Regatta(path), n)(),
+                    lambda path, n=_name: getattr(Regatta(path), n)(), finals=_name in _FINALS_ONLY)
+
+
+def _legacy_calls(path: str, names: list) -> list:
+    """Get described results of scenario calls, each on a new legacy Regatta because legacy scoring changes data."""
+    return [describe(x) for name in names for x in getattr(legacy.Regatta(path), name)()]
+
+
+def _scenario_calls(regatta: Regatta, names: list) -> list:
+    """Get described results of scenario calls in order on one regatta."""
+    return [describe(x) for name in names for x in getattr(regatta, name)()]
+
+
+register_engine("Regatta.get_results_batch", "regatta",
+                lambda path: _legacy_calls(path, list(scoring_rules.REGATTA_RULES)),
+                lambda path: [describe(x) for results in
+                              Regatta(path).get_results_batch(scoring_rules.REGATTA_RULES).values() for x in results],
+                finals=True)
+# report order of examples.write_regatta_report, memoized results must not depend on earlier calls
+_REPORT_CALLS = ["get_results_normal_finals", "get_results_normal", "get_results_2", "get_results_normal_finals",
+                 "get_results_3", "get_results_4", "get_results_normal_finals", "get_results_4", "get_results_2",
+                 "get_results_newfinals_1", "get_results_normal", "get_results_newfinals_1", "get_results_oldfinals_1",
+                 "get_results_oldfinals_2", "get_results_oldfinals_1"]
+register_engine("Regatta report calls", "regatta", lambda path: _legacy_calls(path, _REPORT_CALLS),
+                lambda path: _scenario_calls(Regatta(path), _REPORT_CALLS), finals=True)
+
+
+register_engine("Season.load_sync", "season", lambda paths: legacy.Season(paths).get_results_finals(),
+                lambda paths: Season(paths).load_sync().get_results_finals())
+
+for _name in ["get_results", "get_results_finals", "get_results_old1", "get_results_old2", "get_results_old3",
+              "get_results_new1", "get_results_new2", "get_results_new3", "get_results_new4", "get_results_new5",
+              "get_results_new6"]:
+    register_engine(f"Season.{_name}", "season", lambda paths, n=_name: getattr(legacy.Season(paths), n)(),
+                    lambda paths, n=_name: getattr(Season(paths), n)())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fuzz optimized scoring paths against legacy code.")
+    parser.add_argument("engines", nargs="*", help="engines to check, default all")
+    parser.add_argument("--runs", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    if not ENGINES:
+        print("No optimized engines registered.", file=sys.stderr)
+    shadow_runner = ShadowRunner()
+    for engine_name, case_params, result in fuzz(args.engines, args.runs, args.seed, runner=shadow_runner):
+        print(f"{engine_name} {case_params}: {result}")
+    print(shadow_runner.report())
+    if shadow_runner.rejected:
+        print(f"{len(shadow_runner.rejected)} of {len(shadow_runner.records)} cases were rejected by both paths.",
+              file=sys.stderr)
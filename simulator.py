@@ -0,0 +1,193 @@
+"""Monte Carlo simulation of regatta and season outcomes."""
+import argparse
+import concurrent.futures
+import sys
+import numpy as np
+import instrumentation
+import scoring
+import season_matrix
+from results_analyzer import Analyzer
+from season import Season
+
+TOPS = (1, 3, 10)
+
+
+class SimulationResult:
+    """Finishing counts of simulated outcomes."""
+
+    def __init__(self, names: list, counts, simulations: int, tops: tuple = TOPS):
+        """Init, counts[s, k] is the number of simulations where sailor s finished in top tops[k]."""
+        self.names = names
+        self.counts = counts
+        self.simulations = simulations
+        self.tops = tops
+
+    def probability(self, top: int):
+        """Get chance of every sailor to finish in top places."""
+        return self.counts[:, self.tops.index(top)] / self.simulations
+
+    @property
+    def win(self):
+        """Get chance to win."""
+        return self.probability(1)
+
+    @property
+    def podium(self):
+        """Get chance to finish on podium."""
+        return self.probability(3)
+
+    @property
+    def top10(self):
+        """Get chance to finish in top 10."""
+        return self.probability(10)
+
+    def table(self) -> list:
+        """Get [(name, win, podium, top 10)] from the most likely winner."""
+        rows = list(zip(self.names, self.win.tolist(), self.podium.tolist(), self.top10.tolist()))
+        return sorted(rows, key=lambda x: (-x[1], -x[2], -x[3]))
+
+
+def sample(history, mask, shape: tuple, rng: np.random.Generator):
+    """Get (simulations, sailors, draws) values drawn from every sailor's results in history (sailors, results).
+
+    Only results where mask is set are drawn, sailors without results get inf.
+    """
+    simulations, draws = shape
+    order = np.argsort(~mask, axis=1, kind="stable")
+    history = np.take_along_axis(np.asarray(history, dtype=float), order, axis=1)
+    counts = mask.sum(axis=1)
+    index = (rng.random((simulations, len(history), draws)) * counts[:, None]).astype(np.int64)
+    values = history[np.arange(len(history))[None, :, None], np.minimum(index, max(history.shape[1] - 1, 0))]
+    return np.where(counts[:, None] > 0, values, np.inf)
+
+
+def rank(values, rng: np.random.Generator):
+    """Get 0-based places of sailors in every simulated race of values (simulations, sailors, races).
+
+    Equal values are ordered randomly.
+    """
+    values = values.swapaxes(1, 2)
+    order = np.lexsort((rng.random(values.shape), values), axis=-1)
+    places = np.empty(values.shape, dtype=np.int64)
+    np.put_along_axis(places, order, np.arange(values.shape[-1]), axis=-1)
+    return places.swapaxes(1, 2)
+
+
+def _count(order, sailors: int, tops: tuple = TOPS):
+    """Get (sailors, tops) counts of places in order (simulations, sailors)."""
+    return np.stack([np.bincount(order[:, :top].ravel(), minlength=sailors) for top in tops], axis=1)
+
+
+def _simulate_regatta(points, discardable, races: int, discount: int, simulations: int, seed):
+    """Get finishing counts of simulations of the remaining races."""
+    rng = np.random.default_rng(seed)
+    sailors = len(points)
+    places = rank(sample(points, np.ones(points.shape, dtype=bool), (simulations, races), rng), rng) + 1.0
+    points = np.concatenate([np.broadcast_to(points, (simulations,) + points.shape), places], axis=-1)
+    discardable = np.concatenate([np.broadcast_to(discardable, (simulations,) + discardable.shape),
+                                  np.ones(places.shape, dtype=bool)], axis=-1)
+    return _count(scoring.get_order(points, discount, None, discardable), sailors)
+
+
+def _simulate_season(values, mask, history, history_mask, entered, base: int, keep_all: int, simulations: int,
+                     seed):
+    """Get finishing counts of simulations of the last regatta."""
+    rng = np.random.default_rng(seed)
+    sailors, width = values.shape
+    draws = np.where(entered, sample(history, history_mask, (simulations, 1), rng)[..., 0], np.inf)
+    places = rank(draws[..., None], rng)[..., 0]
+    totals = base - places + np.where(places < 3, 3 - places, 0)
+
+    rows = np.flatnonzero(entered)
+    columns = mask.sum(axis=1)[rows]
+    full = np.zeros((simulations, sailors, width + 1), dtype=values.dtype)
+    full_mask = np.zeros(full.shape, dtype=bool)
+    full[..., :width] = values
+    full_mask[..., :width] = mask
+    full[:, rows, columns] = totals[:, rows]
+    full_mask[:, rows, columns] = True
+    extras = season_matrix.score(full, full_mask, keep_all)[1]
+    return _count(np.argsort(-extras, axis=-1, kind="stable"), sailors)
+
+
+def _run(func, args: tuple, simulations: int, seed, batch: int, executor: concurrent.futures.Executor,
+         workers: int):
+    """Run simulations in batches, batch seeds are spawned from seed so results do not depend on workers."""
+    sizes = [min(batch, simulations - i) for i in range(0, simulations, batch)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    own_executor = executor is None and workers is not None and workers > 1 and len(sizes) > 1
+    if own_executor:
+        executor = concurrent.futures.ProcessPoolExecutor(max_workers=workers)
+    try:
+        tasks = [args + (size, batch_seed) for size, batch_seed in zip(sizes, seeds)]
+        if executor is None:
+            counts = [func(*x) for x in tasks]
+        else:
+            counts = list(executor.map(func, *zip(*tasks)))
+    finally:
+        if own_executor:
+            executor.shutdown()
+    return sum(counts)
+
+
+def simulate_regatta(analyzer: Analyzer, races: int, discount: int = 1, simulations: int = 10000, seed: int = None,
+                     batch: int = 2000, executor: concurrent.futures.Executor = None,
+                     workers: int = None) -> SimulationResult:
+    """Simulate remaining races of regatta, sailors place by their own sailed races.
+
+    Results are ranked by Analyzer.get_results(discount) rules over sailed and simulated races.
+    """
+    if simulations < 1:
+        raise ValueError("You need at least one simulation!")
+    points = np.array([[x.points for x in sailor.races] for sailor in analyzer.data], dtype=float)
+    discardable = np.array([[x.discardable for x in sailor.races] for sailor in analyzer.data], dtype=bool)
+    counts = _run(_simulate_regatta, (points, discardable, races, discount), simulations, seed, batch, executor,
+                  workers)
+    return SimulationResult([x.name for x in analyzer.data], counts, simulations)
+
+
+def simulate_season(season: Season, entries: list = None, simulations: int = 10000, seed: int = None,
+                    batch: int = 2000, keep_all: int = 3, executor: concurrent.futures.Executor = None,
+                    workers: int = None) -> SimulationResult:
+    """Simulate last regatta of season, entries (default all sailors of season) place by their earlier places.
+
+    Standings are ranked by Season.get_results and Season.sort_year rules.
+    """
+    if simulations < 1:
+        raise ValueError("You need at least one simulation!")
+    base = season.get_points_base(season.get_regatta(0, season.regattas[0]).get_results_normal())
+    dic = {name: row[:-2] for name, row in season.get_results()}
+    matrix = season_matrix.SeasonMatrix.from_dict(dic)
+    values, mask = matrix.compact()
+    width = values.shape[1]
+    history = np.array([[base - x.points for x in dic[key]] + [0] * (width - len(dic[key])) for key in matrix.keys],
+                       dtype=float).reshape(len(matrix.keys), width)
+    entered = np.isin(np.array(matrix.keys, dtype=object), list(matrix.keys if entries is None else entries))
+    counts = _run(_simulate_season, (values, mask, history, mask, entered, base, keep_all), simulations, seed,
+                  batch, executor, workers)
+    return SimulationResult(matrix.keys, counts, simulations)
+
+
+instrumentation.instrument(sys.modules[__name__], ["simulate_regatta", "simulate_season"])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Chances to win, one file is a regatta, more files are a season.")
+    parser.add_argument("files", nargs="+")
+    parser.add_argument("--races", type=int, default=1, help="races left in regatta")
+    parser.add_argument("--discount", type=int, default=1)
+    parser.add_argument("--simulations", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+    if len(args.files) == 1:
+        regatta = Analyzer()
+        regatta.load_results(args.files[0])
+        result = simulate_regatta(regatta, args.races, args.discount, args.simulations, args.seed,
+                                  workers=args.workers)
+    else:
+        result = simulate_season(Season(args.files), simulations=args.simulations, seed=args.seed,
+                                 workers=args.workers)
+    print("{0:<30}{1:>8}{2:>8}{3:>8}".format("Name", "Win", "Podium", "Top 10"))
+    for name, win, podium, top10 in result.table():
+        print("{0:<30}{1:>8.3f}{2:>8.3f}{3:>8.3f}".format(name, win, podium, top10))
@@ -0,0 +1,137 @@
+"""Special scoring codes (DNF, DSQ, OCS...)."""
+import threading
+import numpy as np
+from results_analyzer import Analyzer, Place
+
+# Code ids are global so matrices loaded at different times share them, id 0 means plain finishing place. Ids are
+# local to the process, work sent to other processes gets lookup arrays instead of code tables.
+MAX_CODES = 1024
+_CODES = [""]
+_CODE_IDS = {"": 0}
+_LOCK = threading.Lock()
+
+
+def code_id(symbol: str) -> int:
+    """Get id of code symbol, 0 for symbols which are not codes.
+
+    After MAX_CODES different codes new symbols are not codes, so malformed files cannot grow the table without bound.
+    """
+    code = symbol.strip().lower() if symbol else ""
+    if not code.isalpha():
+        return 0
+    if code not in _CODE_IDS:
+        with _LOCK:
+            if code not in _CODE_IDS:
+                if len(_CODES) >= MAX_CODES:
+                    return 0
+                _CODES.append(code)
+                _CODE_IDS[code] = len(_CODES) - 1
+    return _CODE_IDS[code]
+
+
+def code_ids(symbols: list):
+    """Get array of code ids of symbols, every different symbol is looked up once."""
+    ids = {x: code_id(x) for x in set(symbols)}
+    return np.fromiter(map(ids.__getitem__, symbols), dtype=np.int16, count=len(symbols))
+
+
+def code_name(code: int) -> str:
+    """Get code symbol of id."""
+    return _CODES[code].upper()
+
+
+class CodeRule:
+    """Scoring rule of one code."""
+
+    def __init__(self, offset: int = 1, fixed: float = None, keep: bool = False, discardable: bool = True):
+        """Init, code scores fleet size + offset, or fixed points, or the points in results if keep is set."""
+        self.offset = offset
+        self.fixed = fixed
+        self.keep = keep
+        self.discardable = discardable
+
+    def points(self, fleet_size: int) -> float:
+        """Get points for code, nan if results points are kept."""
+        if self.keep:
+            return np.nan
+        if self.fixed is not None:
+            return self.fixed
+        return fleet_size + self.offset
+
+
+class CodeTable:
+    """Table of code rules."""
+
+    def __init__(self, codes: list = None, rules: dict = None):
+        """Init with default rule for codes and explicit rules by code."""
+        self.rules = {}
+        for code in codes if codes is not None else Analyzer().special_codes:
+            self.set_rule(code, CodeRule(discardable=code.lower() != "dne"))
+        for code, rule in (rules or {}).items():
+            self.set_rule(code, rule)
+
+    def set_rule(self, code: str, rule: CodeRule):
+        """Set rule of code, ValueError if code is not letters or the code table is full."""
+        number = code_id(code)
+        if not number:
+            if not code.strip().isalpha():
+                raise ValueError(f"Code {code} must be letters!")
+            raise ValueError(f"Code {code} does not fit the code table of {MAX_CODES} codes!")
+        self.rules[code.strip().lower()] = rule
+
+    def lookup(self, fleet_size: int) -> tuple:
+        """Get (points, discardable) arrays indexed by code id."""
+        points = np.full(len(_CODES), np.nan)
+        discardable = np.ones(len(_CODES), dtype=bool)
+        for code, rule in self.rules.items():
+            number = _CODE_IDS.get(code)
+            if number is None:
+                raise ValueError(f"Code {code} is not in the code table!")
+            points[number] = rule.points(fleet_size)
+            discardable[number] = rule.discardable
+        return points, discardable
+
+    def score(self, points, codes, fleet_size: int = None) -> tuple:
+        """Get (points, discardable) matrices with code penalties applied."""
+        return score_lookup(points, codes, self.lookup(len(points) if fleet_size is None else fleet_size))
+
+    def apply_to_sailors(self, sailors: list, fleet_size: int = None, codes=None):
+        """Rescore race places with codes in Sailor objects, codes is their code id matrix if already resolved."""
+        codes = sailor_codes(sailors) if codes is None else codes
+        penalty, discardable = self.lookup(len(sailors) if fleet_size is None else fleet_size)
+        rows, races = np.nonzero(codes)
+        coded = codes[rows, races]
+        for row, race, points, flag in zip(rows.tolist(), races.tolist(), penalty[coded].tolist(),
+                                           discardable[coded].tolist()):
+            place = sailors[row].races[race]
+            sailors[row].races[race] = Place(place.points if np.isnan(points) else points, place.symbol, flag)
+
+
+def score_lookup(points, codes, lookup: tuple) -> tuple:
+    """Get (points, discardable) matrices with penalties of CodeTable.lookup arrays applied."""
+    penalty, discardable = lookup
+    penalty = penalty[codes]
+    return np.where(np.isnan(penalty), points, penalty), discardable[codes]
+
+
+def resolve(symbols: dict, shape: tuple):
+    """Get code id matrix of race symbols {(row, race): symbol}."""
+    codes = np.zeros(shape, dtype=np.int16)
+    cells = [(row, column, symbol) for (row, column), symbol in symbols.items() if not isinstance(column, str)]
+    if cells:
+        rows, columns, values = zip(*cells)
+        codes[list(rows), list(columns)] = code_ids(list(values))
+    return codes
+
+
+def sailor_codes(sailors: list):
+    """Get code id matrix of race symbols of Sailor objects, shorter series are padded with 0."""
+    width = max((len(x.races) for x in sailors), default=0)
+    symbols = []
+    for sailor in sailors:
+        symbols += [x.symbol for x in sailor.races]
+        symbols += [""] * (width - len(sailor.races))
+    return code_ids(symbols).reshape(len(sailors), width)
+
+
+DEFAULT_TABLE = CodeTable()
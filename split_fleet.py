@@ -0,0 +1,136 @@
+"""Split fleet scoring: qualifying series in several fleets, final series in gold/silver/... fleets."""
+import concurrent.futures
+import sys
+import threading
+import numpy as np
+import instrumentation
+import scoring
+import special_codes
+from results_matrix import ResultsMatrix
+
+FLEET_RANKS = {"gold": 0, "kuld": 0, "silver": 1, "hõbe": 1, "bronze": 2, "pronks": 2, "emerald": 3}
+# events of at most this many boats are scored in process, sending fleets to workers costs more than scoring them
+SMALL_EVENT = 100
+_POOLS = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def fleet_key(fleet: str) -> tuple:
+    """Get sort key of final fleet, gold first and unassigned last."""
+    name = (fleet or "").strip().lower()
+    return (not name, FLEET_RANKS.get(name, len(FLEET_RANKS)), name)
+
+
+def _score_fleet(points, discardable, discount: int):
+    """Get nett points with tie break of one fleet with codes already scored."""
+    if points.shape[1] <= discount:
+        discount = max(points.shape[1] - 1, 0)
+    return scoring.nett_points(points, discount, None, discardable, True)
+
+
+def _pool(workers: int) -> concurrent.futures.ProcessPoolExecutor:
+    """Get process pool of workers, pools are kept for later calls."""
+    with _POOLS_LOCK:
+        if workers not in _POOLS:
+            _POOLS[workers] = concurrent.futures.ProcessPoolExecutor(max_workers=workers)
+        return _POOLS[workers]
+
+
+def _groups(row_fleets: list) -> dict:
+    """Get {fleet: rows}."""
+    fleets = {}
+    for row, fleet in enumerate(row_fleets):
+        fleets.setdefault(fleet, []).append(row)
+    return fleets
+
+
+def score_codes(matrix: ResultsMatrix, columns: list, row_fleets: list, table: special_codes.CodeTable,
+                points=None, discardable=None) -> tuple:
+    """Get (points, discardable) matrices of all races with codes of columns scored by size of the fleet of each row.
+
+    Points and discardable of other columns are taken from the given matrices, default is the points of matrix.
+    """
+    points = matrix.points.astype(float) if points is None else points
+    discardable = np.ones(points.shape, dtype=bool) if discardable is None else discardable
+    for rows in _groups(row_fleets).values():
+        cells = np.ix_(rows, columns)
+        points[cells], discardable[cells] = special_codes.score_lookup(matrix.points[cells], matrix.codes[cells],
+                                                                       table.lookup(len(rows)))
+    return points, discardable
+
+
+class SplitFleetResults:
+    """Results of split fleet event."""
+
+    def __init__(self, matrix: ResultsMatrix, order, stage: str, fleets: dict):
+        """Init, order is row order of matrix, fleets maps fleet name to rows."""
+        self.matrix = matrix
+        self.order = order
+        self.stage = stage
+        self.fleets = fleets
+
+    def fleet_order(self, fleet: str) -> list:
+        """Get row order inside one fleet."""
+        rows = set(self.fleets[fleet])
+        return [x for x in self.order if x in rows]
+
+
+def get_stage(matrix: ResultsMatrix) -> tuple:
+    """Get ('final' or 'qualifying', fleet of each row, race columns to score)."""
+    qualifying = [i for i, x in enumerate(matrix.race_series) if x == "Q"]
+    final_fleets = [(x or "").strip() for x in matrix.column("final_fleet")]
+    if any(final_fleets) and len(qualifying) < matrix.races:
+        return "final", final_fleets, list(range(matrix.races))
+    qual_fleets = [(x or "").strip() for x in matrix.column("qual_fleet")]
+    return "qualifying", qual_fleets, qualifying or list(range(matrix.races))
+
+
+def score(matrix: ResultsMatrix, discount: int = 1, table: special_codes.CodeTable = None,
+          executor: concurrent.futures.Executor = None, workers: int = None) -> SplitFleetResults:
+    """Score every fleet independently and combine, fleets run in executor or a shared process pool of workers.
+
+    In the qualifying stage sailors of all fleets are ranked together by points, in the final stage each final
+    fleet is ranked after the fleets above it. Codes of qualifying races are scored by the size of the qualifying
+    fleet and carried to the final series, codes of final races by the size of the final fleet. Events of at most
+    SMALL_EVENT boats are scored in process.
+    """
+    table = table or special_codes.DEFAULT_TABLE
+    stage, row_fleets, columns = get_stage(matrix)
+    if stage == "final":
+        qualifying = [i for i, x in enumerate(matrix.race_series) if x == "Q"]
+        qual_fleets = [(x or "").strip() for x in matrix.column("qual_fleet")]
+        points, discardable = score_codes(matrix, qualifying, qual_fleets, table)
+        points, discardable = score_codes(matrix, [x for x in columns if x not in qualifying], row_fleets, table,
+                                          points, discardable)
+    else:
+        points, discardable = score_codes(matrix, columns, row_fleets, table)
+        points, discardable = points[:, columns], discardable[:, columns]
+    fleets = _groups(row_fleets)
+    names = sorted(fleets, key=fleet_key)
+    tasks = [(points[fleets[x]], discardable[fleets[x]], discount) for x in names]
+    if len(matrix) <= SMALL_EVENT or len(names) < 2 or (executor is None and (workers is None or workers < 2)):
+        keys = [_score_fleet(*x) for x in tasks]
+    else:
+        keys = list((executor or _pool(workers)).map(_score_fleet, *zip(*tasks)))
+
+    if stage == "final":
+        order = []
+        for fleet, fleet_keys in zip(names, keys):
+            order += [fleets[fleet][i] for i in np.argsort(fleet_keys, kind="stable")]
+    else:
+        all_keys = np.empty(len(matrix))
+        for fleet, fleet_keys in zip(names, keys):
+            all_keys[fleets[fleet]] = fleet_keys
+        order = np.argsort(all_keys, kind="stable").tolist()
+    return SplitFleetResults(matrix, order, stage, fleets)
+
+
+def get_results(analyzer, discount: int = 1, table: special_codes.CodeTable = None,
+                executor: concurrent.futures.Executor = None, workers: int = None) -> list:
+    """Get split fleet results of Analyzer as Sailor list."""
+    matrix = analyzer.matrix if analyzer.matrix is not None else ResultsMatrix.from_analyzer(analyzer)
+    results = score(matrix, discount, table, executor, workers)
+    return [analyzer.data[i] for i in results.order]
+
+
+instrumentation.instrument(sys.modules[__name__], ["score"])
@@ -0,0 +1,270 @@
+"""SQLite results store."""
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import numpy as np
+import instrumentation
+import registry
+from results_analyzer import Analyzer, Place, Sailor
+from results_matrix import ResultsMatrix
+from season import Season
+
+# points columns have no type so ints and floats come back as they were stored
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS regattas (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE,
+    year INTEGER,
+    class TEXT,
+    number INTEGER,
+    syntax TEXT,
+    race_series TEXT
+);
+CREATE TABLE IF NOT EXISTS sailors (
+    id INTEGER PRIMARY KEY,
+    key TEXT UNIQUE,
+    name TEXT
+);
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    regatta_id INTEGER REFERENCES regattas(id) ON DELETE CASCADE,
+    sailor_id INTEGER REFERENCES sailors(id),
+    row INTEGER,
+    name TEXT,
+    sail_nr TEXT,
+    gender TEXT,
+    nationality TEXT,
+    club TEXT,
+    sub_categories TEXT,
+    qual_fleet TEXT,
+    final_fleet TEXT
+);
+CREATE TABLE IF NOT EXISTS races (
+    entry_id INTEGER REFERENCES entries(id) ON DELETE CASCADE,
+    race INTEGER,
+    points,
+    symbol TEXT,
+    discardable INTEGER,
+    PRIMARY KEY (entry_id, race)
+);
+CREATE TABLE IF NOT EXISTS finals (
+    entry_id INTEGER REFERENCES entries(id) ON DELETE CASCADE,
+    fleet TEXT,
+    points,
+    symbol TEXT,
+    discardable INTEGER,
+    PRIMARY KEY (entry_id, fleet)
+);
+CREATE INDEX IF NOT EXISTS regattas_class_year ON regattas (class, year);
+CREATE INDEX IF NOT EXISTS regattas_year ON regattas (year);
+CREATE INDEX IF NOT EXISTS entries_regatta ON entries (regatta_id, row);
+CREATE INDEX IF NOT EXISTS entries_sailor ON entries (sailor_id);
+CREATE INDEX IF NOT EXISTS entries_club ON entries (club);
+"""
+
+
+def path_info(path: str) -> tuple:
+    """Get (year, class) of results file in Data/<year>/<class>/ folder tree, None where unknown."""
+    parts = os.path.normpath(os.path.abspath(path)).split(os.sep)
+    if len(parts) >= 3 and parts[-3].isdigit():
+        return int(parts[-3]), parts[-2]
+    return None, None
+
+
+def archive_files(folder: str = "./Data/", date_order: bool = False) -> list:
+    """Get [(year, class, number, path)] of csv files in Data/<year>/<class>/ folder tree, numbered in file name order.
+
+    Files are sorted by year, class and number, with date_order regattas of a year are in number order across classes.
+    """
+    files = []
+    years = sorted((x for x in os.scandir(folder) if x.is_dir() and x.name.isdigit()), key=lambda x: x.name)
+    for year in years:
+        for boat in sorted((x for x in os.scandir(year.path) if x.is_dir()), key=lambda x: x.name):
+            names = sorted(x for x in os.listdir(boat.path) if x.endswith(".csv"))
+            files += [(int(year.name), boat.name, n + 1, os.path.join(boat.path, x)) for n, x in enumerate(names)]
+    if date_order:
+        files.sort(key=lambda x: (x[0], x[2], x[1]))
+    return files
+
+
+def file_fingerprint(path: str) -> str:
+    """Get hash of file contents."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ResultsStore:
+    """Results store in SQLite database."""
+
+    def __init__(self, path: str = ":memory:"):
+        """Init, database is created if needed."""
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        self.connection.executescript(SCHEMA)
+        self.keys = registry.SailorRegistry()
+
+    def close(self):
+        """Close database."""
+        self.connection.close()
+
+    def __enter__(self):
+        """Enter."""
+        return self
+
+    def __exit__(self, *args):
+        """Exit."""
+        self.close()
+
+    def _sailor_ids(self, sailors: list) -> list:
+        """Get store ids of sailors, new sailors are added."""
+        keys = [json.dumps(self.keys.key(x.name, x.sail_nr), ensure_ascii=False) for x in sailors]
+        self.connection.executemany("INSERT OR IGNORE INTO sailors (key, name) VALUES (?, ?)",
+                                    zip(keys, [x.name for x in sailors]))
+        ids = {}
+        unique = list(set(keys))
+        for i in range(0, len(unique), 500):
+            chunk = unique[i:i + 500]
+            query = f"SELECT key, id FROM sailors WHERE key IN ({', '.join('?' * len(chunk))})"
+            ids.update(self.connection.execute(query, chunk).fetchall())
+        return [ids[x] for x in keys]
+
+    def add_regatta(self, analyzer: Analyzer, path: str, year: int = None, boat_class: str = None,
+                    number: int = None) -> int:
+        """Add loaded regatta, regatta already stored with the same path is replaced. Return regatta id."""
+        if year is None and boat_class is None:
+            year, boat_class = path_info(path)
+        with self.connection:
+            self.connection.execute("DELETE FROM regattas WHERE path = ?", (path,))
+            cursor = self.connection.execute(
+                "INSERT INTO regattas (path, year, class, number, syntax, race_series) VALUES (?, ?, ?, ?, ?, ?)",
+                (path, year, boat_class, number, json.dumps(analyzer.syntax), json.dumps(analyzer.race_series)))
+            regatta_id = cursor.lastrowid
+            sailor_ids = self._sailor_ids(analyzer.data)
+            start = self.connection.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM entries").fetchone()[0]
+            self.connection.executemany(
+                "INSERT INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(start + row, regatta_id, sailor_ids[row], row, x.name, x.sail_nr, x.gender, x.nationality, x.club,
+                  json.dumps(x.sub_categories), x.qual_fleet, x.final_fleet) for row, x in enumerate(analyzer.data)])
+            self.connection.executemany(
+                "INSERT INTO races VALUES (?, ?, ?, ?, ?)",
+                [(start + row, race, place.points, place.symbol, place.discardable)
+                 for row, x in enumerate(analyzer.data) for race, place in enumerate(x.races)])
+            self.connection.executemany(
+                "INSERT INTO finals VALUES (?, ?, ?, ?, ?)",
+                [(start + row, fleet, place.points, place.symbol, place.discardable)
+                 for row, x in enumerate(analyzer.data) for fleet, place in (("silver", x.silver), ("gold", x.gold))
+                 if place is not None])
+        return regatta_id
+
+    def import_file(self, path: str, year: int = None, boat_class: str = None, number: int = None) -> int:
+        """Load results file and add it, return regatta id."""
+        analyzer = Analyzer()
+        analyzer.load_results(path)
+        return self.add_regatta(analyzer, path, year, boat_class, number)
+
+    def import_folder(self, folder: str = "./Data/") -> list:
+        """Add csv files of Data/<year>/<class>/ folder tree, numbered in file name order. Return regatta ids."""
+        return [self.import_file(path, year, boat, number) for year, boat, number, path in archive_files(folder)]
+
+    def regattas(self, boat_class: str = None, year: int = None, since: int = None) -> list:
+        """Get [(id, path, year, class, number)] of stored regattas in number order."""
+        where, args = self._where(boat_class=boat_class, year=year, since=since)
+        return self.connection.execute(f"SELECT id, path, year, class, number FROM regattas{where} "
+                                       "ORDER BY year, class, number, id", args).fetchall()
+
+    def results(self, boat_class: str = None, club: str = None, since: int = None, until: int = None,
+                name: str = None, sail_nr: str = None) -> list:
+        """Get [(year, class, regatta path, row, name, club, points)] of stored entries, points is sum of races."""
+        sailor = None if name is None else json.dumps(self.keys.key(name, sail_nr), ensure_ascii=False)
+        where, args = self._where(boat_class=boat_class, club=club, since=since, until=until, sailor=sailor)
+        return self.connection.execute(
+            "SELECT regattas.year, regattas.class, regattas.path, entries.row, entries.name, entries.club, "
+            "(SELECT SUM(points) FROM races WHERE entry_id = entries.id) "
+            f"FROM entries JOIN regattas ON regattas.id = entries.regatta_id{where} "
+            "ORDER BY regattas.year, regattas.class, regattas.number, regattas.id, entries.row", args).fetchall()
+
+    def _where(self, boat_class: str = None, year: int = None, since: int = None, until: int = None,
+               club: str = None, sailor: str = None) -> tuple:
+        """Get (sql where clause, args) of filters which are set."""
+        filters = [("regattas.class = ?", boat_class), ("regattas.year = ?", year), ("regattas.year >= ?", since),
+                   ("regattas.year <= ?", until), ("entries.club = ?", club),
+                   ("entries.sailor_id = (SELECT id FROM sailors WHERE key = ?)", sailor)]
+        filters = [(sql, value) for sql, value in filters if value is not None]
+        if not filters:
+            return "", []
+        return " WHERE " + " AND ".join(x[0] for x in filters), [x[1] for x in filters]
+
+    def _places(self, query: str, regatta_id: int) -> dict:
+        """Get {row: [(key, Place)]} of races or finals rows of regatta."""
+        places = {}
+        for row, key, points, symbol, discardable in self.connection.execute(query, (regatta_id,)):
+            places.setdefault(row, []).append((key, Place(points, symbol, bool(discardable))))
+        return places
+
+    def load_analyzer(self, regatta_id: int) -> Analyzer:
+        """Get Analyzer of stored regatta."""
+        syntax, race_series = self.connection.execute("SELECT syntax, race_series FROM regattas WHERE id = ?",
+                                                      (regatta_id,)).fetchone()
+        races = self._places("SELECT entries.row, race, points, symbol, discardable FROM races "
+                             "JOIN entries ON entries.id = races.entry_id WHERE regatta_id = ? ORDER BY race",
+                             regatta_id)
+        finals = self._places("SELECT entries.row, fleet, points, symbol, discardable FROM finals "
+                              "JOIN entries ON entries.id = finals.entry_id WHERE regatta_id = ?", regatta_id)
+        data = []
+        for row, name, sail_nr, gender, nat, club, sub_cats, qual_fleet, final_fleet in self.connection.execute(
+                "SELECT row, name, sail_nr, gender, nationality, club, sub_categories, qual_fleet, final_fleet "
+                "FROM entries WHERE regatta_id = ? ORDER BY row", (regatta_id,)):
+            fleets = dict(finals.get(row, []))
+            data.append(Sailor(name, sail_nr, gender, json.loads(sub_cats), nat,
+                               [x[1] for x in races.get(row, [])], club, fleets.get("silver"), fleets.get("gold"),
+                               qual_fleet, final_fleet))
+        analyzer = Analyzer()
+        analyzer.syntax = json.loads(syntax)
+        analyzer.race_series = json.loads(race_series)
+        analyzer.data = data
+        analyzer.registry.register(data)
+        return analyzer
+
+    def load_matrix(self, regatta_id: int) -> ResultsMatrix:
+        """Get ResultsMatrix of stored regatta straight from queries."""
+        syntax, race_series = self.connection.execute("SELECT syntax, race_series FROM regattas WHERE id = ?",
+                                                      (regatta_id,)).fetchone()
+        entries = self.connection.execute(
+            "SELECT id, name, club, sail_nr, nationality, gender, qual_fleet, final_fleet FROM entries "
+            "WHERE regatta_id = ? ORDER BY row", (regatta_id,)).fetchall()
+        rows = {x[0]: i for i, x in enumerate(entries)}
+        count = self.connection.execute("SELECT MAX(race) + 1 FROM races JOIN entries ON entries.id = entry_id "
+                                        "WHERE regatta_id = ?", (regatta_id,)).fetchone()[0] or 0
+        points = np.zeros((len(entries), count))
+        symbols = {}
+        for entry_id, race, value, symbol in self.connection.execute(
+                "SELECT entry_id, race, points, symbol FROM races JOIN entries ON entries.id = entry_id "
+                "WHERE regatta_id = ?", (regatta_id,)):
+            points[rows[entry_id], race] = value
+            if symbol != str(value):
+                symbols[(rows[entry_id], race)] = symbol
+        finals = {"silver": np.full(len(entries), np.nan), "gold": np.full(len(entries), np.nan)}
+        for entry_id, fleet, value, symbol in self.connection.execute(
+                "SELECT entry_id, fleet, points, symbol FROM finals JOIN entries ON entries.id = entry_id "
+                "WHERE regatta_id = ?", (regatta_id,)):
+            finals[fleet][rows[entry_id]] = value
+            if symbol != str(value):
+                symbols[(rows[entry_id], fleet)] = symbol
+        raw_columns = {column: [None if x[i] is None else x[i].encode("utf-8") for x in entries]
+                       for i, column in enumerate(("sail_nr", "nat", "gender", "qual_fleet", "final_fleet"), 3)}
+        return ResultsMatrix(json.loads(syntax), [x[1] for x in entries], [x[2] for x in entries], points, symbols,
+                             finals["silver"], finals["gold"], raw_columns, race_series=json.loads(race_series))
+
+    def load_season(self, boat_class: str, year: int) -> Season:
+        """Get Season of stored regattas of class and year."""
+        regattas = self.regattas(boat_class=boat_class, year=year)
+        return Season.from_regattas([self.load_analyzer(x[0]) for x in regattas], [x[1] for x in regattas])
+
+
+instrumentation.instrument(ResultsStore, ["add_regatta", "load_analyzer", "load_matrix", "results"])
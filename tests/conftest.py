@@ -0,0 +1,14 @@
+"""Test fixtures, modules of the repository are imported from its root folder."""
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import benchmark  # noqa: E402
+
+
+@pytest.fixture
+def season_paths(tmp_path) -> list:
+    """Get csv paths of synthetic season with finals and sailors missing from some regattas."""
+    return benchmark.generate_season(str(tmp_path), regattas=4, fleet_size=20, races=6, finals_every=2, seed=3)
@@ -0,0 +1,62 @@
+"""Multi-season aggregator tests."""
+import os
+import random
+import pytest
+import benchmark
+from aggregator import Aggregator
+from results_analyzer import Analyzer
+
+
+@pytest.fixture
+def data(tmp_path) -> str:
+    """Get Data/<year>/<class> tree of two years with sailors missing from some regattas."""
+    data = str(tmp_path / "Data")
+    rng = random.Random(6)
+    fleet = benchmark.generate_fleet(30, rng)
+    for year in (2016, 2017):
+        for boat in ("Laser", "Optimist"):
+            folder = os.path.join(data, str(year), boat)
+            os.makedirs(folder)
+            for n in range(2):
+                benchmark.generate_regatta(os.path.join(folder, f"regatta_{n}.csv"), rng.sample(fleet, 20), races=5,
+                                           seed=year + n, dialect=0)
+    return data
+
+
+def test_positions(data):
+    with Aggregator(discount=1) as aggregator:
+        aggregator.add_archive(data)
+        rows = {(x[0], x[1]): x for x in aggregator.table(by=["sailor", "year"])}
+    expected = {}
+    for year in (2016, 2017):
+        for boat in ("Laser", "Optimist"):
+            for n in range(2):
+                analyzer = Analyzer()
+                analyzer.load_results(os.path.join(data, str(year), boat, f"regatta_{n}.csv"))
+                for position, sailor in enumerate(analyzer.get_results(discount=1), 1):
+                    expected.setdefault((sailor.name, year), []).append(position)
+    assert set(rows) == set(expected)
+    for key, positions in expected.items():
+        assert rows[key][2:5] == (len(positions), min(positions), pytest.approx(sum(positions) / len(positions)))
+
+
+def test_spill_split(data, tmp_path):
+    with Aggregator() as aggregator:
+        expected = aggregator.add_archive(data).table(by=["club", "boat"])
+    # one regatta is about 800 bytes of records, so every regatta spills and partitions must be split
+    with Aggregator(max_memory=400, partitions=2, folder=str(tmp_path)) as aggregator:
+        aggregator.add_archive(data)
+        assert aggregator.partitions > 2
+        assert all(size <= 400 for size in aggregator._sizes)
+        rows = aggregator.table(by=["club", "boat"])
+        # partial sums are added in partition order
+        assert [x[:4] for x in rows] == [x[:4] for x in expected]
+        assert [x[4:] for x in rows] == [pytest.approx(x[4:]) for x in expected]
+        folder = aggregator.folder
+    assert not os.path.exists(folder)
+
+
+def test_unknown_key(data):
+    with Aggregator() as aggregator:
+        with pytest.raises(ValueError):
+            aggregator.add_archive(data).table(by=["team"])
@@ -0,0 +1,53 @@
+"""Fleet statistics tests against the Sailor properties."""
+import csv
+import random
+import statistics
+import pytest
+import benchmark
+import fleet_stats
+from results_analyzer import Analyzer
+from season import Season
+
+
+@pytest.fixture
+def analyzer(tmp_path) -> Analyzer:
+    """Get loaded regatta with special codes."""
+    path = str(tmp_path / "regatta.csv")
+    benchmark.generate_regatta(path, benchmark.generate_fleet(15, random.Random(4)), races=7, seed=4, code_rate=0.1,
+                               dialect=0)
+    analyzer = Analyzer()
+    analyzer.load_results(path)
+    return analyzer
+
+
+@pytest.mark.parametrize("discount", [0, 1, 2])
+def test_regatta_stats(analyzer, discount):
+    stats = fleet_stats.regatta_stats(analyzer, discount)
+    assert stats.names == [x.name for x in analyzer.data]
+    for n, sailor in enumerate(analyzer.data):
+        assert stats.column("mean")[n] == pytest.approx(sailor.avg_place(discount))
+        assert stats.column("stdev")[n] == pytest.approx(sailor.std_dev)
+        assert stats.column("median")[n] == pytest.approx(statistics.median([x.points for x in sailor.races]))
+        assert stats.column("best")[n] == sailor.best_race.points
+        assert stats.column("worst")[n] == sailor.get_worst_race(discount).points
+
+
+def test_to_csv(analyzer, tmp_path):
+    stats = fleet_stats.regatta_stats(analyzer)
+    path = str(tmp_path / "stats.csv")
+    stats.to_csv(path)
+    with open(path, encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == fleet_stats.COLUMNS
+    assert [x[0] for x in rows[1:]] == stats.names
+    assert stats.to_array()["mean"].tolist() == stats.column("mean").tolist()
+
+
+def test_season_stats(season_paths):
+    season = Season(season_paths)
+    stats = season.get_fleet_stats()
+    results = season.get_results()
+    assert sorted(stats.names) == sorted(name for name, _ in results)
+    regattas = {name: len(row) - 2 for name, row in results}
+    assert [int(x) for x in stats.column("races")] == [regattas[x] for x in stats.names]
+    assert all(x >= 1 for x in stats.column("best"))
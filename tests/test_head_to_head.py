@@ -0,0 +1,58 @@
+"""Head-to-head record tests."""
+import os
+import random
+import benchmark
+from head_to_head import HeadToHead
+
+
+def _archive(tmp_path, seed: int = 0) -> tuple:
+    """Get (data folder, csv paths) of Data/<year>/<class> tree."""
+    data = str(tmp_path / "Data")
+    fleet = benchmark.generate_fleet(12, random.Random(seed))
+    paths = []
+    for year in (2016, 2017):
+        folder = os.path.join(data, str(year), "Laser")
+        os.makedirs(folder)
+        for n in range(2):
+            paths.append(os.path.join(folder, f"regatta_{n}.csv"))
+            benchmark.generate_regatta(paths[-1], fleet, races=4, seed=seed + year + n, dialect=0)
+    return data, paths
+
+
+def _records(records: HeadToHead) -> tuple:
+    """Get comparable records by sailor name."""
+    names = records.registry.names
+    wins, races = records.wins.tocoo(), records.races.tocoo()
+    return (sorted((names[a], names[b], int(x)) for a, b, x in zip(wins.row, wins.col, wins.data)),
+            sorted((names[a], names[b], int(x)) for a, b, x in zip(races.row, races.col, races.data)))
+
+
+def test_add_archive(tmp_path):
+    data, paths = _archive(tmp_path)
+    records = HeadToHead().add_archive(data)
+    assert _records(records) == _records(HeadToHead().add_files(paths))
+    assert records.files == [os.path.relpath(x, data) for x in paths]
+    before = _records(records)
+    records.add_archive(data + os.sep)
+    assert _records(records) == before and len(records.files) == len(paths)
+
+
+def test_add_archive_years(tmp_path):
+    data, paths = _archive(tmp_path)
+    records = HeadToHead().add_archive(data, until=2016)
+    assert len(records.files) == 2
+    records.add_archive(data, since=2017)
+    assert _records(records) == _records(HeadToHead().add_files(paths))
+
+
+def test_edited_file(tmp_path):
+    data, paths = _archive(tmp_path)
+    file = str(tmp_path / "h2h.npz")
+    HeadToHead().add_archive(data).save(file)
+    fleet = benchmark.generate_fleet(12, random.Random(0))
+    benchmark.generate_regatta(paths[1], fleet, races=5, seed=99, dialect=0)
+    records = HeadToHead.load(file).add_archive(data)
+    assert _records(records) == _records(HeadToHead().add_files(paths))
+    os.remove(paths[0])
+    records.add_archive(data)
+    assert _records(records) == _records(HeadToHead().add_files(paths[1:]))
@@ -0,0 +1,45 @@
+"""Progressive standings tests."""
+import random
+import numpy as np
+import pytest
+import benchmark
+import progressive
+from results_analyzer import Analyzer
+
+
+@pytest.fixture(params=range(3))
+def analyzer(tmp_path, request) -> Analyzer:
+    """Get loaded regatta with finals and special codes."""
+    path = str(tmp_path / "regatta.csv")
+    benchmark.generate_regatta(path, benchmark.generate_fleet(15, random.Random(request.param)), races=6, finals=True,
+                               seed=request.param, code_rate=0.1, dialect=0)
+    analyzer = Analyzer()
+    analyzer.load_results(path)
+    return analyzer
+
+
+def test_get_results(analyzer):
+    standings = progressive.from_analyzer(analyzer, max_discount=2)
+    for races in range(1, 7):
+        for discount in range(min(3, races)):
+            expected = [x.name for x in analyzer.get_results(discount, races)]
+            assert [analyzer.data[n].name for n in standings.standings(discount, races)] == expected
+
+
+def test_positions(analyzer):
+    standings = progressive.from_analyzer(analyzer, max_discount=2)
+    positions = standings.positions
+    assert positions.shape == (6, 3, 15)
+    assert (positions[0, 1:] == -1).all() and (positions[1, 2] == -1).all()
+    assert sorted(positions[5, 2].tolist()) == list(range(1, 16))
+    row = standings.standings(1, 4)[0]
+    assert standings.history(row, 1)[0] is None and standings.history(row, 1)[3] == 1
+    assert np.array_equal(positions[:, 0], progressive.from_analyzer(analyzer, max_discount=0).positions[:, 0])
+
+
+def test_invalid_discount(analyzer):
+    standings = progressive.from_analyzer(analyzer, max_discount=2)
+    with pytest.raises(ValueError):
+        standings.standings(discount=2, races=2)
+    with pytest.raises(ValueError):
+        standings.standings(discount=3)
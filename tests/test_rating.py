@@ -0,0 +1,57 @@
+"""Rating engine tests."""
+import os
+import random
+import benchmark
+from rating import RatingEngine
+
+FLEET = benchmark.generate_fleet(12, random.Random(0))
+
+
+def _regatta(data: str, year: int, n: int, seed: int = 0) -> str:
+    """Write regatta n of year to Data/<year>/Laser/ and get its path."""
+    folder = os.path.join(data, str(year), "Laser")
+    os.makedirs(folder, exist_ok=True)
+    path = os.path.join(folder, f"regatta_{n}.csv")
+    benchmark.generate_regatta(path, FLEET, races=4, seed=seed + year * 10 + n, dialect=0)
+    return path
+
+
+def _fresh(data: str) -> list:
+    """Get ratings table of a run from the start."""
+    return _run(RatingEngine(), data)[1]
+
+
+def _run(engine: RatingEngine, data: str, checkpoint: str = None) -> tuple:
+    """Get (rated files, ratings table) of run."""
+    return engine.run(data, checkpoint), engine.table()
+
+
+def test_resume(tmp_path):
+    data, checkpoint = str(tmp_path / "Data"), str(tmp_path / "ratings.npz")
+    for n in range(2):
+        _regatta(data, 2016, n)
+    assert RatingEngine().run(data, checkpoint) == 2
+    _regatta(data, 2017, 0)
+    assert _run(RatingEngine.load(checkpoint), data, checkpoint) == (1, _fresh(data))
+    assert RatingEngine.load(checkpoint).run(data) == 0
+
+
+def test_edited_file(tmp_path):
+    data, checkpoint = str(tmp_path / "Data"), str(tmp_path / "ratings.npz")
+    paths = [_regatta(data, 2016, n) for n in range(3)]
+    RatingEngine().run(data, checkpoint)
+    _regatta(data, 2016, 1, seed=7)
+    assert _run(RatingEngine.load(checkpoint), data) == (3, _fresh(data))
+    os.remove(paths[0])
+    assert _run(RatingEngine.load(checkpoint), data) == (2, _fresh(data))
+
+
+def test_earlier_file(tmp_path):
+    data, checkpoint = str(tmp_path / "Data"), str(tmp_path / "ratings.npz")
+    for year in (2016, 2017):
+        _regatta(data, year, 0)
+    RatingEngine().run(data, checkpoint)
+    _regatta(data, 2015, 0)
+    engine = RatingEngine.load(checkpoint)
+    assert _run(engine, data) == (3, _fresh(data))
+    assert engine.files == [os.path.join(str(x), "Laser", "regatta_0.csv") for x in (2015, 2016, 2017)]
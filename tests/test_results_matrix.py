@@ -0,0 +1,47 @@
+"""Fast csv ingestion tests."""
+import random
+import numpy as np
+import pytest
+import benchmark
+import shadow
+from results_analyzer import Analyzer
+from results_matrix import load_matrix
+
+HEADER = "Rank,Sailno,HelmName,Klubi,R1,R2,Total,Nett\n"
+
+
+def _write(tmp_path, text, name: str = "regatta.csv") -> str:
+    """Write results file and get its path."""
+    path = tmp_path / name
+    path.write_bytes(text if isinstance(text, bytes) else text.encode("utf-8"))
+    return str(path)
+
+
+@pytest.mark.parametrize("size", [5, 1500])
+def test_same_as_analyzer(tmp_path, size):
+    path = str(tmp_path / "regatta.csv")
+    benchmark.generate_regatta(path, benchmark.generate_fleet(size, random.Random(size)), races=6, seed=size,
+                               code_rate=0.2, dialect=0)
+    analyzer = Analyzer()
+    analyzer.load_results(path)
+    assert [shadow.describe(x) for x in load_matrix(path).to_analyzer().get_results(discount=1)] == \
+        [shadow.describe(x) for x in analyzer.get_results(discount=1)]
+
+
+def test_cells(tmp_path):
+    matrix = load_matrix(_write(tmp_path, HEADER + "1,EST 1,A,NYC,(12),3.0,15,3\n2,EST 2,B,NYC,7/DNF,[2],9,2\n"))
+    assert np.array_equal(matrix.points, [[12, 3], [7, 2]])
+    assert matrix.symbols == {(1, 0): "DNF"}
+
+
+def test_short_row(tmp_path):
+    matrix = load_matrix(_write(tmp_path, HEADER + "1,EST 1,A,NYC,1,2\n"))
+    assert np.array_equal(matrix.points, [[1, 2]])
+    with pytest.raises(ValueError, match="Row 2"):
+        load_matrix(_write(tmp_path, HEADER + "1,EST 1,A,NYC,1,2\n2,EST 2,B,NYC,1\n"))
+
+
+def test_encoding(tmp_path):
+    assert load_matrix(_write(tmp_path, (HEADER + "1,EST 1,Õie,NYC,1,2\n").encode("cp1257"))).names == ["Õie"]
+    with pytest.raises(ValueError, match="encodings"):
+        load_matrix(_write(tmp_path, HEADER.encode() + b"1,EST 1,A\x81,NYC,1,2\n"))
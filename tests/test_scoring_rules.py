@@ -0,0 +1,92 @@
+"""Scoring rules and ranking snapshot tests."""
+import dataclasses
+import pytest
+import benchmark
+import legacy
+import scoring
+import scoring_rules
+import shadow
+from results_analyzer import Place
+from season import Regatta
+
+RULES = ["get_results_normal", "get_results_normal_finals", "get_results_2", "convert_finals"]
+
+
+@pytest.fixture
+def regatta(tmp_path) -> Regatta:
+    """Get regatta with finals."""
+    return Regatta(benchmark.generate_season(str(tmp_path), regattas=1, fleet_size=20, races=6, finals_every=1,
+                                             seed=3)[0])
+
+
+def test_rules_frozen():
+    rules = scoring_rules.ScoringRules(finals_from_races=[-2, -1])
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        rules.discount = 2
+    assert rules == scoring_rules.ScoringRules(finals_from_races=(-2, -1))
+    assert {rules: 1}[rules.replace(discount=1)] == 1
+    with pytest.raises(ValueError):
+        scoring_rules.ScoringRules(places="club")
+
+
+@pytest.mark.parametrize("name", RULES)
+def test_ranked_entries(regatta, name):
+    data = regatta.analyzer.data
+    rules = scoring_rules.REGATTA_RULES[name]
+    entries, rows = regatta.get_scorer().ranked(rules)
+    assert all(isinstance(races, tuple) for _, races, _, _ in entries)
+    assert sorted(rows) == list(range(len(data)))
+    assert [x[0][0] for x in entries] == [data[n].name for n in rows]
+    assert [shadow.describe(x) for x in regatta.get_scorer().score(rules)] == \
+        [shadow.describe(x) for x in scoring_rules.Scorer(regatta.analyzer).score(rules)]
+
+
+@pytest.mark.parametrize("name", RULES)
+def test_results_not_shared(regatta, name):
+    rules = scoring_rules.REGATTA_RULES[name]
+    data = [shadow.describe(x) for x in regatta.analyzer.data]
+    expected = [shadow.describe(x) for x in regatta.get_results_rules(rules)]
+    for _ in range(2):
+        results = regatta.get_results_rules(rules)
+        for sailor in results:
+            sailor.name = "changed"
+            sailor.races.append(Place(99, "99"))
+            sailor.gold = None
+    assert [shadow.describe(x) for x in regatta.analyzer.data] == data
+    assert [shadow.describe(x) for x in regatta.get_results_rules(rules)] == expected
+
+
+def test_snapshot_frozen(regatta):
+    rules = scoring_rules.REGATTA_RULES["get_results_normal_finals"]
+    snapshot = regatta.get_snapshot(rules)
+    names, nett, gold = snapshot.names, snapshot.nett, snapshot.gold
+    # every sailor gets one point more, so the order and finalists stay the same
+    for sailor in regatta.analyzer.data:
+        sailor.races[0] = Place(sailor.races[0].points + 1, str(sailor.races[0].points + 1))
+    regatta.analyzer.changed()
+    assert regatta.get_snapshot(rules).nett != nett
+    assert (snapshot.names, snapshot.nett, snapshot.gold) == (names, nett, gold)
+    assert regatta.get_snapshot(rules) is not snapshot
+    assert regatta.get_snapshot(rules).version == regatta.analyzer.version
+
+
+@pytest.mark.parametrize("rules", [scoring_rules.ScoringRules(races=3),
+                                   scoring_rules.ScoringRules(races=-2, discount=2),
+                                   scoring_rules.REGATTA_RULES["get_results_oldfinals_2"]])
+def test_snapshot_cutoff(regatta, rules):
+    snapshot = regatta.get_snapshot(rules)
+    sailors = snapshot.sailors()
+    count = scoring.race_count(len(regatta.analyzer.data[0].races), rules.races)
+    assert snapshot.total == tuple(x.get_points_after(count) for x in sailors)
+    assert snapshot.nett == tuple(x.get_points_after(count, rules.discount) for x in sailors)
+    if not rules.finals:
+        assert list(snapshot.nett) == sorted(snapshot.nett)
+
+
+def test_batch_legacy(regatta):
+    expected = {name: [shadow.describe(x) for x in getattr(legacy.Regatta(regatta.data_path), name)()]
+                for name in scoring_rules.REGATTA_RULES}
+    batch = Regatta(regatta.data_path).get_results_batch(scoring_rules.REGATTA_RULES)
+    assert {name: [shadow.describe(x) for x in results] for name, results in batch.items()} == expected
+    for name, rules in scoring_rules.REGATTA_RULES.items():
+        assert [shadow.describe(x) for x in Regatta(regatta.data_path).get_results_rules(rules)] == expected[name]
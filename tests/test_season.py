@@ -0,0 +1,64 @@
+"""Season loading tests."""
+import multiprocessing
+import random
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import pytest
+import benchmark
+import registry
+import shadow
+from results_analyzer import Analyzer
+from season import Season
+
+VARIANTS = ["get_results", "get_results_finals", "get_results_new1"]
+
+
+def _standings(season: Season, variant: str) -> list:
+    """Get comparable standings rows."""
+    return [shadow.describe(x) for x in getattr(season, variant)()]
+
+
+@pytest.mark.parametrize("variant", VARIANTS)
+def test_load_sync_threads(season_paths, variant):
+    sequential = _standings(Season(season_paths), variant)
+    with ThreadPoolExecutor(4) as executor:
+        season = Season(season_paths).load_sync(concurrency=2, executor=executor)
+    assert _standings(season, variant) == sequential
+
+
+@pytest.mark.parametrize("variant", VARIANTS)
+def test_load_sync_processes(season_paths, variant):
+    sequential = _standings(Season(season_paths), variant)
+    # spawned workers start with empty registries, so their ids must not be used
+    with ProcessPoolExecutor(2, mp_context=multiprocessing.get_context("spawn")) as executor:
+        season = Season(season_paths).load_sync(executor=executor)
+    assert len(season.loaded) == len(season_paths)
+    assert _standings(season, variant) == sequential
+
+
+def test_own_registry(season_paths):
+    season = Season(season_paths, registry.SailorRegistry())
+    assert _standings(season, "get_results_finals") == _standings(Season(season_paths), "get_results_finals")
+    assert len(season.registry) == len(season.get_results_finals())
+
+
+def test_same_name_sail_nr(tmp_path):
+    fleet = benchmark.generate_fleet(6, random.Random(5))
+    paths = []
+    for n in range(2):
+        path = str(tmp_path / f"regatta_{n}.csv")
+        benchmark.generate_regatta(path, fleet, races=4, seed=n, dialect=0)
+        with open(path, encoding="utf-8") as f:
+            text = f.read().replace(f",{fleet[1][0]},", f",{fleet[0][0]},")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        paths.append(path)
+    names = [name for name, _ in Season(paths, registry.SailorRegistry(match_sail_nr=True)).get_results()]
+    assert len(names) == 6 and names.count(fleet[0][0]) == 2
+    assert len(Season(paths).get_results()) == 5
+
+
+def test_registry_not_shared(season_paths):
+    first, second = Season(season_paths), Season(season_paths)
+    first.get_results()
+    assert first.registry is not second.registry and len(second.registry) == 0
+    assert Analyzer().registry is not Analyzer().registry
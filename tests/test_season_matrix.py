@@ -0,0 +1,44 @@
+"""Season aggregation tests against the original Season.sort_year."""
+import copy
+import random
+import pytest
+import legacy
+import season_matrix
+from season import Competition
+
+
+def _season(seed: int, sailors: int = 40, regattas: int = 6, integral: bool = True) -> dict:
+    """Get {sailor: [Competition, ...]} with sailors missing from some regattas."""
+    rng = random.Random(seed)
+    dic = {}
+    for n in range(1, regattas + 1):
+        for i, sailor in enumerate(rng.sample(range(sailors), rng.randint(1, sailors))):
+            points = 50 - i if integral else 50 - i * 0.5
+            dic.setdefault(f"sailor {sailor}", []).append(Competition(n, points, 3 - i if i < 3 else 0))
+    return dic
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("integral", [True, False])
+def test_sort_year_legacy(seed, integral):
+    dic = _season(seed, integral=integral)
+    expected = legacy.Season.sort_year(None, copy.deepcopy(dic))
+    result = season_matrix.sort_year(dic)
+    assert [key for key, _ in result] == [key for key, _ in expected]
+    assert [row[-2:] for _, row in result] == [row[-2:] for _, row in expected]
+
+
+def test_drop_worst():
+    dic = {"a": [Competition(n + 1, points, 0) for n, points in enumerate([10, 4, 8, 6])],
+           "b": [Competition(n + 1, points, 0) for n, points in enumerate([10, 4, 8])]}
+    standings = season_matrix.aggregate(season_matrix.SeasonMatrix.from_dict(dic))
+    assert standings.totals.tolist() == [24, 22]
+    assert standings.dropped.tolist() == [True, False]
+    assert standings.keys == ["a", "b"]
+
+
+def test_dense_mask():
+    dic = {"a": [Competition(1, 5, 0), Competition(3, 7, 1)], "b": [Competition(2, 4, 0)]}
+    totals, mask = season_matrix.SeasonMatrix.from_dict(dic).dense()
+    assert totals.tolist() == [[5, 0, 8], [0, 4, 0]]
+    assert mask.tolist() == [[True, False, True], [False, True, False]]
@@ -0,0 +1,115 @@
+"""Server response tests."""
+import http.client
+import json
+import random
+import threading
+import pytest
+import benchmark
+import server
+
+
+@pytest.fixture(scope="module")
+def address(tmp_path_factory):
+    """Get (host, port, cache) of running server with good and bad results files."""
+    tmp_path = tmp_path_factory.mktemp("results")
+    (tmp_path / "empty.csv").write_text("")
+    (tmp_path / "header.csv").write_text("Rank,Sail,Name,Club,R1,R2\n")
+    (tmp_path / "text.csv").write_text("Name,R1,R2\nA,x,1\n")
+    benchmark.generate_regatta(str(tmp_path / "ok.csv"), benchmark.generate_fleet(12, random.Random(0)), 5, seed=0)
+    httpd = server.make_server(str(tmp_path), port=0)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd.server_address[0], httpd.server_port, httpd.RequestHandlerClass.cache
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _request(address, path: str, method: str = "GET") -> tuple:
+    """Get (status, json body) of request."""
+    connection = http.client.HTTPConnection(address[0], address[1], timeout=10)
+    try:
+        connection.request(method, path)
+        response = connection.getresponse()
+        return response.status, json.loads(response.read())
+    finally:
+        connection.close()
+
+
+def test_ok(address):
+    status, body = _request(address, "/standings?file=ok.csv")
+    assert status == 200 and len(body) == 12
+    assert _request(address, "/reload?file=ok.csv", "POST") == (200, {"dropped": 1})
+
+
+@pytest.mark.parametrize("path", ["/standings?file=empty.csv", "/standings?file=header.csv",
+                                  "/standings?file=text.csv", "/standings?file=ok.csv&discount=9",
+                                  "/standings?file=ok.csv&races=x", "/finals?file=ok.csv&scenario=unknown",
+                                  "/standings?file=../ok.csv"])
+def test_bad_request(address, path):
+    status, body = _request(address, path)
+    assert status == 400 and body["error"]
+
+
+@pytest.mark.parametrize("path", ["/standings?file=missing.csv", "/unknown"])
+def test_not_found(address, path):
+    status, body = _request(address, path)
+    assert status == 404 and body["error"]
+
+
+def test_server_error(address, monkeypatch):
+    def fail(*args, **kwargs):
+        raise RuntimeError("broken")
+    monkeypatch.setattr(address[2], "standings", fail)
+    assert _request(address, "/standings?file=ok.csv") == (500, {"error": "RuntimeError: broken"})
+    assert _request(address, "/season?file=ok.csv")[0] == 200
+
+
+def test_standings_cutoff(address):
+    status, body = _request(address, "/standings?file=ok.csv&races=3&discount=1")
+    cache = address[2]
+    results = cache.analyzer(cache.path("ok.csv")).get_results(1, 3)
+    assert status == 200
+    assert [x["total"] for x in body] == [x.get_points_after(3) for x in results]
+    assert [x["nett"] for x in body] == [x.get_points_after(3, 1) for x in results]
+    assert [x["nett"] for x in body] == sorted(x["nett"] for x in body)
+
+
+def test_parse_outside_lock(tmp_path):
+    benchmark.generate_regatta(str(tmp_path / "a.csv"), benchmark.generate_fleet(12, random.Random(0)), 5, seed=0)
+    benchmark.generate_regatta(str(tmp_path / "b.csv"), benchmark.generate_fleet(12, random.Random(1)), 5, seed=1)
+    cache = server.ResultsCache(str(tmp_path))
+    first, slow = cache.path("a.csv"), cache.path("b.csv")
+    cache.analyzer(first)
+    started, release, loads = threading.Event(), threading.Event(), []
+    load = cache.load
+
+    def slow_load(path):
+        loads.append(path)
+        started.set()
+        release.wait(10)
+        return load(path)
+    cache.load = slow_load
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.analyzer(slow))) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    assert started.wait(10)
+    # cached files and the lock are free while b.csv is parsed
+    hit = threading.Thread(target=cache.standings, args=(first,))
+    hit.start()
+    hit.join(2)
+    alive = hit.is_alive()
+    release.set()
+    assert not alive
+    for thread in threads:
+        thread.join(10)
+    assert loads == [slow] and len(results) == 3 and all(x is results[0] for x in results)
+
+
+def test_responses_bounded(tmp_path):
+    benchmark.generate_regatta(str(tmp_path / "a.csv"), benchmark.generate_fleet(12, random.Random(0)), 6, seed=0)
+    cache = server.ResultsCache(str(tmp_path), max_responses=2)
+    path = cache.path("a.csv")
+    for races in (2, 3, 4, 3):
+        cache.standings(path, races=races)
+    assert list(cache.responses) == [("standings", (path,), 1, 4), ("standings", (path,), 1, 3)]
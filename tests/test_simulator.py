@@ -0,0 +1,54 @@
+"""Monte Carlo simulator tests."""
+import random
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pytest
+import benchmark
+import simulator
+from results_analyzer import Analyzer
+from season import Season
+
+
+@pytest.fixture
+def analyzer(tmp_path) -> Analyzer:
+    """Get loaded regatta of 15 boats."""
+    path = str(tmp_path / "regatta.csv")
+    benchmark.generate_regatta(path, benchmark.generate_fleet(15, random.Random(2)), races=5, seed=2, dialect=0)
+    analyzer = Analyzer()
+    analyzer.load_results(path)
+    return analyzer
+
+
+def test_regatta_seed(analyzer):
+    first = simulator.simulate_regatta(analyzer, 2, simulations=500, seed=4, batch=100)
+    assert np.array_equal(first.counts, simulator.simulate_regatta(analyzer, 2, simulations=500, seed=4,
+                                                                   batch=100).counts)
+    with ThreadPoolExecutor(2) as executor:
+        pooled = simulator.simulate_regatta(analyzer, 2, simulations=500, seed=4, batch=100, executor=executor)
+    assert np.array_equal(first.counts, pooled.counts)
+    assert first.win.sum() == pytest.approx(1)
+    assert first.podium.sum() == pytest.approx(3)
+    assert first.top10.sum() == pytest.approx(10)
+
+
+def test_no_races_left(analyzer):
+    result = simulator.simulate_regatta(analyzer, 0, discount=1, simulations=50, seed=1)
+    ranked = [x.name for x in analyzer.get_results(discount=1)]
+    assert result.table()[0][:2] == (ranked[0], 1.0)
+    assert {name for name, _, podium, _ in result.table() if podium == 1.0} == set(ranked[:3])
+
+
+def test_season(season_paths):
+    season = Season(season_paths)
+    names = [name for name, _ in season.get_results()]
+    result = simulator.simulate_season(season, entries=names[:5], simulations=300, seed=3)
+    assert result.win.sum() == pytest.approx(1)
+    assert np.array_equal(result.counts, simulator.simulate_season(season, entries=names[:5], simulations=300,
+                                                                   seed=3).counts)
+    # the five leaders sail the last regatta, sailors behind them who do not cannot win
+    assert all(win == 0 for name, win, _, _ in result.table() if name not in names[:5])
+
+
+def test_no_simulations(analyzer):
+    with pytest.raises(ValueError):
+        simulator.simulate_regatta(analyzer, 1, simulations=0)
@@ -0,0 +1,50 @@
+"""Special code table tests."""
+import pytest
+import benchmark
+import special_codes
+from results_analyzer import Analyzer
+from results_matrix import load_matrix
+from special_codes import CodeRule, CodeTable
+
+
+@pytest.fixture
+def path(tmp_path) -> str:
+    """Get path of regatta with many special codes."""
+    return benchmark.generate_season(str(tmp_path), regattas=1, fleet_size=30, races=6, seed=4)[0]
+
+
+def test_apply_codes(path):
+    analyzer = Analyzer()
+    analyzer.load_results(path)
+    codes = analyzer.get_codes()
+    assert codes.any()
+    analyzer.apply_codes(CodeTable(rules={"dnf": CodeRule(fixed=50, discardable=False)}))
+    dnf = special_codes.code_id("DNF")
+    for row, race in zip(*codes.nonzero()):
+        place = analyzer.data[row].races[race]
+        if codes[row, race] == dnf:
+            assert (place.points, place.discardable) == (50, False)
+        elif codes[row, race] != special_codes.code_id("DNE"):
+            assert (place.points, place.discardable) == (len(analyzer.data) + 1, True)
+
+
+def test_matrix_codes(path):
+    analyzer = Analyzer()
+    analyzer.load_results(path)
+    matrix = load_matrix(path)
+    assert (matrix.codes == analyzer.get_codes()).all()
+    points, _ = CodeTable().score(matrix.points, matrix.codes)
+    analyzer.apply_codes()
+    assert points.tolist() == [[x.points for x in sailor.races] for sailor in analyzer.data]
+
+
+def test_table_full(monkeypatch):
+    monkeypatch.setattr(special_codes, "MAX_CODES", len(special_codes._CODES))
+    table = CodeTable()
+    assert special_codes.code_id("zzqnew") == 0
+    with pytest.raises(ValueError):
+        table.set_rule("zzqnew", CodeRule())
+    with pytest.raises(ValueError):
+        table.set_rule("1/2", CodeRule())
+    table.set_rule("dnf", CodeRule(fixed=3))
+    assert table.lookup(10)[0][special_codes.code_id("dnf")] == 3
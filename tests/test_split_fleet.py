@@ -0,0 +1,53 @@
+"""Split fleet scoring tests."""
+import concurrent.futures
+import random
+import benchmark
+import split_fleet
+from results_matrix import load_matrix
+
+# A sails alone in the Blue qualifying fleet, so its DNF scores 2 points, not 4 of the size of the Gold fleet
+FINAL = """Sailno,HelmName,Klubi,Fleet,Final fleet,Q1,Q2,R1,R2
+EST 1,A,NYC,Blue,Gold,9/DNF,1,3,1
+EST 2,B,NYC,Yellow,Gold,1,3,1,3
+EST 3,C,NYC,Yellow,Gold,2,4,2,2
+EST 4,D,NYC,Yellow,Silver,3,1,1,1
+EST 5,E,NYC,Yellow,Silver,4,2,2,2
+EST 6,F,NYC,Yellow,Silver,5,5,3,3
+"""
+
+
+class Refused(concurrent.futures.Executor):
+    """Executor that must not be used."""
+
+    def map(self, *args, **kwargs):
+        raise AssertionError("small events are scored in process")
+
+
+def _split(tmp_path, size: int = 400):
+    """Get matrix of synthetic split fleet regatta."""
+    path = str(tmp_path / "split.csv")
+    benchmark.generate_split_regatta(path, benchmark.generate_fleet(size, random.Random(0)), seed=0, code_rate=0.1)
+    return load_matrix(path)
+
+
+def test_qualifying_codes(tmp_path):
+    path = tmp_path / "final.csv"
+    path.write_text(FINAL, encoding="utf-8")
+    results = split_fleet.score(load_matrix(str(path)), discount=0)
+    assert results.stage == "final"
+    assert [results.matrix.names[x] for x in results.order] == ["A", "B", "C", "D", "E", "F"]
+
+
+def test_workers(tmp_path):
+    matrix = _split(tmp_path)
+    expected = split_fleet.score(matrix).order
+    assert split_fleet.score(matrix, workers=2).order == expected
+    assert split_fleet.score(matrix, workers=2).order == expected
+    assert len(split_fleet._POOLS) == 1
+    with concurrent.futures.ThreadPoolExecutor(2) as executor:
+        assert split_fleet.score(matrix, executor=executor).order == expected
+
+
+def test_small_event(tmp_path):
+    matrix = _split(tmp_path, split_fleet.SMALL_EVENT)
+    assert split_fleet.score(matrix, executor=Refused()).order == split_fleet.score(matrix).order
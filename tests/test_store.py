@@ -0,0 +1,48 @@
+"""Results store tests."""
+import os
+import pytest
+import benchmark
+import shadow
+from season import Season
+from store import ResultsStore
+
+FOLDERS = [(2015, "Laser", 2), (2016, "Laser", 3), (2016, "Optimist", 1), (2017, "Laser", 1)]
+
+
+@pytest.fixture
+def data(tmp_path) -> dict:
+    """Get {(year, class): csv paths} of Data/<year>/<class> tree written to tmp_path."""
+    folders = {}
+    for n, (year, boat, regattas) in enumerate(FOLDERS):
+        folder = tmp_path / str(year) / boat
+        folder.mkdir(parents=True)
+        folders[(year, boat)] = benchmark.generate_season(str(folder), regattas=regattas, fleet_size=12, races=5,
+                                                          finals_every=2, seed=n)
+    return folders
+
+
+def test_import_folder(tmp_path, data):
+    with ResultsStore() as store:
+        ids = store.import_folder(str(tmp_path))
+        regattas = store.regattas()
+        assert len(ids) == len(regattas) == sum(x[2] for x in FOLDERS)
+        assert [(x[2], x[3], x[4]) for x in regattas] == [(year, boat, n + 1) for year, boat, count in FOLDERS
+                                                           for n in range(count)]
+        assert [x[1] for x in regattas] == [x for paths in data.values() for x in paths]
+        assert {x[0] for x in store.results(since=2016)} == {2016, 2017}
+        assert len(store.results(boat_class="Laser", until=2016)) == 12 * 5
+
+        # importing again replaces regattas of the same path
+        store.import_folder(str(tmp_path))
+        assert len(store.regattas()) == len(regattas)
+        assert len(store.results()) == 12 * len(regattas)
+
+
+@pytest.mark.parametrize("year, boat", [(2015, "Laser"), (2016, "Laser"), (2016, "Optimist")])
+def test_load_season(tmp_path, data, year, boat):
+    with ResultsStore(os.path.join(str(tmp_path), "results.db")) as store:
+        store.import_folder(str(tmp_path))
+    with ResultsStore(os.path.join(str(tmp_path), "results.db")) as store:
+        season = store.load_season(boat, year)
+    expected = Season(data[(year, boat)])
+    assert [shadow.describe(x) for x in season.get_results()] == [shadow.describe(x) for x in expected.get_results()]
@@ -0,0 +1,58 @@
+"""Streaming xlsx reader tests."""
+import os
+import zipfile
+import pytest
+import benchmark
+import shadow
+import xlsx_reader
+from results_analyzer import Analyzer
+
+MAIN = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+
+
+def _load(path: str, sheet=None) -> list:
+    """Get comparable sailors of results file."""
+    analyzer = Analyzer()
+    analyzer.load_results(path, sheet)
+    return [shadow.describe(x) for x in analyzer.data]
+
+
+def test_same_as_csv(season_paths, tmp_path):
+    workbook = str(tmp_path / "season.xlsx")
+    benchmark.csv_to_xlsx(season_paths, workbook)
+    names = [os.path.splitext(os.path.basename(x))[0] for x in season_paths]
+    assert xlsx_reader.sheet_names(workbook) == names
+    for n, (name, path) in enumerate(zip(names, season_paths)):
+        assert _load(workbook, name) == _load(path)
+        assert _load(workbook, n) == _load(path)
+    assert _load(workbook) == _load(season_paths[0])
+
+
+def test_missing_sheet(season_paths, tmp_path):
+    workbook = str(tmp_path / "season.xlsx")
+    benchmark.csv_to_xlsx(season_paths[:1], workbook)
+    with pytest.raises(ValueError):
+        list(xlsx_reader.iter_rows(workbook, "Laser"))
+    with pytest.raises(ValueError):
+        list(xlsx_reader.iter_rows(workbook, 1))
+
+
+def test_cell_types(tmp_path):
+    path = str(tmp_path / "cells.xlsx")
+    sheet = (f'<worksheet xmlns="{MAIN}"><sheetData>'
+             '<row r="1"><c r="A1" t="inlineStr"><is><t>Name</t></is></c><c r="C1" t="s"><v>0</v></c></row>'
+             '<row r="2"></row>'
+             '<row r="3"><c r="A3" t="inlineStr"><is><r><t>Ann </t></r><r><t>Lee</t></r></is></c>'
+             '<c r="B3"><v>3.0</v></c><c r="C3"><v>2.5</v></c><c r="D3" t="b"><v>1</v></c></row>'
+             '<row r="4"><c r="B4"><v>7</v></c></row>'
+             '</sheetData></worksheet>')
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr("xl/workbook.xml", f'<workbook xmlns="{MAIN}" xmlns:r="http://schemas.openxmlformats.org/'
+                         'officeDocument/2006/relationships"><sheets><sheet name="One" sheetId="1" r:id="rId1"/>'
+                         '</sheets></workbook>')
+        archive.writestr("xl/_rels/workbook.xml.rels", '<Relationships xmlns="http://schemas.openxmlformats.org/'
+                         'package/2006/relationships"><Relationship Id="rId1" Target="/xl/worksheets/a.xml"/>'
+                         '</Relationships>')
+        archive.writestr("xl/worksheets/a.xml", sheet)
+        archive.writestr("xl/sharedStrings.xml", f'<sst xmlns="{MAIN}"><si><t>R1</t></si></sst>')
+    assert list(xlsx_reader.iter_rows(path)) == [["Name", "", "R1"], ["Ann Lee", "3", "2.5"], ["", "7", ""]]
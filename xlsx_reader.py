@@ -0,0 +1,145 @@
+"""Streaming .xlsx reader, rows are parsed one at a time from the zipped sheet xml."""
+import posixpath
+import re
+import zipfile
+import xml.etree.ElementTree as ElementTree
+
+_CELL = re.compile(r"([A-Z]+)(\d*)")
+
+
+def _local(tag: str) -> str:
+    """Get tag name without namespace."""
+    return tag.rsplit("}", 1)[-1]
+
+
+def column_index(reference: str) -> int:
+    """Get 0-based column of cell reference like 'AB12'."""
+    index = 0
+    for letter in _CELL.match(reference.upper()).group(1):
+        index = index * 26 + ord(letter) - ord("A") + 1
+    return index - 1
+
+
+def _number(value: str) -> str:
+    """Get number cell as csv export shows it, whole numbers without decimals."""
+    try:
+        number = float(value)
+    except ValueError:
+        return value
+    return str(int(number)) if number.is_integer() else repr(number)
+
+
+def _text(element) -> str:
+    """Get text of shared or inline string, rich text runs are joined and phonetic hints skipped."""
+    parts = []
+    for child in element:
+        name = _local(child.tag)
+        if name == "t":
+            parts.append(child.text or "")
+        elif name == "r":
+            parts += [x.text or "" for x in child if _local(x.tag) == "t"]
+    return "".join(parts)
+
+
+def _sheets(archive: zipfile.ZipFile) -> list:
+    """Get [(name, path in archive)] of worksheets in workbook order."""
+    targets = {}
+    with archive.open("xl/_rels/workbook.xml.rels") as f:
+        for _, element in ElementTree.iterparse(f):
+            if _local(element.tag) == "Relationship":
+                target = element.get("Target")
+                if target.startswith("/"):
+                    target = target[1:]
+                else:
+                    target = posixpath.normpath(posixpath.join("xl", target))
+                targets[element.get("Id")] = target
+    sheets = []
+    with archive.open("xl/workbook.xml") as f:
+        for _, element in ElementTree.iterparse(f):
+            if _local(element.tag) == "sheet":
+                relation = next(value for key, value in element.attrib.items() if _local(key) == "id")
+                sheets.append((element.get("name"), targets[relation]))
+    return sheets
+
+
+def sheet_names(path: str) -> list:
+    """Get names of worksheets."""
+    with zipfile.ZipFile(path) as archive:
+        return [x[0] for x in _sheets(archive)]
+
+
+def _shared_strings(archive: zipfile.ZipFile) -> list:
+    """Get shared strings table."""
+    if "xl/sharedStrings.xml" not in archive.namelist():
+        return []
+    strings = []
+    with archive.open("xl/sharedStrings.xml") as f:
+        for _, element in ElementTree.iterparse(f):
+            if _local(element.tag) == "si":
+                strings.append(_text(element))
+                element.clear()
+    return strings
+
+
+def iter_rows(path: str, sheet=None):
+    """Yield rows of worksheet (name or 0-based index, default first) as lists of strings like csv.reader.
+
+    Rows are padded or cut to the width of the first row and empty rows are skipped. Parsed rows are dropped from
+    the xml tree so memory does not grow with the sheet.
+    """
+    with zipfile.ZipFile(path) as archive:
+        sheets = _sheets(archive)
+        if sheet is None:
+            sheet = 0
+        if isinstance(sheet, int):
+            if not -len(sheets) <= sheet < len(sheets):
+                raise ValueError(f"Workbook has no sheet {sheet}!")
+            target = sheets[sheet][1]
+        else:
+            matches = [x[1] for x in sheets if x[0] == sheet]
+            if not matches:
+                raise ValueError(f"Workbook has no sheet {sheet}!")
+            target = matches[0]
+        strings = _shared_strings(archive)
+
+        width = None
+        with archive.open(target) as f:
+            events = ElementTree.iterparse(f, events=("start", "end"))
+            _, root = next(events)
+            namespace = root.tag[:root.tag.index("}") + 1] if root.tag.startswith("{") else ""
+            sheet_data, row_tag, cell_tag = namespace + "sheetData", namespace + "row", namespace + "c"
+            value_tag, inline_tag = namespace + "v", namespace + "is"
+            parent = root
+            for event, element in events:
+                if element.tag != row_tag or event != "end":
+                    if element.tag == sheet_data and event == "start":
+                        parent = element
+                    continue
+                cells = {}
+                position = 0
+                for cell in element.iterfind(cell_tag):
+                    reference = cell.get("r")
+                    position = column_index(reference) if reference else position
+                    kind = cell.get("t", "n")
+                    if kind == "inlineStr":
+                        inline = cell.find(inline_tag)
+                        value = "" if inline is None else _text(inline)
+                    else:
+                        value = cell.findtext(value_tag) or ""
+                        if kind == "s" and value:
+                            value = strings[int(value)]
+                        elif kind == "b":
+                            value = "TRUE" if value == "1" else "FALSE"
+                        elif kind == "n" and value:
+                            value = _number(value)
+                    cells[position] = value
+                    position += 1
+                parent.clear()
+                if not any(cells.values()):
+                    continue
+                row = [""] * (max(cells) + 1)
+                for index, value in cells.items():
+                    row[index] = value
+                if width is None:
+                    width = len(row)
+                yield (row + [""] * width)[:width]